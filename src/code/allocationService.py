@@ -0,0 +1,276 @@
+import argparse
+import json
+import os
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from cashAllocationModel import (DEFAULT_DAMPING, DEFAULT_WEIGHTS, FEATURE_NAMES, RISK_TOLERANCE_LEVELS,
+                                 latest_features, load_feature_index)
+from dataStore import dataset_path
+from featureIndex import asof_positions, date_keys, key_dates
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+POLL_INTERVAL_SECONDS = 5
+
+
+def expanding_normalized(values):
+    """
+    Min-max normalize every observation against the history up to and including it.
+
+    Matches latest_features at each observation: missing values and empty ranges are neutral (0).
+    """
+    history = np.asarray(values, dtype=float)
+    low, high = np.fmin.accumulate(history), np.fmax.accumulate(history)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        normalized = (history - low) / (high - low)
+    return np.where(np.isnan(normalized), 0.0, normalized)
+
+
+class FeatureSnapshot:
+    """Immutable, pre-normalized view of the feature files used to answer queries without I/O."""
+
+    def __init__(self, files, compact=True):
+        self.files = files
+        self.compact = compact
+        self.mtimes = FeatureStore.file_mtimes(files)
+        index = load_feature_index(*files, compact=compact)
+        self.latest = latest_features(index)
+
+        # Point-in-time features for as-of queries: each metric normalized on its own dates,
+        # kept as (date keys, values) in the index's key resolution and value type
+        self.resolution = index.resolution
+        self.history = {}
+        for name in FEATURE_NAMES:
+            keys, values = index.view(name)
+            self.history[name] = (keys.copy(), expanding_normalized(values).astype(index.dtype))
+        self.loaded_at = time.time()
+
+    def features_as_of(self, as_of=None):
+        """
+        Return the normalized metrics on or before as_of (or the latest snapshot).
+
+        Each metric uses its latest observation on or before as_of, normalized against its
+        history up to that observation, as latest_features(index, as_of) does.
+
+        Returns:
+        - Tuple of (metrics ordered as FEATURE_NAMES, date of the latest observation used or None).
+        """
+        if as_of is None:
+            return self.latest, None
+        target = date_keys([as_of], self.resolution)[0]
+        features, latest_key = np.zeros(len(FEATURE_NAMES)), None
+        for position, name in enumerate(FEATURE_NAMES):
+            keys, values = self.history[name]
+            observation = asof_positions(keys, target)
+            if observation >= 0:
+                features[position] = values[observation]
+                latest_key = keys[observation] if latest_key is None else max(latest_key, keys[observation])
+        if latest_key is None:
+            raise ValueError(f"No feature data on or before {as_of}.")
+        return features, key_dates([latest_key], self.resolution)[0].strftime("%Y-%m-%d")
+
+
+class FeatureStore:
+    """Keeps the latest FeatureSnapshot in memory and reloads it when the feature files change."""
+
+    def __init__(self, files, poll_interval=POLL_INTERVAL_SECONDS, compact=True):
+        self.files = files
+        self.poll_interval = poll_interval
+        self.compact = compact
+        self.snapshot = FeatureSnapshot(files, compact)
+        self._stop = threading.Event()
+        self._watcher = None
+
+    @staticmethod
+    def file_mtimes(files):
+        mtimes = []
+        for file in files:
+            if os.path.isdir(file):
+                # Partitioned datasets change when any of their files do
+                mtimes.append(max((os.path.getmtime(os.path.join(root, name))
+                                   for root, _, names in os.walk(file) for name in names), default=0))
+            else:
+                mtimes.append(os.path.getmtime(file) if os.path.exists(file) else 0)
+        return mtimes
+
+    def refresh(self):
+        """Reload the snapshot if any feature file changed; returns True when reloaded."""
+        if self.file_mtimes(self.files) == self.snapshot.mtimes:
+            return False
+        try:
+            # Swap in the new snapshot atomically so queries never see a partial reload
+            self.snapshot = FeatureSnapshot(self.files, self.compact)
+            print("✅ Feature files changed, in-memory features reloaded.")
+            return True
+        except Exception as e:
+            # Files may be mid-write; keep serving the previous snapshot and retry on the next poll
+            print(f"❌ Error reloading features: {e}")
+            return False
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            self.refresh()
+
+    def start_watching(self):
+        self._watcher = threading.Thread(target=self._watch, name="feature-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+
+
+def _parse_weights(value, defaults):
+    """Parse a weight/damping override: "0.4,0.2,0.2,0.2" or a JSON object keyed by metric."""
+    if value is None:
+        return np.array([defaults[name] for name in FEATURE_NAMES])
+    if isinstance(value, dict):
+        return np.array([{**defaults, **value}[name] for name in FEATURE_NAMES], dtype=float)
+    if isinstance(value, str) and value.strip().startswith("{"):
+        return _parse_weights(json.loads(value), defaults)
+    values = value if isinstance(value, (list, tuple)) else value.split(",")
+    if len(values) != len(FEATURE_NAMES):
+        raise ValueError(f"Expected {len(FEATURE_NAMES)} values ({', '.join(FEATURE_NAMES)}).")
+    return np.array(values, dtype=float)
+
+
+def answer_query(snapshot, risk_tolerance="medium", weights=None, damping=None, as_of=None):
+    """
+    Answer an allocation query from an in-memory snapshot.
+
+    Parameters:
+    - snapshot: FeatureSnapshot to query.
+    - risk_tolerance: "high", "medium", "low" or a numeric maximum cash level.
+    - weights, damping: Optional overrides (comma-separated values or a dict keyed by metric).
+    - as_of: Optional date; the latest features on or before it are used.
+
+    Returns:
+    - Dict with the cash allocation, the score and the feature date used.
+    """
+    if risk_tolerance in RISK_TOLERANCE_LEVELS:
+        level = RISK_TOLERANCE_LEVELS[risk_tolerance]
+    else:
+        try:
+            level = float(risk_tolerance)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid risk tolerance. Choose from 'high', 'medium', or 'low'.") from None
+
+    features, feature_date = snapshot.features_as_of(as_of)
+    coefficients = _parse_weights(weights, DEFAULT_WEIGHTS) * _parse_weights(damping, DEFAULT_DAMPING)
+    # Same scoring as calculate_scores, unrolled for a single query
+    score = coefficients[0] * (1 - features[0]) + float(np.dot(coefficients[1:], features[1:]))
+    return {
+        "risk_tolerance": risk_tolerance,
+        "cash_allocation": max(0.0, level * (1 - score)),
+        "score": score,
+        "as_of": feature_date
+    }
+
+
+class AllocationRequestHandler(BaseHTTPRequestHandler):
+    """GET /allocation?risk_tolerance=medium&weights=0.4,0.2,0.2,0.2&as_of=2024-06-28 and GET /health."""
+
+    store = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            self._send_json(200, {"status": "ok", "loaded_at": self.store.snapshot.loaded_at})
+            return
+        if url.path != "/allocation":
+            self._send_json(404, {"error": "Not found"})
+            return
+
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            self._send_json(200, answer_query(
+                self.store.snapshot,
+                params.get("risk_tolerance", "medium"),
+                params.get("weights"),
+                params.get("damping"),
+                params.get("as_of")
+            ))
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+
+    def log_message(self, format, *args):
+        # Per-request logging would dominate the latency budget
+        pass
+
+
+class UnixAllocationHandler(socketserver.StreamRequestHandler):
+    """Line protocol over a Unix socket: one JSON query per line, one JSON answer per line."""
+
+    store = None
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                query = json.loads(line)
+                response = answer_query(self.store.snapshot, **query)
+            except (ValueError, TypeError) as e:
+                response = {"error": str(e)}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(store, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_socket=None):
+    """Serve allocation queries over HTTP, or over a Unix socket when a path is given."""
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        handler = type("Handler", (UnixAllocationHandler,), {"store": store})
+        server = ThreadingUnixServer(unix_socket, handler)
+        print(f"✅ Allocation service listening on unix://{unix_socket}")
+    else:
+        handler = type("Handler", (AllocationRequestHandler,), {"store": store})
+        server = ThreadingHTTPServer((host, port), handler)
+        print(f"✅ Allocation service listening on http://{host}:{port}")
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resident cash allocation service.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix-socket", help="Serve over this Unix socket path instead of HTTP.")
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL_SECONDS,
+                        help="Seconds between checks of the feature files for updates.")
+    parser.add_argument("--no-compact", dest="compact", action="store_false",
+                        help="Hold the features as int64 dates and float64 values instead of int32 day numbers and float32 values.")
+    args = parser.parse_args()
+
+    files = [dataset_path("nifty_volatility"), dataset_path("nifty_volume"),
+             dataset_path("institutional_flows"), dataset_path("market_breadth")]
+    store = FeatureStore(files, args.poll_interval, args.compact)
+    store.start_watching()
+
+    server = serve(store, args.host, args.port, args.unix_socket)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        store.stop_watching()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import pandas as pd
+import numpy as np
+
+from dataStore import dataset_path, read_frame, write_frame
+from cashAllocationModel import (DEFAULT_WEIGHTS, FEATURE_NAMES, RISK_TOLERANCE_LEVELS, calculate_scores, get_risk_levels,
+                                 load_feature_index)
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def normalize_without_lookahead(series, window=None):
+    """
+    Min-max normalize a series using only data available up to each date.
+
+    Parameters:
+    - series: Feature series ordered by date.
+    - window: Rolling window length in rows, or None for an expanding window.
+
+    Missing values (e.g. before a metric's first observation) are left out of the range.
+
+    Returns:
+    - Series scaled between 0 and 1 (0, neutral, where the metric is missing or its observed range is still empty).
+    """
+    if window is None:
+        running_min = series.expanding(min_periods=1).min()
+        running_max = series.expanding(min_periods=1).max()
+    else:
+        running_min = series.rolling(window=window, min_periods=1).min()
+        running_max = series.rolling(window=window, min_periods=1).max()
+
+    value_range = running_max - running_min
+    normalized = (series - running_min) / value_range.where(value_range != 0)
+    return normalized.fillna(0)
+
+
+def align_backtest_features(index):
+    """
+    Join the liquidity metrics of a FeatureIndex onto the trading days.
+
+    Monthly institutional flows only become available once their month has ended,
+    so every metric is attached to the trading days with a backward as-of join.
+
+    Returns:
+    - DataFrame indexed by Date with one raw column per liquidity metric (NaN before the
+      metric's first observation, so no made-up value enters its normalization range).
+    """
+    # Trading days are the dates with both volatility and volume observations
+    calendar = index.dates("volatility").intersection(index.dates("volume"))
+    features = index.align(calendar, FEATURE_NAMES)
+
+    # Infinite ratios and missing observations carry the last observed value
+    features = features.replace([np.inf, -np.inf], np.nan).ffill()
+    return features
+
+
+def load_backtest_features(volatility_file, volume_file, institutional_flows_file, market_breadth_file):
+    """Load the feature files and join them on the trading days (see align_backtest_features)."""
+    index = load_feature_index(volatility_file, volume_file, institutional_flows_file, market_breadth_file)
+    return align_backtest_features(index)
+
+
+def calculate_allocation_path(features, weights=None, risk_tolerances=("high", "medium", "low"), damping=None, window=None):
+    """
+    Calculate the cash allocation for every date in a single vectorized pass.
+
+    Parameters:
+    - features: Raw features as returned by load_backtest_features.
+    - weights: Dict or vector of metric weights (defaults to the model weights).
+    - risk_tolerances: Risk tolerance names or numeric maximum cash levels.
+    - damping: Dict or vector of damping factors (defaults to the model damping).
+    - window: Rolling normalization window in rows, or None for expanding normalization.
+
+    Returns:
+    - DataFrame indexed by Date with one cash allocation (%) column per risk tolerance.
+    """
+    for name, parameters in [("weights", weights), ("damping", damping)]:
+        if parameters is not None and not isinstance(parameters, dict) and np.ndim(parameters) > 1 and len(parameters) != 1:
+            raise ValueError(f"Expected one set of {name}, got {len(parameters)}; score weight grids with calculate_scores.")
+    normalized = features.apply(normalize_without_lookahead, window=window)
+    scores = calculate_scores(normalized.to_numpy(), weights if weights is not None else DEFAULT_WEIGHTS, damping)[:, 0]
+    levels = get_risk_levels(risk_tolerances)
+    allocations = np.maximum(0, levels[np.newaxis, :] * (1 - scores[:, np.newaxis]))
+    return pd.DataFrame(allocations, index=features.index, columns=list(risk_tolerances))
+
+
+def max_drawdown(equity_curve):
+    """Return the largest peak-to-trough decline of an equity curve (as a positive fraction)."""
+    drawdowns = 1 - equity_curve / np.maximum.accumulate(equity_curve)
+    return float(np.max(drawdowns)) if len(drawdowns) else 0.0
+
+
+def calculate_backtest_statistics(allocations, prices):
+    """
+    Calculate turnover and drawdown statistics for an allocation path.
+
+    The allocation decided on a date is applied to the following day's return,
+    with the remaining (non-cash) share of the portfolio invested in the index.
+
+    Parameters:
+    - allocations: Cash allocation path as returned by calculate_allocation_path.
+    - prices: Close price series of the index, indexed by Date.
+
+    Returns:
+    - DataFrame with one row of statistics per risk tolerance.
+    """
+    prices = prices.reindex(allocations.index).ffill()
+    next_returns = prices.pct_change().shift(-1).fillna(0).to_numpy()
+
+    cash_weights = allocations.to_numpy() / 100
+    portfolio_returns = (1 - cash_weights) * next_returns[:, np.newaxis]
+    equity_curves = np.cumprod(1 + portfolio_returns, axis=0)
+    benchmark_curve = np.cumprod(1 + next_returns)
+
+    daily_turnover = np.abs(np.diff(cash_weights, axis=0))
+    years = max(len(allocations) / TRADING_DAYS_PER_YEAR, 1 / TRADING_DAYS_PER_YEAR)
+
+    statistics = []
+    for column, risk_tolerance in enumerate(allocations.columns):
+        equity_curve = equity_curves[:, column]
+        statistics.append({
+            "Risk Tolerance": risk_tolerance,
+            "Average Cash Allocation": float(allocations.iloc[:, column].mean()),
+            "Annual Turnover": float(daily_turnover[:, column].sum() / years),
+            "Total Return": float(equity_curve[-1] - 1),
+            "Max Drawdown": max_drawdown(equity_curve),
+            "Benchmark Max Drawdown": max_drawdown(benchmark_curve)
+        })
+
+    return pd.DataFrame(statistics)
+
+
+def run_backtest(volatility_file, volume_file, institutional_flows_file, market_breadth_file, price_file,
+                 weights=None, risk_tolerances=("high", "medium", "low"), damping=None, window=None):
+    """
+    Backtest the cash allocation model over the full feature history.
+
+    Parameters:
+    - volatility_file, volume_file, institutional_flows_file, market_breadth_file: Feature datasets.
+    - price_file: Processed index dataset with Date and Close columns.
+    - weights, risk_tolerances, damping, window: See calculate_allocation_path.
+
+    Returns:
+    - Tuple of (allocation path DataFrame, statistics DataFrame).
+    """
+    features = load_backtest_features(volatility_file, volume_file, institutional_flows_file, market_breadth_file)
+    prices = read_frame(price_file, columns=["Date", "Close"], parse_dates=["Date"]).set_index("Date")["Close"]
+
+    allocations = calculate_allocation_path(features, weights, risk_tolerances, damping, window)
+    statistics = calculate_backtest_statistics(allocations, prices)
+    return allocations, statistics
+
+
+def main():
+    # File paths
+    volatility_file = dataset_path("nifty_volatility")
+    volume_file = dataset_path("nifty_volume")
+    institutional_flows_file = dataset_path("institutional_flows")
+    market_breadth_file = dataset_path("market_breadth")
+    price_file = dataset_path("processed_nifty_50_data")
+
+    allocations, statistics = run_backtest(
+        volatility_file, volume_file, institutional_flows_file, market_breadth_file, price_file,
+        risk_tolerances=list(RISK_TOLERANCE_LEVELS)
+    )
+
+    write_frame(allocations.reset_index(), dataset_path("backtest_allocations"))
+    print(statistics.to_string(index=False))
+    print("✅ Backtest completed and allocation path saved!")
+
+
+if __name__ == "__main__":
+    main()
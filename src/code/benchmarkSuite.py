@@ -0,0 +1,259 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+import numpy as np
+
+import featureEngineering
+import statisticsCache
+from cashAllocationModel import calculate_cash_allocation_batch, load_latest_features
+from universeFeatures import calculate_universe_features
+
+DEFAULT_ROWS = [1000, 100000, 1000000]
+DEFAULT_TICKERS = [1, 10, 100, 1000]
+# Universe benchmarks use a fixed history length so only the ticker count varies
+UNIVERSE_ROWS = 2500
+
+
+def _dates(rows, start="2000-01-03"):
+    """Business days for daily-sized histories, minute bars beyond what fits before 2262."""
+    if rows <= 50000:
+        return pd.bdate_range(start, periods=rows)
+    return pd.date_range(start, periods=rows, freq="min")
+
+
+def generate_ohlcv(rows, seed=0, start_price=17500.0, start="2000-01-03"):
+    """
+    Generate a seeded synthetic OHLCV series shaped like nifty_50_data.csv.
+
+    Returns:
+    - DataFrame with Date, Close, High, Low, Open and Volume columns.
+    """
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0003, 0.01, rows)
+    close = start_price * np.exp(np.cumsum(returns))
+    open_price = close * np.exp(rng.normal(0, 0.004, rows))
+    high = np.maximum(open_price, close) * np.exp(np.abs(rng.normal(0, 0.004, rows)))
+    low = np.minimum(open_price, close) * np.exp(-np.abs(rng.normal(0, 0.004, rows)))
+    volume = rng.integers(150000, 600000, rows)
+    # Some sessions report no volume, like the Midcap 100 data
+    volume[rng.random(rows) < 0.05] = 0
+
+    return pd.DataFrame({
+        "Date": _dates(rows, start),
+        "Close": close,
+        "High": high,
+        "Low": low,
+        "Open": open_price,
+        "Volume": volume
+    })
+
+
+def write_raw_price_csv(data, file_path, ticker="^NSEI"):
+    """Write OHLCV data with the three header rows produced by yfinance."""
+    with open(file_path, "w") as f:
+        f.write("Price,Close,High,Low,Open,Volume\n")
+        f.write(f"Ticker,{ticker},{ticker},{ticker},{ticker},{ticker}\n")
+        f.write("Date,,,,,\n")
+        data.to_csv(f, header=False, index=False)
+
+
+def generate_fii_dii_table(months=36, seed=0):
+    """Generate a seeded monthly FII/DII table shaped like fii_dii_data.csv (latest month first)."""
+    rng = np.random.default_rng(seed)
+    month_ends = pd.date_range(end="2025-03-31", periods=months, freq="M")[::-1]
+    fii_buy, fii_sell = rng.uniform(2e5, 4e5, months), rng.uniform(2e5, 4e5, months)
+    dii_buy, dii_sell = rng.uniform(1.5e5, 4e5, months), rng.uniform(1.5e5, 3e5, months)
+    nifty = rng.uniform(16000, 26000, months)
+
+    columns = pd.MultiIndex.from_tuples([
+        ("MONTH", "MONTH"),
+        ("FII (INR Crore)", "Buy Amount"), ("FII (INR Crore)", "Sell Amount"), ("FII (INR Crore)", "Net Amount"),
+        ("DII (INR Crore)", "Buy Amount"), ("DII (INR Crore)", "Sell Amount"), ("DII (INR Crore)", "Net Amount"),
+        ("NIFTY", "NIFTY")
+    ])
+    return pd.DataFrame({
+        columns[0]: month_ends.strftime("%b %Y"),
+        columns[1]: fii_buy.round(2), columns[2]: fii_sell.round(2), columns[3]: (fii_buy - fii_sell).round(2),
+        columns[4]: dii_buy.round(2), columns[5]: dii_sell.round(2), columns[6]: (dii_buy - dii_sell).round(2),
+        columns[7]: [f"{value:.2f} ({date:%d %b, %Y})" for value, date in zip(nifty, month_ends)]
+    }, columns=columns)
+
+
+def generate_rbi_table():
+    """Generate an RBI policy rates table shaped like rbi_policy_rates.csv."""
+    return pd.DataFrame({
+        "0": ["Policy Repo Rate", "Standing Deposit Facility Rate", "Marginal Standing Facility Rate",
+              "Bank Rate", "Fixed Reverse Repo Rate"],
+        "1": [":  6.25%", ":  6.00%", ":  6.50%", ":  6.50%", ":  3.35%"]
+    })
+
+
+def measure(function, *args, repeat=3, **kwargs):
+    """
+    Time a stage (best of `repeat` runs) and measure its peak traced memory in a separate run.
+
+    The statistics cache is disabled meanwhile, so repeated runs time the stage rather than
+    cache hits and the temporary benchmark files are not cached in the data directory.
+
+    Returns:
+    - Tuple of (seconds, peak_bytes, result of the last call).
+    """
+    enabled, statisticsCache.ENABLED = statisticsCache.ENABLED, False
+    try:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = function(*args, **kwargs)
+            timings.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        function(*args, **kwargs)
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        statisticsCache.ENABLED = enabled
+    return min(timings), peak_bytes, result
+
+
+def _record(results, stage, rows, tickers, seconds, peak_bytes):
+    results.append({"stage": stage, "rows": rows, "tickers": tickers, "seconds": seconds, "peak_bytes": peak_bytes})
+    print(f"{stage:<44} rows={rows:<9} tickers={tickers:<5} {seconds * 1000:10.2f} ms  {peak_bytes / 2 ** 20:9.2f} MiB")
+
+
+def benchmark_feature_stages(rows, work_dir, results, repeat=3, seed=0):
+    """Benchmark preprocessing, every calculate_* function and allocation scoring on `rows` synthetic bars."""
+    nifty_raw = os.path.join(work_dir, f"nifty_{rows}.csv")
+    midcap_raw = os.path.join(work_dir, f"midcap_{rows}.csv")
+    nifty_processed = os.path.join(work_dir, f"processed_nifty_{rows}.csv")
+    midcap_processed = os.path.join(work_dir, f"processed_midcap_{rows}.csv")
+    fii_dii_file = os.path.join(work_dir, "fii_dii.csv")
+    rbi_file = os.path.join(work_dir, "rbi.csv")
+
+    write_raw_price_csv(generate_ohlcv(rows, seed), nifty_raw, "^NSEI")
+    write_raw_price_csv(generate_ohlcv(rows, seed + 1, 8500.0), midcap_raw, "^NSEMDCP50")
+    generate_fii_dii_table(seed=seed).to_csv(fii_dii_file, index=False)
+    generate_rbi_table().to_csv(rbi_file, index=False)
+
+    seconds, peak, _ = measure(featureEngineering.preprocess_csv, nifty_raw, nifty_processed, repeat=repeat)
+    _record(results, "preprocess_csv", rows, 1, seconds, peak)
+    featureEngineering.preprocess_csv(midcap_raw, midcap_processed)
+
+    seconds, peak, (volatility, _) = measure(featureEngineering.calculate_volatility_metrics, nifty_processed, midcap_processed, repeat=repeat)
+    _record(results, "calculate_volatility_metrics", rows, 2, seconds, peak)
+
+    seconds, peak, (volume, _) = measure(featureEngineering.calculate_traded_volume, nifty_processed, midcap_processed, repeat=repeat)
+    _record(results, "calculate_traded_volume", rows, 2, seconds, peak)
+
+    seconds, peak, flows = measure(featureEngineering.calculate_institutional_flow_metrics, fii_dii_file, repeat=repeat)
+    _record(results, "calculate_institutional_flow_metrics", len(flows), 1, seconds, peak)
+
+    seconds, peak, breadth = measure(featureEngineering.calculate_market_breadth, nifty_raw, repeat=repeat)
+    _record(results, "calculate_market_breadth", rows, 1, seconds, peak)
+
+    seconds, peak, _ = measure(featureEngineering.calculate_interest_rate_metrics, rbi_file, repeat=repeat)
+    _record(results, "calculate_interest_rate_metrics", 5, 1, seconds, peak)
+
+    # Allocation scoring from the feature outputs
+    feature_files = []
+    for name, data in [("volatility", volatility), ("volume", volume), ("flows", flows), ("breadth", breadth)]:
+        feature_files.append(os.path.join(work_dir, f"{name}_{rows}.csv"))
+        data.to_csv(feature_files[-1], index=False)
+
+    seconds, peak, features = measure(load_latest_features, *feature_files, repeat=repeat)
+    _record(results, "load_latest_features", rows, 1, seconds, peak)
+
+    weights = np.random.default_rng(seed).dirichlet(np.ones(4), size=100000)
+    seconds, peak, _ = measure(calculate_cash_allocation_batch, features, weights, repeat=repeat)
+    _record(results, "calculate_cash_allocation_batch[100000x3]", rows, 1, seconds, peak)
+
+
+def benchmark_universe(tickers, results, rows=UNIVERSE_ROWS, repeat=3, seed=0):
+    """Benchmark the universe feature pipeline on `tickers` synthetic series."""
+    dates = _dates(rows)
+    fields = {"Close": [], "High": [], "Low": [], "Open": [], "Volume": []}
+    for ticker in range(tickers):
+        data = generate_ohlcv(rows, seed + ticker)
+        for field in fields:
+            fields[field].append(data[field].to_numpy())
+    panel = {field: pd.DataFrame(np.column_stack(values), index=dates) for field, values in fields.items()}
+
+    seconds, peak, _ = measure(calculate_universe_features, panel, 0, repeat=repeat)
+    _record(results, "calculate_universe_features", rows, tickers, seconds, peak)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(current, baseline_file):
+    """Print the relative change of each stage against a previous results file."""
+    with open(baseline_file) as f:
+        baseline = json.load(f)
+    previous = {(entry["stage"], entry["rows"], entry["tickers"]): entry for entry in baseline["results"]}
+
+    print(f"\nComparison against {baseline.get('commit') or baseline_file}:")
+    for entry in current["results"]:
+        old = previous.get((entry["stage"], entry["rows"], entry["tickers"]))
+        if old is None or old["seconds"] == 0:
+            continue
+        time_change = entry["seconds"] / old["seconds"] - 1
+        memory_change = entry["peak_bytes"] / old["peak_bytes"] - 1 if old["peak_bytes"] else 0
+        print(f"{entry['stage']:<44} rows={entry['rows']:<9} tickers={entry['tickers']:<5} time {time_change:+7.1%}  memory {memory_change:+7.1%}")
+
+
+def run_benchmarks(rows=DEFAULT_ROWS, tickers=DEFAULT_TICKERS, repeat=3, seed=0):
+    """
+    Run every benchmark offline on synthetic data.
+
+    Returns:
+    - Dict with run metadata and one result per stage and size.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for row_count in rows:
+            benchmark_feature_stages(row_count, work_dir, results, repeat, seed)
+    for ticker_count in tickers:
+        benchmark_universe(ticker_count, results, repeat=repeat, seed=seed)
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": pd.Timestamp.now().isoformat(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "seed": seed,
+        "results": results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage on seeded synthetic data.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="History lengths to benchmark.")
+    parser.add_argument("--tickers", type=int, nargs="+", default=DEFAULT_TICKERS, help="Universe sizes to benchmark.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage (best is reported).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json", help="Machine-readable results file.")
+    parser.add_argument("--compare", help="Previous results file to compare against.")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.rows, args.tickers, args.repeat, args.seed)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Benchmark results saved to {args.output}")
+
+    if args.compare:
+        compare_results(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,101 +1,252 @@
+import os
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 
+from compactFeatures import FeatureTable
+from dataStore import dataset_path, read_frame
+from featureIndex import FeatureIndex
+from instrumentation import instrumented
+from statisticsCache import get_statistics_cache, normalized_last
+
+# Maximum cash allocation (in %) for each risk tolerance level
+RISK_TOLERANCE_LEVELS = {
+    "high": 20,
+    "medium": 30,
+    "low": 50
+}
+
+# Order of the liquidity metrics in every feature / weight vector
+FEATURE_NAMES = ["volatility", "volume", "institutional_flows", "market_breadth"]
+
+# Stored column of each metric and the column its observations are dated by
+FEATURE_COLUMNS = {
+    "volatility": ("30-Day Volatility", {"date_column": "Date"}),
+    "volume": ("Average Volume", {"date_column": "Date"}),
+    "institutional_flows": ("FII/DII Ratio", {"month_column": "MONTH"}),
+    "market_breadth": ("Advance-Decline Ratio", {"date_column": "Date"})
+}
+
+DEFAULT_WEIGHTS = {
+    "volatility": 0.4,
+    "volume": 0.2,
+    "institutional_flows": 0.2,
+    "market_breadth": 0.2
+}
+
+# Damping applied to each weighted metric (volatility is not damped)
+DEFAULT_DAMPING = {
+    "volatility": 1.0,
+    "volume": 0.8,
+    "institutional_flows": 0.7,
+    "market_breadth": 0.6
+}
+
+
+@instrumented(paths=["volatility_file", "volume_file", "institutional_flows_file", "market_breadth_file"])
+def load_feature_index(volatility_file, volume_file, institutional_flows_file, market_breadth_file, compact=True):
+    """
+    Load the feature files into a date-aligned FeatureIndex keyed by FEATURE_NAMES.
+
+    The monthly flows table (latest month first) is keyed by month end, so every metric
+    is looked up by date rather than by row position.
+
+    By default, each metric is loaded into a compactFeatures.FeatureTable (int32 day numbers,
+    float32 values) that the index references without copying. compact=False keeps int64
+    nanosecond dates and float64 values instead.
+    """
+    if compact:
+        index = FeatureIndex.compact()
+        files = [volatility_file, volume_file, institutional_flows_file, market_breadth_file]
+        for name, file in zip(FEATURE_NAMES, files):
+            column, dates = FEATURE_COLUMNS[name]
+            index.add_table(FeatureTable.read(file, [column], **dates), names=[name])
+        return index
+
+    volatility_data = read_frame(volatility_file, columns=["Date", "30-Day Volatility"], parse_dates=["Date"])
+    volume_data = read_frame(volume_file, columns=["Date", "Average Volume"], parse_dates=["Date"])
+    institutional_flows_data = read_frame(institutional_flows_file, columns=["MONTH", "FII/DII Ratio"])
+    market_breadth_data = read_frame(market_breadth_file, columns=["Date", "Advance-Decline Ratio"], parse_dates=["Date"])
+
+    return (
+        FeatureIndex()
+        .add_frame("volatility", volatility_data, "30-Day Volatility")
+        .add_frame("volume", volume_data, "Average Volume")
+        .add_monthly("institutional_flows", institutional_flows_data, "FII/DII Ratio")
+        .add_frame("market_breadth", market_breadth_data, "Advance-Decline Ratio")
+    )
+
+
+def latest_features(index, as_of=None):
+    """
+    Return the latest normalized liquidity metrics of a FeatureIndex.
+
+    Parameters:
+    - index: FeatureIndex as returned by load_feature_index.
+    - as_of: Optional date; only data observed on or before it is normalized and used.
+
+    Returns:
+    - NumPy array ordered as FEATURE_NAMES (volatility, volume, institutional flows, market breadth).
+    """
+    as_of = pd.Timestamp(as_of) if as_of is not None else index.last_date()
+
+    features = []
+    for name in FEATURE_NAMES:
+        # Min-max normalized latest value, computed on a view of the stored history
+        _, history = index.view(name, end=as_of)
+        if len(history) == 0 or np.isnan(history[-1]) or np.isnan(history).all():
+            # Metrics not observed yet, or without a range to scale against, are neutral
+            features.append(0.0)
+            continue
+        low, high = np.float64(np.nanmin(history)), np.float64(np.nanmax(history))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            value = (np.float64(history[-1]) - low) / (high - low)
+        features.append(0.0 if np.isnan(value) else value)
+    return np.array(features)
+
+
+@instrumented(paths=["volatility_file", "volume_file", "institutional_flows_file", "market_breadth_file"])
+def load_latest_features(volatility_file, volume_file, institutional_flows_file, market_breadth_file, as_of=None):
+    """
+    Load the feature files once and return the latest normalized liquidity metrics.
+
+    Parameters:
+    - as_of: Optional date; only data observed on or before it is normalized and used.
+
+    Returns:
+    - NumPy array ordered as FEATURE_NAMES (volatility, volume, institutional flows, market breadth).
+    """
+    cache = get_statistics_cache()
+    files = [volatility_file, volume_file, institutional_flows_file, market_breadth_file]
+    if as_of is None and cache is not None and all(isinstance(file, (str, os.PathLike)) for file in files):
+        # Unchanged inputs reuse their cached extrema instead of rescanning every column
+        return np.array([
+            normalized_last(cache.statistics(file, column, **dates))
+            for file, (column, dates) in zip(files, FEATURE_COLUMNS.values())
+        ])
+
+    index = load_feature_index(volatility_file, volume_file, institutional_flows_file, market_breadth_file)
+    return latest_features(index, as_of)
+
+
+def _as_parameter_matrix(values, defaults):
+    """Convert a dict, vector or matrix of per-metric parameters into an (N, 4) array."""
+    if values is None:
+        values = defaults
+    if isinstance(values, dict):
+        values = [{**defaults, **values}[name] for name in FEATURE_NAMES]
+    matrix = np.atleast_2d(np.asarray(values, dtype=float))
+    if matrix.shape[-1] != len(FEATURE_NAMES):
+        raise ValueError(f"Expected {len(FEATURE_NAMES)} values per row ({', '.join(FEATURE_NAMES)}), got {matrix.shape[-1]}.")
+    return matrix
+
+
+def get_risk_levels(risk_tolerances):
+    """Map risk tolerance names (or numeric maximum cash levels) to an array of levels."""
+    levels = []
+    for risk_tolerance in risk_tolerances:
+        if isinstance(risk_tolerance, str):
+            if risk_tolerance not in RISK_TOLERANCE_LEVELS:
+                raise ValueError("Invalid risk tolerance. Choose from 'high', 'medium', or 'low'.")
+            levels.append(RISK_TOLERANCE_LEVELS[risk_tolerance])
+        else:
+            levels.append(float(risk_tolerance))
+    return np.asarray(levels, dtype=float)
+
+
+@instrumented
+def calculate_scores(features, weights=None, damping=None):
+    """
+    Calculate the liquidity score for one or many feature snapshots and weight sets.
+
+    Parameters:
+    - features: Normalized metrics ordered as FEATURE_NAMES, shape (4,) or (T, 4).
+    - weights: Dict, vector (4,) or matrix (N, 4) of metric weights.
+    - damping: Dict, vector (4,) or matrix (N, 4) of damping factors.
+
+    Returns:
+    - Scores with shape (N,) for a single snapshot or (T, N) for many.
+    """
+    features = np.asarray(features, dtype=float)
+    coefficients = _as_parameter_matrix(weights, DEFAULT_WEIGHTS) * _as_parameter_matrix(damping, DEFAULT_DAMPING)
+    # Low volatility is favourable, so its signal is inverted
+    signals = features.copy()
+    signals[..., 0] = 1 - signals[..., 0]
+    return signals @ coefficients.T
+
+
+@instrumented
+def calculate_cash_allocation_batch(features, weights=None, risk_tolerances=("high", "medium", "low"),
+                                    damping=None, as_frame=False):
+    """
+    Score an N x M grid of weight sets x risk profiles in a single matrix operation.
+
+    Parameters:
+    - features: Latest normalized metrics, as returned by load_latest_features.
+    - weights: Dict, vector (4,) or matrix (N, 4) of metric weights.
+    - risk_tolerances: Risk tolerance names ("high", "medium", "low") or numeric maximum cash levels.
+    - damping: Dict, vector (4,) or matrix (N, 4) of damping factors.
+    - as_frame: Return a DataFrame with one column per risk tolerance instead of an array.
+
+    Returns:
+    - (N, M) array (or DataFrame) of recommended cash allocation percentages.
+    """
+    scores = calculate_scores(features, weights, damping)
+    levels = get_risk_levels(risk_tolerances)
+    allocations = np.maximum(0, levels[np.newaxis, :] * (1 - scores[:, np.newaxis]))
+
+    if as_frame:
+        return pd.DataFrame(allocations, columns=list(risk_tolerances))
+    return allocations
+
+
+@instrumented(paths=["volatility_file", "volume_file", "institutional_flows_file", "market_breadth_file"])
 def calculate_cash_allocation(volatility_file, volume_file, institutional_flows_file, market_breadth_file, risk_tolerance="medium"):
     """
     Calculate the optimal cash allocation percentage based on liquidity metrics.
     
     Parameters:
-    - volatility_file: Path to the Nifty volatility CSV file.
-    - volume_file: Path to the Nifty traded volume CSV file.
-    - institutional_flows_file: Path to the institutional flows CSV file.
-    - market_breadth_file: Path to the market breadth CSV file.
+    - volatility_file: Path to the Nifty volatility dataset (CSV or Parquet).
+    - volume_file: Path to the Nifty traded volume dataset (CSV or Parquet).
+    - institutional_flows_file: Path to the institutional flows dataset (CSV or Parquet).
+    - market_breadth_file: Path to the market breadth dataset (CSV or Parquet).
     - risk_tolerance: User's risk tolerance ("high", "medium", "low").
     
     Returns:
     - Recommended cash allocation percentage.
     """
-    # Load the data
-    volatility_data = pd.read_csv(volatility_file)
-    volume_data = pd.read_csv(volume_file)
-    institutional_flows_data = pd.read_csv(institutional_flows_file)
-    market_breadth_data = pd.read_csv(market_breadth_file)
-
-    # Normalize the metrics (scaling between 0 and 1)
-    volatility_data["30-Day Volatility"] = (volatility_data["30-Day Volatility"] - volatility_data["30-Day Volatility"].min()) / \
-                                           (volatility_data["30-Day Volatility"].max() - volatility_data["30-Day Volatility"].min())
-    volume_data["Average Volume"] = (volume_data["Average Volume"] - volume_data["Average Volume"].min()) / \
-                                     (volume_data["Average Volume"].max() - volume_data["Average Volume"].min())
-    institutional_flows_data["FII/DII Ratio"] = (institutional_flows_data["FII/DII Ratio"] - institutional_flows_data["FII/DII Ratio"].min()) / \
-                                                (institutional_flows_data["FII/DII Ratio"].max() - institutional_flows_data["FII/DII Ratio"].min())
-    market_breadth_data["Advance-Decline Ratio"] = (market_breadth_data["Advance-Decline Ratio"] - market_breadth_data["Advance-Decline Ratio"].min()) / \
-                                                   (market_breadth_data["Advance-Decline Ratio"].max() - market_breadth_data["Advance-Decline Ratio"].min())
-
-
-    # print(volatility_data)
-    # print(volume_data)
-    # print(institutional_flows_data)
-    # print(market_breadth_data)
-    # Weighted scoring system
-    weights = {
-        "volatility": 0.4,
-        "volume": 0.2,
-        "institutional_flows": 0.2,
-        "market_breadth": 0.2
-    }
-
-    # Calculate scores
-    latest_volatility = volatility_data["30-Day Volatility"].iloc[-1]
-    latest_volume = volume_data["Average Volume"].iloc[-1]
-    latest_institutional_flows = institutional_flows_data["FII/DII Ratio"].iloc[-1]
-    latest_market_breadth = market_breadth_data["Advance-Decline Ratio"].iloc[-1]
-
-    score = (
-        weights["volatility"] * (1 - latest_volatility) + 
-        weights["volume"] * latest_volume * 0.8 +
-        weights["institutional_flows"] * latest_institutional_flows * 0.7 +
-        weights["market_breadth"] * latest_market_breadth * 0.6
-    )
-
-    # Adjust cash allocation based on risk tolerance
-    if risk_tolerance == "high":
-        cash_allocation = max(0, 20 - score * 20)  # Lower cash allocation for high risk tolerance
-    elif risk_tolerance == "medium":
-        cash_allocation = max(0, 30 - score * 30)  # Moderate cash allocation for medium risk tolerance
-    elif risk_tolerance == "low":
-        cash_allocation = max(0, 50 - score * 50)  # Higher cash allocation for low risk tolerance
-    else:
+    if risk_tolerance not in RISK_TOLERANCE_LEVELS:
         raise ValueError("Invalid risk tolerance. Choose from 'high', 'medium', or 'low'.")
 
-    # Visualization
-    metrics = ["Volatility", "Volume", "Institutional Flows", "Market Breadth"]
-    values = [latest_volatility, latest_volume, latest_institutional_flows, latest_market_breadth]
-    plt.figure(figsize=(10, 6))
-    plt.bar(metrics, values, color=["blue", "green", "orange", "purple"])
-    plt.title(f"Liquidity Metrics and Cash Allocation (Risk Tolerance: {risk_tolerance.capitalize()})")
-    plt.ylabel("Normalized Score")
-    plt.grid(axis="y")
-    plt.tight_layout()
-    plt.savefig("../screenshots/cash_allocation_metrics.png")
-    plt.close()
+    # Load the data and normalize the metrics (scaling between 0 and 1)
+    features = load_latest_features(volatility_file, volume_file, institutional_flows_file, market_breadth_file)
+
+    # Weighted scoring system, adjusted for risk tolerance
+    cash_allocation = calculate_cash_allocation_batch(features, DEFAULT_WEIGHTS, [risk_tolerance])[0, 0]
 
     return cash_allocation
 
 # Example Usage
-def main():
+@instrumented
+def main(render_plots=True):
     # File paths
-    volatility_file = "../data_collections/nifty_volatility.csv"
-    volume_file = "../data_collections/nifty_volume.csv"
-    institutional_flows_file = "../data_collections/institutional_flows.csv"
-    market_breadth_file = "../data_collections/market_breadth.csv"
-
-    # Calculate cash allocation for different risk tolerances
-    for risk_tolerance in ["high", "medium", "low"]:
-        cash_allocation = calculate_cash_allocation(
-            volatility_file, volume_file, institutional_flows_file, market_breadth_file, risk_tolerance
-        )
+    volatility_file = dataset_path("nifty_volatility")
+    volume_file = dataset_path("nifty_volume")
+    institutional_flows_file = dataset_path("institutional_flows")
+    market_breadth_file = dataset_path("market_breadth")
+
+    # Load the features once and score every risk tolerance in a single pass
+    risk_tolerances = ["high", "medium", "low"]
+    features = load_latest_features(volatility_file, volume_file, institutional_flows_file, market_breadth_file)
+    cash_allocations = calculate_cash_allocation_batch(features, DEFAULT_WEIGHTS, risk_tolerances)[0]
+
+    for risk_tolerance, cash_allocation in zip(risk_tolerances, cash_allocations):
         print(f"Recommended Cash Allocation ({risk_tolerance.capitalize()} Risk): {cash_allocation:.2f}%")
 
+    # Visualization
+    if render_plots:
+        from reporting import plot_cash_allocation_metrics
+        plot_cash_allocation_metrics(features, risk_tolerances[-1])
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
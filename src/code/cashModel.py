@@ -0,0 +1,191 @@
+import argparse
+import json
+import os
+import sys
+
+CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Config keys and the environment variables the pipeline modules read them from at import time
+CONFIG_ENVIRONMENT = {
+    "data_dir": "CASH_MODEL_DATA_DIR",
+    "screenshot_dir": "CASH_MODEL_SCREENSHOT_DIR",
+    "storage": "CASH_MODEL_STORAGE",
+    "metrics_file": "CASH_MODEL_METRICS_FILE",
+    "stats_cache": "CASH_MODEL_STATS_CACHE"
+}
+
+# Config file read when --config is not given (relative paths inside it resolve against its directory)
+DEFAULT_CONFIG_FILE = os.environ.get("CASH_MODEL_CONFIG", os.path.join(CODE_DIR, "..", "cashModel.json"))
+
+PATH_KEYS = ["data_dir", "screenshot_dir", "metrics_file"]
+
+STORAGE_BACKENDS = ["csv", "parquet"]
+
+
+def validate_config(config):
+    """Check the type of every config value (paths are strings, stats_cache a boolean or 0/1)."""
+    for key, value in config.items():
+        if value is None:
+            continue
+        if key in PATH_KEYS and not isinstance(value, str):
+            raise ValueError(f"Config key '{key}' must be a path string, got {value!r}.")
+        if key == "storage" and value not in STORAGE_BACKENDS:
+            raise ValueError(f"Config key 'storage' must be one of {', '.join(STORAGE_BACKENDS)}, got {value!r}.")
+        if key == "stats_cache" and (not isinstance(value, (bool, int)) or value not in (0, 1)):
+            raise ValueError(f"Config key 'stats_cache' must be true or false, got {value!r}.")
+
+
+def load_config(config_file=None):
+    """
+    Load the pipeline config (JSON) with paths resolved against the config file's directory.
+
+    Returns:
+    - Dict of config values (empty when the default config file does not exist).
+    """
+    if config_file is None:
+        if not os.path.exists(DEFAULT_CONFIG_FILE):
+            return {}
+        config_file = DEFAULT_CONFIG_FILE
+    with open(config_file) as f:
+        config = json.load(f)
+
+    unknown = set(config) - set(CONFIG_ENVIRONMENT)
+    if unknown:
+        raise ValueError(f"Unknown config keys: {', '.join(sorted(unknown))}. Choose from {', '.join(CONFIG_ENVIRONMENT)}.")
+    validate_config(config)
+    base_dir = os.path.dirname(os.path.abspath(config_file))
+    for key in PATH_KEYS:
+        if key in config:
+            config[key] = os.path.join(base_dir, os.path.expanduser(config[key]))
+    return config
+
+
+def apply_config(config):
+    """Export the config to the environment; must run before the pipeline modules are imported."""
+    validate_config(config)
+    for key, value in config.items():
+        if value is None:
+            continue
+        # Booleans are exported as the "1" / "0" flags the modules check
+        os.environ[CONFIG_ENVIRONMENT[key]] = str(int(value)) if isinstance(value, bool) else str(value)
+    if CODE_DIR not in sys.path:
+        sys.path.insert(0, CODE_DIR)
+
+
+def risk_tolerance(value):
+    """Parse a --risk-tolerances token: a numeric maximum cash level (in %) or a risk tolerance name."""
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def risk_label(risk_tolerance):
+    if isinstance(risk_tolerance, str):
+        return f"{risk_tolerance.capitalize()} Risk"
+    return f"{risk_tolerance:g}% Max Cash"
+
+
+# Only the standard library is imported at startup: each subcommand imports the modules
+# (and heavy dependencies such as pandas, selenium or matplotlib) it needs when it runs.
+def collect(args):
+    from dataCollection import collect_all
+    from sourceCache import SourceCache
+
+    results = collect_all(cache=SourceCache(), intraday_interval=args.intraday_interval)
+    failed = [task for task, path in results.items() if path is None]
+    if failed:
+        print(f"❌ Collection failed for: {', '.join(failed)}")
+    else:
+        print("✅ Data collection completed!")
+
+
+def features(args):
+    from featurePipeline import run_feature_pipeline
+
+    statuses = run_feature_pipeline(args.stages or None, force=args.force, render_plots=not args.no_plots)
+    for stage, status in statuses.items():
+        print(f"{'✅' if status == 'ran' else '⏭️'} {stage}: {status}")
+
+
+def allocate(args):
+    if args.accounts is not None:
+        from dataStore import dataset_path
+        from portfolioAllocation import allocate_accounts, export_account_allocations
+
+        allocations = allocate_accounts(
+            args.accounts, dataset_path("nifty_volatility"), dataset_path("nifty_volume"),
+            dataset_path("institutional_flows"), dataset_path("market_breadth"), as_of=args.as_of
+        )
+        output = args.output or dataset_path("account_allocations")
+        export_account_allocations(allocations, output)
+        print(f"✅ Cash allocations of {len(allocations)} accounts saved to {output}")
+        return
+
+    from cashAllocationModel import DEFAULT_WEIGHTS, calculate_cash_allocation_batch, load_latest_features
+    from dataStore import dataset_path
+
+    features = load_latest_features(dataset_path("nifty_volatility"), dataset_path("nifty_volume"),
+                                    dataset_path("institutional_flows"), dataset_path("market_breadth"), args.as_of)
+    cash_allocations = calculate_cash_allocation_batch(features, DEFAULT_WEIGHTS, args.risk_tolerances)[0]
+    for risk_tolerance, cash_allocation in zip(args.risk_tolerances, cash_allocations):
+        print(f"Recommended Cash Allocation ({risk_label(risk_tolerance)}): {cash_allocation:.2f}%")
+
+    if not args.no_plots:
+        from reporting import plot_cash_allocation_metrics
+        plot_cash_allocation_metrics(features, args.risk_tolerances[-1])
+
+
+def run_all(args):
+    collect(args)
+    features(args)
+    allocate(args)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cashModel", description="Cash allocation model pipeline.")
+    parser.add_argument("--config", default=None, help=f"JSON config file (keys: {', '.join(CONFIG_ENVIRONMENT)}).")
+    parser.add_argument("--data-dir", default=None, help="Directory of the datasets (overrides the config).")
+    parser.add_argument("--storage", choices=STORAGE_BACKENDS, default=None, help="Storage backend (overrides the config).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    collect_parser = argparse.ArgumentParser(add_help=False)
+    collect_parser.add_argument("--intraday-interval", default=None, help="Also download intraday bars (e.g. 1m).")
+
+    features_parser = argparse.ArgumentParser(add_help=False)
+    features_parser.add_argument("--stages", nargs="*", default=None, help="Feature stages to run (with their upstream stages).")
+    features_parser.add_argument("--force", action="store_true", help="Run the stages even if their inputs are unchanged.")
+
+    allocate_parser = argparse.ArgumentParser(add_help=False)
+    allocate_parser.add_argument("--risk-tolerances", nargs="+", type=risk_tolerance, default=["high", "medium", "low"],
+                                 help="Risk tolerance names (high, medium, low) or numeric maximum cash levels (in %%).")
+    allocate_parser.add_argument("--accounts", default=None, help="Allocate every account of this accounts table instead.")
+    allocate_parser.add_argument("--output", default=None, help="Output file of the account allocations.")
+    allocate_parser.add_argument("--as-of", default=None, help="Only use data observed on or before this date.")
+
+    plots_parser = argparse.ArgumentParser(add_help=False)
+    plots_parser.add_argument("--no-plots", action="store_true", help="Skip rendering the plots.")
+
+    subparsers.add_parser("collect", parents=[collect_parser], help="Collect the source data.").set_defaults(handler=collect)
+    subparsers.add_parser("features", parents=[features_parser, plots_parser],
+                          help="Run the feature stages whose inputs changed.").set_defaults(handler=features)
+    subparsers.add_parser("allocate", parents=[allocate_parser, plots_parser],
+                          help="Calculate the cash allocation.").set_defaults(handler=allocate)
+    subparsers.add_parser("run-all", parents=[collect_parser, features_parser, allocate_parser, plots_parser],
+                          help="Collect, run the feature stages and allocate.").set_defaults(handler=run_all)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    config = load_config(args.config)
+    if args.data_dir is not None:
+        config["data_dir"] = os.path.abspath(args.data_dir)
+    if args.storage is not None:
+        config["storage"] = args.storage
+    apply_config(config)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import pandas as pd
+import numpy as np
+
+from dataStore import read_frame
+from featureIndex import MISSING_DAY, day_dates, day_numbers, month_end_dates
+
+VALUE_DTYPE = np.float32
+
+
+def _read_only(array):
+    array.flags.writeable = False
+    return array
+
+
+class FeatureTable:
+    """
+    Compact, date-sorted table of feature columns sharing one date axis.
+
+    Dates are stored as int32 day numbers and values as one contiguous float32 array per
+    column (a (columns, days) C-ordered block), half the memory of int64 dates and float64
+    values. Columns and date ranges are returned as read-only NumPy views of the stored
+    block, so readers never copy it.
+    """
+
+    def __init__(self, days, values, columns):
+        days = np.ascontiguousarray(days, dtype=np.int32)
+        values = np.ascontiguousarray(np.atleast_2d(values))
+        if values.shape != (len(columns), len(days)):
+            raise ValueError(f"Expected values of shape ({len(columns)}, {len(days)}), got {values.shape}.")
+        if len(days) > 1 and np.any(np.diff(days) <= 0):
+            raise ValueError("Day numbers must be strictly increasing.")
+        self._set(days, values, columns)
+
+    def _set(self, days, values, columns):
+        self.days = _read_only(days)
+        self.values = _read_only(values)
+        self.columns = list(columns)
+        self._positions = {column: position for position, column in enumerate(self.columns)}
+        return self
+
+    @classmethod
+    def _view(cls, days, values, columns):
+        """Wrap (already validated) array views without copying them."""
+        return cls.__new__(cls)._set(days, values, columns)
+
+    @classmethod
+    def from_frame(cls, data, value_columns, date_column="Date", dates=None, dtype=VALUE_DTYPE):
+        """
+        Build a table from the value columns of a frame keyed by its date column (or explicit dates).
+
+        Rows are sorted by date; later duplicates of a date win and rows without a date are dropped.
+        """
+        days = day_numbers(data[date_column] if dates is None else dates)
+        values = np.vstack([pd.to_numeric(data[column], errors="coerce").to_numpy(dtype=float) for column in value_columns]) \
+            if value_columns else np.empty((0, len(days)))
+
+        valid = days != MISSING_DAY
+        order = np.argsort(days[valid], kind="stable")
+        days, values = days[valid][order], values[:, valid][:, order]
+        # Keep the last row of each date
+        last = np.append(days[1:] != days[:-1], True) if len(days) else np.zeros(0, dtype=bool)
+        return cls(days[last], values[:, last].astype(dtype), value_columns)
+
+    @classmethod
+    def from_monthly(cls, data, value_columns, month_column="MONTH", dtype=VALUE_DTYPE):
+        """Build a table from a monthly frame (in any row order), keyed by each month's end."""
+        return cls.from_frame(data, value_columns, dates=month_end_dates(data[month_column]), dtype=dtype)
+
+    @classmethod
+    def read(cls, source, value_columns, date_column="Date", month_column=None, dtype=VALUE_DTYPE):
+        """Load only the date and value columns of a CSV or Parquet dataset into a table."""
+        key_column = month_column or date_column
+        data = read_frame(source, columns=[key_column] + list(value_columns))
+        if month_column is not None:
+            return cls.from_monthly(data, value_columns, month_column, dtype)
+        return cls.from_frame(data, value_columns, date_column, dtype=dtype)
+
+    def __len__(self):
+        return len(self.days)
+
+    @property
+    def nbytes(self):
+        return self.days.nbytes + self.values.nbytes
+
+    def _stop(self, end):
+        return len(self.days) if end is None else int(np.searchsorted(self.days, day_numbers([end])[0], side="right"))
+
+    def _start(self, start):
+        return 0 if start is None else int(np.searchsorted(self.days, day_numbers([start])[0], side="left"))
+
+    def column(self, name, start=None, end=None):
+        """Return a read-only view of one column's values (optionally between two dates, inclusive)."""
+        return self.values[self._positions[name], self._start(start):self._stop(end)]
+
+    def view(self, start=None, end=None, columns=None):
+        """Return a table over a date range (inclusive) and subset of columns sharing this table's memory."""
+        rows = slice(self._start(start), self._stop(end))
+        if columns is None:
+            return FeatureTable._view(self.days[rows], self.values[:, rows], self.columns)
+        positions = [self._positions[column] for column in columns]
+        if positions == list(range(positions[0], positions[0] + len(positions))):
+            block = self.values[positions[0]:positions[0] + len(positions), rows]
+        else:
+            # Non-adjacent columns cannot be a view of the block
+            block = self.values[positions][:, rows]
+        return FeatureTable._view(self.days[rows], block, columns)
+
+    @property
+    def dates(self):
+        return day_dates(self.days)
+
+    def to_frame(self):
+        """Materialize the table as a DataFrame indexed by Date (float64 values)."""
+        return pd.DataFrame(self.values.T.astype(float), index=self.dates, columns=self.columns)
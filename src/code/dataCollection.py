@@ -1,167 +1,444 @@
 import os
+import queue
+import threading
 import pandas as pd
-import yfinance as yf
-from selenium.webdriver.common.by import By
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from io import StringIO
 
+from dataStore import DATA_DIR, dataset_path, is_parquet, write_frame
+from instrumentation import instrumented
+from sourceCache import SourceCache
+
 # Ensure the output directory exists
-OUTPUT_DIR = "../data_collections"
+OUTPUT_DIR = DATA_DIR
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-def fetch_nifty_data():
-    """Fetch Nifty 50, Midcap 100, Next 50, and India VIX data using yfinance."""
-    tickers = {
-        "Nifty 50": "^NSEI",
-        "Nifty Midcap 100": "^NSEMDCP50",
-        "Nifty Next 50": "^NSMIDCP",
-        "INDIA VIX": "^INDIAVIX"
-    }
+TICKERS = {
+    "Nifty 50": "^NSEI",
+    "Nifty Midcap 100": "^NSEMDCP50",
+    "Nifty Next 50": "^NSMIDCP",
+    "INDIA VIX": "^INDIAVIX"
+}
 
-    for name, ticker in tickers.items():
-        try:
-            data = None
-            if name == "INDIA VIX":
-                data = yf.download("^INDIAVIX", period="3y", interval="1d")
-            else:
-                data = yf.download(ticker, start="2022-02-01", end="2025-02-01", interval="1d")
-            if data.empty:
-                continue
-            file_path = os.path.join(OUTPUT_DIR, f"{name.replace(' ', '_').lower()}_data.csv")
-            data.to_csv(file_path)
-            print(f"{name} data downloaded successfully to {file_path}.")
-        except Exception as e:
-            print(f"Error fetching data for {name}: {e}")
+# Pages scraped with Selenium (override with file:// URLs or a local server for testing)
+SOURCE_URLS = {
+    "fii_dii": "https://www.niftytrader.in/fii-dii-data",
+    "rbi": "https://rbi.org.in/",
+    "sebi": "https://www.sebi.gov.in/sebiweb/other/OtherAction.do?doMfd=yes&type=1"
+}
 
+# Maximum time (in seconds) to wait for each source's page and tables to load
+SOURCE_TIMEOUTS = {
+    "yfinance": 60,
+    "fii_dii": 30,
+    "rbi": 30,
+    "sebi": 30
+}
 
-def scrape_fii_dii_data():
-    """Scrape FII/DII data from NiftyTrader using Selenium."""
-    url = "https://www.niftytrader.in/fii-dii-data"
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 2
+
+# Price columns (and their order) of the saved yfinance files
+PRICE_COLUMNS = ["Close", "High", "Low", "Open", "Volume"]
+DAILY_INTERVALS = ["1d", "5d", "1wk", "1mo", "3mo"]
+
+
+class EmptyDownloadError(ValueError):
+    """yfinance returned no rows (it reports most failures this way instead of raising)."""
+
+
+# selenium, webdriver_manager and yfinance are imported by the functions using them, so that
+# the module (and its parsers) can be imported and tested without them.
+
+
+@instrumented
+def create_driver(driver_path=None):
+    """Start a headless Chrome WebDriver."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
 
-    # Set up Selenium WebDriver
     options = Options()
     options.add_argument("--headless")
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
 
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+    if driver_path is None:
+        from webdriver_manager.chrome import ChromeDriverManager
+        driver_path = ChromeDriverManager().install()
+    service = Service(driver_path)
+    return webdriver.Chrome(service=service, options=options)
+
+
+class WebDriverPool:
+    """Reusable pool of headless browsers shared by the scrapers."""
+
+    def __init__(self, size=2, driver_factory=None):
+        self.size = size
+        self._driver_factory = driver_factory
+        self._idle = queue.Queue()
+        self._drivers = []
+        self._lock = threading.Lock()
+
+    def _create(self):
+        if self._driver_factory is None:
+            from webdriver_manager.chrome import ChromeDriverManager
+
+            # Resolve the ChromeDriver binary once for the whole pool
+            driver_path = ChromeDriverManager().install()
+            self._driver_factory = lambda: create_driver(driver_path)
+        return self._driver_factory()
+
+    @contextmanager
+    def driver(self):
+        """
+        Borrow a driver from the pool, starting a new one if none are idle and the pool is not full.
+
+        A driver that raised is quit rather than returned to the pool (its session may be hung or
+        broken), which frees its slot for a new driver.
+        """
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+                break
+            except queue.Empty:
+                pass
+            with self._lock:
+                if len(self._drivers) < self.size:
+                    driver = self._create()
+                    self._drivers.append(driver)
+                    break
+            try:
+                # Wake up now and then to take a slot freed by a failed driver
+                driver = self._idle.get(timeout=1)
+                break
+            except queue.Empty:
+                continue
+        try:
+            yield driver
+        except Exception:
+            self._discard(driver)
+            raise
+        self._idle.put(driver)
+
+    def _discard(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+
+    def close(self):
+        for driver in self._drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        self._drivers = []
+        self._idle = queue.Queue()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def with_retries(func, *args, retries=MAX_RETRIES, backoff=BACKOFF_SECONDS, **kwargs):
+    """Call func, retrying with exponential backoff; the last error is re-raised."""
+    for attempt in range(retries):
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            if attempt == retries - 1:
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+
+@instrumented
+def load_tables_html(driver, url, timeout):
+    """Open a page and wait until its tables are present, returning their outer HTML."""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    driver.set_page_load_timeout(timeout)
+    driver.get(url)
+    tables = WebDriverWait(driver, timeout).until(
+        EC.presence_of_all_elements_located((By.TAG_NAME, "table"))
+    )
+    return [table.get_attribute("outerHTML") for table in tables]
+
+
+@instrumented
+def parse_fii_dii_table(html):
+    """Convert the FII/DII HTML table to a DataFrame."""
+    return pd.read_html(StringIO(html))[0]
+
+
+@instrumented
+def parse_rbi_policy_rates(html):
+    """Convert the RBI policy rates HTML table to a DataFrame."""
+    return pd.read_html(StringIO(html))[0]
+
+
+@instrumented
+def parse_sebi_pms_table(html):
+    """Convert the SEBI table to a DataFrame, dropping the totals row and the last column."""
+    df = pd.read_html(StringIO(html))[0]
+
+    # Remove the last row
+    df = df.iloc[:-1]
+
+    # Remove the last column
+    df = df.iloc[:, :-1]
+    return df
+
+
+def _save_price_data(name, data, suffix="data"):
+    file_path = dataset_path(f"{name.replace(' ', '_').lower()}_{suffix}", data_dir=OUTPUT_DIR)
+    if is_parquet(file_path):
+        # Store typed columns: flatten the (Price, Ticker) header and keep Date as a column
+        if isinstance(data.columns, pd.MultiIndex):
+            data.columns = data.columns.get_level_values(0)
+        write_frame(data.reset_index(), file_path)
+    else:
+        data.to_csv(file_path)
+    return file_path
+
+
+def download_history(ticker, interval="1d", **kwargs):
+    """
+    Download the bars of one ticker, laid out like a yf.download frame (Price, Ticker columns).
+
+    Uses its own yf.Ticker rather than yf.download, whose module-level result and error tables
+    are shared by every thread. yfinance reports failed downloads as empty frames, so an empty
+    result raises EmptyDownloadError (and is retried by with_retries).
+
+    Parameters:
+    - ticker: Ticker symbol.
+    - interval: Bar interval (e.g. "1d", "1m"); daily bars are keyed by exchange-local dates.
+    - kwargs: start/end or period, passed to yf.Ticker.history.
+
+    Returns:
+    - DataFrame indexed by Date.
+    """
+    import yfinance as yf
+
+    data = yf.Ticker(ticker).history(interval=interval, timeout=SOURCE_TIMEOUTS["yfinance"], raise_errors=True, **kwargs)
+    if data is None or data.empty:
+        raise EmptyDownloadError(f"No {interval} data returned for {ticker}.")
+    data = data[PRICE_COLUMNS]
+    if interval in DAILY_INTERVALS and data.index.tz is not None:
+        data.index = data.index.tz_localize(None)
+    data.index.name = "Date"
+    data.columns = pd.MultiIndex.from_product([PRICE_COLUMNS, [ticker]], names=["Price", "Ticker"])
+    return data
+
+
+@instrumented
+def fetch_ticker_data(name, ticker, cache=None):
+    """Download the daily history of one ticker using yfinance and save it (only missing ranges when cached)."""
+    def download(start, end):
+        try:
+            return with_retries(download_history, ticker, start=start, end=end)
+        except EmptyDownloadError:
+            # A missing range may hold no sessions (e.g. a weekend); an empty overall result fails below
+            return pd.DataFrame()
 
     try:
-        driver.get(url)
-        time.sleep(5)  # Wait for JavaScript to load the table
+        if name == "INDIA VIX":
+            end = pd.Timestamp.today().normalize() + pd.Timedelta(days=1)
+            start = end - pd.DateOffset(years=3)
+        else:
+            start, end = "2022-02-01", "2025-02-01"
+
+        if cache is not None:
+            data = cache.fetch_history("yfinance", ticker, start, end, download)
+        else:
+            data = download(str(pd.Timestamp(start).date()), str(pd.Timestamp(end).date()))
+        if data.empty:
+            return None
+        file_path = _save_price_data(name, data)
+        print(f"{name} data downloaded successfully to {file_path}.")
+        return file_path
+    except Exception as e:
+        print(f"Error fetching data for {name}: {e}")
 
-        # Find the FII/DII data table
-        table = driver.find_element(By.TAG_NAME, "table")
-        html = table.get_attribute("outerHTML")
 
-        # Convert HTML table to Pandas DataFrame
-        df = pd.read_html(html)[0]
-        file_path = os.path.join(OUTPUT_DIR, "fii_dii_data.csv")
-        df.to_csv(file_path, index=False)
+@instrumented
+def fetch_nifty_data(max_workers=4, cache=None):
+    """Fetch Nifty 50, Midcap 100, Next 50, and India VIX data using yfinance, in parallel (one yf.Ticker per worker)."""
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(fetch_ticker_data, name, ticker, cache) for name, ticker in TICKERS.items()]
+        return [future.result() for future in futures]
 
-        print(f"FII/DII data scraped successfully to {file_path}.")
 
+@instrumented
+def fetch_intraday_data(name, ticker, interval="1m", period="7d"):
+    """
+    Download recent intraday bars of one ticker using yfinance and save them as <name>_intraday.
+
+    yfinance only serves 1-minute bars for the last 7 days, so each run replaces the previous file.
+    """
+    try:
+        data = with_retries(download_history, ticker, interval=interval, period=period)
+        file_path = _save_price_data(name, data, suffix="intraday")
+        print(f"{name} {interval} bars downloaded successfully to {file_path}.")
+        return file_path
     except Exception as e:
-        print(f"Error scraping FII/DII data: {e}")
-    
-    finally:
-        driver.quit()
+        print(f"Error fetching intraday data for {name}: {e}")
 
 
-def scrape_rbi_policy_rates():
-    """Scrape policy rates & monetary operations from RBI website."""
-    url = "https://rbi.org.in/"
+def _scrape(pool, source, url, timeout):
+    """Load a source's tables with a pooled driver, retrying with backoff on failure."""
+    url = url or SOURCE_URLS[source]
+    timeout = timeout or SOURCE_TIMEOUTS[source]
 
-    # Set up Selenium WebDriver
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
+    def attempt():
+        with pool.driver() as driver:
+            return load_tables_html(driver, url, timeout)
 
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+    return with_retries(attempt)
 
-    try:
-        driver.get(url)
-        time.sleep(5)  # Wait for JavaScript content to load
 
-        # Find tables on the page
-        tables = driver.find_elements(By.TAG_NAME, "table")
-        if not tables:
-            print("❌ Error: No tables found on the page.")
-            return
+def _cached_scrape(pool, source, url, timeout, cache, file_path):
+    """
+    Scrape a source unless its cached copy is still fresh or the page content is unchanged.
 
-        # Extract the first table's HTML content
-        html = tables[0].get_attribute("outerHTML")
-        df = pd.read_html(StringIO(html))[0]
-        file_path = os.path.join(OUTPUT_DIR, "rbi_policy_rates.csv")
-        df.to_csv(file_path, index=False)
+    Returns:
+    - The first table's HTML, or None when the saved output can be kept as is.
+    """
+    if cache is not None and os.path.exists(file_path) and cache.scrape_is_fresh(source):
+        return None
 
-        print(f"✅ RBI policy rates data scraped successfully to {file_path}.")
+    html = _scrape(pool, source, url, timeout)[0]
+    if cache is not None and os.path.exists(file_path) and not cache.content_changed(source, html):
+        return None
+    return html
 
-    except Exception as e:
-        print(f"❌ Error scraping RBI data: {e}")
 
-    finally:
-        driver.quit()
+@contextmanager
+def _pool_or_new(pool):
+    if pool is not None:
+        yield pool
+    else:
+        with WebDriverPool(size=1) as new_pool:
+            yield new_pool
 
 
-def scrape_sebi_pms_data():
-    """Scrape mutual fund & PMS cash holdings data from SEBI website."""
-    url = "https://www.sebi.gov.in/sebiweb/other/OtherAction.do?doMfd=yes&type=1"
+@instrumented
+def scrape_fii_dii_data(pool=None, url=None, timeout=None, cache=None):
+    """Scrape FII/DII data from NiftyTrader using Selenium."""
+    try:
+        file_path = dataset_path("fii_dii_data", data_dir=OUTPUT_DIR)
+        with _pool_or_new(pool) as pool:
+            html = _cached_scrape(pool, "fii_dii", url, timeout, cache, file_path)
+        if html is None:
+            print(f"FII/DII data unchanged, keeping {file_path}.")
+            return file_path
+
+        # Convert the FII/DII HTML table to Pandas DataFrame
+        df = parse_fii_dii_table(html)
+        write_frame(df, file_path)
+        if cache is not None:
+            cache.record_content("fii_dii", html)
 
-    # Set up Selenium WebDriver
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
+        print(f"FII/DII data scraped successfully to {file_path}.")
+        return file_path
 
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+    except Exception as e:
+        print(f"Error scraping FII/DII data: {e}")
 
+
+@instrumented
+def scrape_rbi_policy_rates(pool=None, url=None, timeout=None, cache=None):
+    """Scrape policy rates & monetary operations from RBI website."""
     try:
-        driver.get(url)
-        time.sleep(5)  # Allow JavaScript to load content
+        file_path = dataset_path("rbi_policy_rates", data_dir=OUTPUT_DIR)
+        with _pool_or_new(pool) as pool:
+            html = _cached_scrape(pool, "rbi", url, timeout, cache, file_path)
+        if html is None:
+            print(f"✅ RBI policy rates unchanged, keeping {file_path}.")
+            return file_path
 
-        # Find the first table on the page (adjust as needed)
-        tables = driver.find_elements(By.TAG_NAME, "table")
-        if not tables:
-            print("❌ Error: No tables found on the SEBI page.")
-            return
+        # Extract the first table's HTML content
+        df = parse_rbi_policy_rates(html)
+        write_frame(df, file_path)
+        if cache is not None:
+            cache.record_content("rbi", html)
 
-        html = tables[0].get_attribute("outerHTML")
-        df = pd.read_html(html)[0]  # Convert HTML table to DataFrame
+        print(f"✅ RBI policy rates data scraped successfully to {file_path}.")
+        return file_path
 
-        # Remove the last row
-        df = df.iloc[:-1]
+    except Exception as e:
+        print(f"❌ Error scraping RBI data: {e}")
+
+
+@instrumented
+def scrape_sebi_pms_data(pool=None, url=None, timeout=None, cache=None):
+    """Scrape mutual fund & PMS cash holdings data from SEBI website."""
+    try:
+        file_path = dataset_path("sebi_pms_data", data_dir=OUTPUT_DIR)
+        with _pool_or_new(pool) as pool:
+            html = _cached_scrape(pool, "sebi", url, timeout, cache, file_path)
+        if html is None:
+            print(f"✅ SEBI PMS & mutual fund data unchanged, keeping {file_path}.")
+            return file_path
 
-        # Remove the last column
-        df = df.iloc[:, :-1]
+        df = parse_sebi_pms_table(html)
 
-        # Save the cleaned data to a CSV file
-        file_path = os.path.join(OUTPUT_DIR, "sebi_pms_data.csv")
-        df.to_csv(file_path, index=False)
+        # Save the cleaned data
+        write_frame(df, file_path)
+        if cache is not None:
+            cache.record_content("sebi", html)
 
         print(f"✅ SEBI PMS & mutual fund data scraped and cleaned successfully to {file_path}.")
+        return file_path
 
     except Exception as e:
         print(f"❌ Error scraping SEBI data: {e}")
 
-    finally:
-        driver.quit()
-
 
+@instrumented
+def collect_all(pool_size=3, max_workers=8, urls=None, cache=None, intraday_interval=None):
+    """
+    Run every collection task concurrently: ticker downloads and scrapes sharing one browser pool.
+
+    Parameters:
+    - pool_size: Number of headless browsers shared by the scrapers.
+    - max_workers: Number of concurrent collection tasks.
+    - urls: Optional overrides of SOURCE_URLS (e.g. local fixtures for testing).
+    - cache: Optional SourceCache for incremental downloads and skipping unchanged scrapes.
+    - intraday_interval: Also download recent intraday bars at this interval (e.g. "1m").
+
+    Returns:
+    - Dict mapping each task to the saved file path (None when it failed).
+    """
+    urls = {**SOURCE_URLS, **(urls or {})}
+    results = {}
+    with WebDriverPool(size=pool_size) as pool, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch_ticker_data, name, ticker, cache): name for name, ticker in TICKERS.items()}
+        if intraday_interval is not None:
+            for name, ticker in TICKERS.items():
+                futures[executor.submit(fetch_intraday_data, name, ticker, intraday_interval)] = f"{name} intraday"
+        futures[executor.submit(scrape_fii_dii_data, pool, urls["fii_dii"], cache=cache)] = "fii_dii"
+        futures[executor.submit(scrape_rbi_policy_rates, pool, urls["rbi"], cache=cache)] = "rbi"
+        futures[executor.submit(scrape_sebi_pms_data, pool, urls["sebi"], cache=cache)] = "sebi"
+
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    return results
+
+
+@instrumented
 def main():
-    fetch_nifty_data()
-    scrape_fii_dii_data()
-    scrape_rbi_policy_rates()
-    scrape_sebi_pms_data()
+    collect_all(cache=SourceCache())
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
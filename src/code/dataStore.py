@@ -0,0 +1,239 @@
+import os
+import shutil
+
+import pandas as pd
+import numpy as np
+
+from instrumentation import instrumented
+
+# Resolved against the code directory rather than the working directory (override with CASH_MODEL_DATA_DIR)
+DATA_DIR = os.environ.get("CASH_MODEL_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_collections"))
+
+# Storage backend shared by data collection, feature engineering and the allocation model.
+# "csv" keeps the original flat files; "parquet" stores typed, year-partitioned datasets.
+STORAGE_BACKEND = os.environ.get("CASH_MODEL_STORAGE", "csv")
+
+PARTITION_COLUMN = "Year"
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise ImportError("The parquet storage backend requires pyarrow. Install it with 'pip install pyarrow'.") from e
+
+
+def is_parquet(source):
+    """Return True if the path points to a Parquet file or partitioned dataset."""
+    return isinstance(source, (str, os.PathLike)) and str(source).rstrip("/").endswith(".parquet")
+
+
+def dataset_path(name, backend=None, data_dir=DATA_DIR):
+    """Return the storage path of a dataset (e.g. "nifty_volatility") for the configured backend."""
+    backend = backend or STORAGE_BACKEND
+    if backend == "csv":
+        return os.path.join(data_dir, f"{name}.csv")
+    if backend == "parquet":
+        return os.path.join(data_dir, f"{name}.parquet")
+    raise ValueError(f"Unknown storage backend '{backend}'. Choose from 'csv' or 'parquet'.")
+
+
+def _date_filters(start, end):
+    filters = []
+    if start is not None:
+        filters.append(("Date", ">=", pd.Timestamp(start)))
+        filters.append((PARTITION_COLUMN, ">=", pd.Timestamp(start).year))
+    if end is not None:
+        filters.append(("Date", "<=", pd.Timestamp(end)))
+        filters.append((PARTITION_COLUMN, "<=", pd.Timestamp(end).year))
+    return filters or None
+
+
+def _read_parquet(path, columns=None, start=None, end=None, names=None, usecols=None):
+    """Read a Parquet dataset with column projection, date predicate pushdown and memory mapping."""
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    if usecols is not None and names is None:
+        columns = columns or list(usecols)
+    filters = _date_filters(start, end)
+    projected = columns
+    if projected is not None and filters and "Date" not in projected:
+        projected = list(projected) + ["Date"]
+
+    table = pq.read_table(path, columns=projected, filters=filters, memory_map=True)
+    return _apply_csv_header(table.to_pandas(), columns, names, usecols)
+
+
+def _apply_csv_header(data, columns=None, names=None, usecols=None):
+    """
+    Apply CSV-style positional column selection and renaming to a frame read from Parquet.
+
+    "names" label the stored columns by position, as pd.read_csv does: extra names become
+    all-missing columns, and with fewer names the leading unnamed columns become the index.
+    With "usecols", names label either every stored column or only the selected ones.
+    """
+    if PARTITION_COLUMN in data.columns:
+        data = data.drop(columns=PARTITION_COLUMN)
+
+    if names is not None:
+        names = list(names)
+        if usecols is not None:
+            usecols = list(usecols)
+            if len(names) == len(data.columns):
+                # Names label every column; usecols selects by position or by name
+                data = data.set_axis(names, axis=1)
+                positions = sorted(column if isinstance(column, int) else names.index(column) for column in usecols)
+                data = data.iloc[:, positions]
+            elif len(names) == len(usecols):
+                positions = sorted(column if isinstance(column, int) else data.columns.get_loc(column) for column in usecols)
+                data = data.iloc[:, positions].set_axis(names, axis=1)
+            else:
+                raise ValueError(f"Number of passed names ({len(names)}) did not match the number of columns ({len(data.columns)}) or usecols ({len(usecols)}).")
+        elif len(names) >= len(data.columns):
+            # Names beyond the stored columns are read as missing values
+            data = data.set_axis(names[:len(data.columns)], axis=1)
+            data = data.assign(**{name: np.nan for name in names[len(data.columns):]})
+        else:
+            # Leading columns without a name become the (unnamed) index
+            leading = len(data.columns) - len(names)
+            index = data.iloc[:, :leading]
+            data = data.iloc[:, leading:].set_axis(names, axis=1)
+            data.index = pd.MultiIndex.from_frame(index, names=[None] * leading) if leading > 1 else pd.Index(index.iloc[:, 0]).rename(None)
+    if columns is not None:
+        data = data[[column for column in columns if column in data.columns]]
+    return data
+
+
+@instrumented(paths=["source"])
+def read_frame(source, columns=None, start=None, end=None, **csv_kwargs):
+    """
+    Read a dataset from a DataFrame, a CSV file or a Parquet dataset.
+
+    Parameters:
+    - source: DataFrame, CSV path or Parquet path.
+    - columns: Optional list of columns to load (projection).
+    - start, end: Optional inclusive date range on the Date column.
+    - csv_kwargs: Arguments for pd.read_csv. For Parquet sources, only positional
+      "usecols" and "names" are applied since the stored columns are already typed.
+
+    Returns:
+    - DataFrame.
+    """
+    if isinstance(source, pd.DataFrame):
+        data = source.copy()
+    elif is_parquet(source):
+        return _read_parquet(source, columns, start, end, csv_kwargs.get("names"), csv_kwargs.get("usecols"))
+    else:
+        if columns is not None and "usecols" not in csv_kwargs and "names" not in csv_kwargs:
+            csv_kwargs["usecols"] = list(columns)
+        data = pd.read_csv(source, **csv_kwargs)
+
+    if start is not None or end is not None:
+        dates = pd.to_datetime(data["Date"])
+        mask = pd.Series(True, index=data.index)
+        if start is not None:
+            mask &= dates >= pd.Timestamp(start)
+        if end is not None:
+            mask &= dates <= pd.Timestamp(end)
+        data = data[mask]
+    if columns is not None:
+        data = data[list(columns)]
+    return data
+
+
+def iter_frames(source, chunksize, columns=None, **csv_kwargs):
+    """
+    Read a CSV file or Parquet dataset as a generator of DataFrame chunks of at most `chunksize` rows.
+
+    Parameters follow read_frame; Parquet partitions are read in year order.
+    """
+    if not is_parquet(source):
+        if columns is not None and "usecols" not in csv_kwargs and "names" not in csv_kwargs:
+            csv_kwargs["usecols"] = list(columns)
+        for chunk in pd.read_csv(source, chunksize=chunksize, **csv_kwargs):
+            yield chunk[list(columns)] if columns is not None else chunk
+        return
+
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    if os.path.isdir(source):
+        files = sorted(os.path.join(root, name) for root, _, names in os.walk(source) for name in names if not name.startswith("."))
+    else:
+        files = [source]
+    rows = 0
+    for file in files:
+        for batch in pq.ParquetFile(file, memory_map=True).iter_batches(batch_size=chunksize):
+            # Number the rows across chunks, as CSV chunks are
+            chunk = batch.to_pandas()
+            chunk.index = pd.RangeIndex(rows, rows + len(chunk))
+            rows += len(chunk)
+            yield _apply_csv_header(chunk, columns, csv_kwargs.get("names"), csv_kwargs.get("usecols"))
+
+
+@instrumented(paths=["destination"])
+def write_frame(data, destination):
+    """
+    Write a DataFrame as CSV or as a Parquet dataset (partitioned by year when it has a Date column).
+
+    Parameters:
+    - data: DataFrame to save.
+    - destination: CSV or Parquet path.
+    """
+    if not is_parquet(destination):
+        data.to_csv(destination, index=False)
+        return
+
+    _require_pyarrow()
+    data = data.copy()
+    # Parquet requires flat string column names
+    data.columns = [" ".join(map(str, column)).strip() if isinstance(column, tuple) else str(column) for column in data.columns]
+    if os.path.isdir(destination):
+        shutil.rmtree(destination)
+    elif os.path.exists(destination):
+        os.remove(destination)
+
+    if "Date" in data.columns:
+        data["Date"] = pd.to_datetime(data["Date"])
+        data[PARTITION_COLUMN] = data["Date"].dt.year
+        data.to_parquet(destination, index=False, partition_cols=[PARTITION_COLUMN])
+    else:
+        data.to_parquet(destination, index=False)
+
+
+@instrumented(paths=["destination"])
+def append_frame(data, destination):
+    """
+    Append rows to a stored dataset.
+
+    CSV files are appended in place. Parquet datasets only rewrite the year partitions
+    touched by the new rows, replacing any stored rows at or after the first new date
+    (so a revised latest bar overwrites the previous version).
+    """
+    if not is_parquet(destination):
+        data.to_csv(destination, mode="a", header=not os.path.exists(destination), index=False)
+        return
+    if not os.path.exists(destination):
+        write_frame(data, destination)
+        return
+
+    _require_pyarrow()
+    data = data.copy()
+    data["Date"] = pd.to_datetime(data["Date"])
+    first_date = data["Date"].min()
+    for year, rows in data.groupby(data["Date"].dt.year):
+        partition = os.path.join(destination, f"{PARTITION_COLUMN}={year}")
+        if os.path.isdir(partition):
+            existing = pd.read_parquet(partition)
+            existing = existing[existing["Date"] < first_date]
+            rows = pd.concat([existing, rows], ignore_index=True)
+            shutil.rmtree(partition)
+        rows = rows.assign(**{PARTITION_COLUMN: year})
+        rows.to_parquet(destination, index=False, partition_cols=[PARTITION_COLUMN])
+
+
+def export_csv(source, csv_file, columns=None, start=None, end=None):
+    """Export a stored dataset to a CSV file."""
+    read_frame(source, columns=columns, start=start, end=end).to_csv(csv_file, index=False)
@@ -1,29 +1,39 @@
+import os
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+
+from compactFeatures import FeatureTable
+from dataStore import dataset_path, read_frame, write_frame
+from featureIndex import MISSING_DAY, asof_positions, day_numbers, month_numbers
+from instrumentation import instrumented
+from statisticsCache import get_statistics_cache
+from reporting import ReportRenderer, plot_institutional_flows, plot_interest_rates, plot_market_breadth, plot_volatility_metrics
 
 
+@instrumented(paths=["input_file", "output_file"])
 def preprocess_csv(input_file, output_file):
-    """Preprocess the CSV file to set correct headers and start from the 4th row."""
+    """Preprocess the raw price data to set correct headers and start from the 4th row."""
     # Define the correct headers
     column_names = ["Date", "Close", "High", "Low", "Open", "Volume"]
 
     # Read the CSV file, skipping the first three rows
-    data = pd.read_csv(input_file, skiprows=3, names=column_names)
+    data = read_frame(input_file, skiprows=3, names=column_names)
 
-    # Save the processed data to a new CSV file
-    data.to_csv(output_file, index=False)
+    # Save the processed data
+    write_frame(data, output_file)
 
-    print(f"✅ Preprocessed CSV saved to {output_file}")
+    print(f"✅ Preprocessed data saved to {output_file}")
 
 
 # 1. Market Volatility Metrics
+@instrumented(paths=["nifty_file", "midcap_file"])
 def calculate_volatility_metrics(nifty_file, midcap_file):
     """Calculate 30-day rolling volatility and volatility ratio."""
     # Read the CSV files, skipping the first two rows and setting proper headers
     column_names = ["Date", "Close", "High", "Low", "Open", "Volume"]
-    nifty_data = pd.read_csv(nifty_file, skiprows=1, names=column_names, parse_dates=["Date"])
-    midcap_data = pd.read_csv(midcap_file, skiprows=1, names=column_names, parse_dates=["Date"])
+    nifty_data = read_frame(nifty_file, skiprows=1, names=column_names, parse_dates=["Date"])
+    midcap_data = read_frame(midcap_file, skiprows=1, names=column_names, parse_dates=["Date"])
 
     # Calculate daily returns
     nifty_data["Daily Return"] = nifty_data["Close"].pct_change()
@@ -33,29 +43,31 @@ def calculate_volatility_metrics(nifty_file, midcap_file):
     nifty_data["30-Day Volatility"] = nifty_data["Daily Return"].rolling(window=30).std()
     midcap_data["30-Day Volatility"] = midcap_data["Daily Return"].rolling(window=30).std()
 
-    # Calculate volatility ratio
-    nifty_data["Volatility Ratio"] = nifty_data["30-Day Volatility"] / midcap_data["30-Day Volatility"]
+    # Calculate volatility ratio (the series have different sessions, so Midcap is joined by date).
+    # The compact table keys Midcap by int32 day number; float64 values keep the stored ratio exact.
+    midcap = FeatureTable.from_frame(midcap_data, ["30-Day Volatility"], dtype=float)
+    nifty_days = day_numbers(nifty_data["Date"])
+    positions = asof_positions(midcap.days, nifty_days)
+    midcap_volatility = midcap.column("30-Day Volatility")[np.maximum(positions, 0)] if len(midcap) else np.full(len(nifty_days), np.nan)
+    midcap_volatility = np.where((positions >= 0) & (nifty_days != MISSING_DAY), midcap_volatility, np.nan)
+    nifty_data["Volatility Ratio"] = nifty_data["30-Day Volatility"] / midcap_volatility
 
     # Handle missing data
     nifty_data.fillna(0, inplace=True)
     midcap_data.fillna(0, inplace=True)
 
-    # Visualization
-    plt.figure(figsize=(10, 6))
-    plt.plot(nifty_data["Date"], nifty_data["30-Day Volatility"], label="Nifty 30-Day Volatility")
-    plt.plot(midcap_data["Date"], midcap_data["30-Day Volatility"], label="Midcap 30-Day Volatility")
-    plt.title("30-Day Rolling Volatility")
-    plt.xlabel("Date")
-    plt.ylabel("Volatility")
-    plt.legend()
-    plt.grid()
-    plt.savefig("../screenshots/volatility_metrics.png")
-    plt.close()
-
     return nifty_data[["Date", "30-Day Volatility", "Volatility Ratio"]], midcap_data[["Date", "30-Day Volatility"]]
 
 # 2. Traded Volume Metrics
+def _volume_median(price_file, volume):
+    """Median of the non-zero volumes, reused from the statistics cache while the file is unchanged."""
+    cache = get_statistics_cache()
+    if cache is None or not isinstance(price_file, (str, os.PathLike)):
+        return volume.median()
+    return cache.median(price_file, "Volume", zero_as_missing=True)
+
 
+@instrumented(paths=["nifty_file", "midcap_file"])
 def calculate_traded_volume(nifty_file, midcap_file):
     """Calculate 30-day rolling average traded volume."""
     # Read the CSV files, skipping the first two rows and setting proper headers
@@ -63,14 +75,14 @@ def calculate_traded_volume(nifty_file, midcap_file):
 
     # Read the CSV files, skipping the first three rows and setting proper headers
     # Read only the Date and Volume columns from the CSV files
-    nifty_data = pd.read_csv(
+    nifty_data = read_frame(
         nifty_file,
         skiprows=1,
         usecols=[0, 5],  # Select only the Date (0th column) and Volume (6th column)
         names=["Date", "Volume"],
         parse_dates=["Date"]
     )
-    midcap_data = pd.read_csv(
+    midcap_data = read_frame(
         midcap_file,
         skiprows=1,
         usecols=[0, 5],  # Select only the Date (0th column) and Volume (6th column)
@@ -90,12 +102,12 @@ def calculate_traded_volume(nifty_file, midcap_file):
     if nifty_data["Volume"].notna().sum() == 0:
         nifty_data["Volume"] = 0
     else:
-        nifty_data["Volume"] = nifty_data["Volume"].fillna(nifty_data["Volume"].median())
+        nifty_data["Volume"] = nifty_data["Volume"].fillna(_volume_median(nifty_file, nifty_data["Volume"]))
 
     if midcap_data["Volume"].notna().sum() == 0:
         midcap_data["Volume"] = 0
     else:
-        midcap_data["Volume"] = midcap_data["Volume"].fillna(midcap_data["Volume"].median())
+        midcap_data["Volume"] = midcap_data["Volume"].fillna(_volume_median(midcap_file, midcap_data["Volume"]))
 
     # Calculate 30-day rolling average traded volume
     nifty_data["Average Volume"] = nifty_data["Volume"].rolling(window=30, min_periods=1).mean()
@@ -112,6 +124,7 @@ def calculate_traded_volume(nifty_file, midcap_file):
 
 
 # 3. Institutional Flow Metrics
+@instrumented(paths=["fii_dii_file"])
 def calculate_institutional_flow_metrics(fii_dii_file):
     """Calculate FII/DII net flows and FII/DII ratio."""
     # Define column names for the CSV file
@@ -121,15 +134,13 @@ def calculate_institutional_flow_metrics(fii_dii_file):
     ]
 
     # Read the CSV file, skipping the first two rows and using the second row as the header
-    fii_dii_data = pd.read_csv(fii_dii_file, skiprows=1, names=column_names)
+    fii_dii_data = read_frame(fii_dii_file, skiprows=1, names=column_names)
 
-    # Drop any rows that contain non-numeric values in the FII and DII columns
-    fii_dii_data = fii_dii_data[pd.to_numeric(fii_dii_data["FII Net Amount"], errors='coerce').notna()]
-    fii_dii_data = fii_dii_data[pd.to_numeric(fii_dii_data["DII Net Amount"], errors='coerce').notna()]
-
-    # Convert relevant columns to numeric (removing commas)
-    fii_dii_data["FII Net Amount"] = fii_dii_data["FII Net Amount"].astype(float)
-    fii_dii_data["DII Net Amount"] = fii_dii_data["DII Net Amount"].astype(float)
+    # Parse the FII and DII net amounts once, dropping any rows with non-numeric values
+    fii_net_amount = pd.to_numeric(fii_dii_data["FII Net Amount"], errors="coerce")
+    dii_net_amount = pd.to_numeric(fii_dii_data["DII Net Amount"], errors="coerce")
+    numeric = fii_net_amount.notna() & dii_net_amount.notna()
+    fii_dii_data = fii_dii_data[numeric].assign(**{"FII Net Amount": fii_net_amount[numeric], "DII Net Amount": dii_net_amount[numeric]})
 
     # Calculate FII/DII net flows
     fii_dii_data["FII Net Flow"] = fii_dii_data["FII Net Amount"]
@@ -146,28 +157,19 @@ def calculate_institutional_flow_metrics(fii_dii_file):
     fii_dii_data.replace([np.inf, -np.inf], np.nan, inplace=True)
     fii_dii_data.fillna(0, inplace=True)
 
-    # Visualization
-    plt.figure(figsize=(10, 6))
-    plt.plot(fii_dii_data["MONTH"], fii_dii_data["FII Net Flow"], label="FII Net Flow", marker="o")
-    plt.plot(fii_dii_data["MONTH"], fii_dii_data["DII Net Flow"], label="DII Net Flow", marker="o")
-    plt.title("Institutional Flows (FII vs DII)")
-    plt.xlabel("Month")
-    plt.ylabel("Net Flow (INR Crore)")
-    plt.legend()
-    plt.grid()
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig("../screenshots/institutional_flows.png")
-    plt.close()
+    # Encode the month labels (e.g. "Mar 2025") as int32 yyyymm month numbers (e.g. 202503)
+    fii_dii_data["MONTH"] = month_numbers(fii_dii_data["MONTH"])
 
     return fii_dii_data[["MONTH", "FII Net Flow", "DII Net Flow", "FII/DII Ratio"]]
 
 
 # 4. Market Breadth Indicators for Nifty 50 Data
+@instrumented(paths=["nifty_file"])
 def calculate_market_breadth(nifty_file):
-    """Calculate advance-decline ratio."""
-    column_names = ["Date", "Price", "Close", "High", "Low", "Open", "Volume"]
-    nifty_data = pd.read_csv(nifty_file, skiprows=30, names=column_names, parse_dates=["Date"])
+    """Calculate advance-decline ratio: sessions closing above their open over those closing below, over 30 sessions."""
+    # Raw yfinance file: three header rows, then Date and the OHLCV columns
+    column_names = ["Date", "Close", "High", "Low", "Open", "Volume"]
+    nifty_data = read_frame(nifty_file, skiprows=3, names=column_names, parse_dates=["Date"])
 
     # Calculate advance-decline ratio
     nifty_data["Advance-Decline Ratio"] = (nifty_data["Close"] > nifty_data["Open"]).rolling(window=30).sum() / \
@@ -176,24 +178,14 @@ def calculate_market_breadth(nifty_file):
     # Handle missing data
     nifty_data.fillna(0, inplace=True)
 
-    # Visualization
-    plt.figure(figsize=(10, 6))
-    plt.plot(nifty_data["Date"], nifty_data["Advance-Decline Ratio"], label="Advance-Decline Ratio")
-    plt.title("Advance-Decline Ratio")
-    plt.xlabel("Date")
-    plt.ylabel("Ratio")
-    plt.legend()
-    plt.grid()
-    plt.savefig("../screenshots/market_breadth.png")
-    plt.close()
-
     return nifty_data[["Date", "Advance-Decline Ratio"]]
 
 # 5. Interest Rate Metrics
+@instrumented(paths=["rbi_file"])
 def calculate_interest_rate_metrics(rbi_file):
     """Extract interest rate metrics from RBI data."""
     # Read the CSV file
-    rbi_data = pd.read_csv(rbi_file, header=None, names=["Policy", "Rate"])
+    rbi_data = read_frame(rbi_file, header=None, names=["Policy", "Rate"])
 
     # Clean the "Rate" column to extract numeric values
     rbi_data["Rate"] = rbi_data["Rate"].str.extract(r"([\d\.]+)").astype(float)
@@ -202,27 +194,19 @@ def calculate_interest_rate_metrics(rbi_file):
     repo_rate = rbi_data.loc[rbi_data["Policy"].str.contains("Policy Repo Rate", case=False), "Rate"].values[0]
     reverse_repo_rate = rbi_data.loc[rbi_data["Policy"].str.contains("Fixed Reverse Repo Rate", case=False), "Rate"].values[0]
 
-    # Visualization
-    rates = {"Repo Rate": repo_rate, "Reverse Repo Rate": reverse_repo_rate}
-    plt.bar(rates.keys(), rates.values())
-    plt.title("Interest Rate Metrics")
-    plt.ylabel("Rate (%)")
-    plt.grid()
-    plt.savefig("../screenshots/interest_rates.png")
-    plt.close()
-
     return {"Repo Rate": repo_rate, "Reverse Repo Rate": reverse_repo_rate}
 
 # Main Function to Execute All Features
-def main():
+@instrumented
+def main(render_plots=True):
     # File paths
-    nifty_file = "../data_collections/nifty_50_data.csv"
-    midcap_file = "../data_collections/nifty_midcap_100_data.csv"
-    fii_dii_file = "../data_collections/fii_dii_data.csv"
-    rbi_file = "../data_collections/rbi_policy_rates.csv"
+    nifty_file = dataset_path("nifty_50_data")
+    midcap_file = dataset_path("nifty_midcap_100_data")
+    fii_dii_file = dataset_path("fii_dii_data")
+    rbi_file = dataset_path("rbi_policy_rates")
 
-    nifty_output_file = "../data_collections/processed_nifty_50_data.csv"
-    midcap_output_file = "../data_collections/processed_midcap_100_data.csv"
+    nifty_output_file = dataset_path("processed_nifty_50_data")
+    midcap_output_file = dataset_path("processed_midcap_100_data")
     preprocess_csv(nifty_file, nifty_output_file)
     preprocess_csv(midcap_file, midcap_output_file)
 
@@ -234,14 +218,27 @@ def main():
     market_breadth = calculate_market_breadth(nifty_file)
     interest_rates = calculate_interest_rate_metrics(rbi_file)
 
-    # Save results
-    nifty_volatility.to_csv("../data_collections/nifty_volatility.csv", index=False)
-    midcap_volatility.to_csv("../data_collections/midcap_volatility.csv", index=False)
-    nifty_volume.to_csv("../data_collections/nifty_volume.csv", index=False)
-    midcap_volume.to_csv("../data_collections/midcap_volume.csv", index=False)
-    institutional_flows.to_csv("../data_collections/institutional_flows.csv", index=False)
-    market_breadth.to_csv("../data_collections/market_breadth.csv", index=False)
-    pd.DataFrame([interest_rates]).to_csv("../data_collections/interest_rates.csv", index=False)
+    # Visualization (rendered in a background worker while the results are saved)
+    renderer = ReportRenderer() if render_plots else None
+    try:
+        if renderer is not None:
+            renderer.submit(plot_volatility_metrics, nifty_volatility, midcap_volatility)
+            renderer.submit(plot_institutional_flows, institutional_flows)
+            renderer.submit(plot_market_breadth, market_breadth)
+            renderer.submit(plot_interest_rates, interest_rates)
+
+        # Save results
+        write_frame(nifty_volatility, dataset_path("nifty_volatility"))
+        write_frame(midcap_volatility, dataset_path("midcap_volatility"))
+        write_frame(nifty_volume, dataset_path("nifty_volume"))
+        write_frame(midcap_volume, dataset_path("midcap_volume"))
+        write_frame(institutional_flows, dataset_path("institutional_flows"))
+        write_frame(market_breadth, dataset_path("market_breadth"))
+        write_frame(pd.DataFrame([interest_rates]), dataset_path("interest_rates"))
+    finally:
+        # Close the renderer even when saving fails, so its worker does not outlive the run
+        if renderer is not None:
+            renderer.close()
 
     print("✅ Feature engineering completed and results saved!")
 
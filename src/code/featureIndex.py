@@ -0,0 +1,207 @@
+import pandas as pd
+import numpy as np
+
+
+def month_numbers(months, format="%b %Y"):
+    """Encode month labels (e.g. "Mar 2025") as int32 yyyymm month numbers (e.g. 202503)."""
+    dates = pd.to_datetime(pd.Series(months), format=format)
+    return (dates.dt.year * 100 + dates.dt.month).to_numpy(dtype=np.int32)
+
+
+def month_end_dates(months, format="%b %Y"):
+    """
+    Convert months to the month-end dates their data becomes available.
+
+    Parameters:
+    - months: yyyymm month numbers (see month_numbers), or month labels (e.g. "Mar 2025") in the given format.
+    """
+    months = pd.Series(months)
+    if pd.api.types.is_integer_dtype(months):
+        return pd.to_datetime(months.astype(str), format="%Y%m") + pd.offsets.MonthEnd(0)
+    return pd.to_datetime(months, format=format) + pd.offsets.MonthEnd(0)
+
+
+# Day number of missing dates
+MISSING_DAY = np.iinfo(np.int32).min
+
+
+def day_numbers(dates):
+    """Convert dates to int32 day numbers (days since 1970-01-01; MISSING_DAY for missing dates)."""
+    days = pd.DatetimeIndex(pd.to_datetime(dates)).values.astype("datetime64[D]")
+    numbers = days.astype(np.int64)
+    numbers[np.isnat(days)] = MISSING_DAY
+    return numbers.astype(np.int32)
+
+
+def day_dates(days):
+    """Convert int32 day numbers back to a DatetimeIndex."""
+    return pd.DatetimeIndex(np.asarray(days).astype("datetime64[D]").astype("datetime64[ns]"), name="Date")
+
+
+def date_keys(dates, resolution="ns"):
+    """Convert dates to sorted-comparable keys: int64 nanoseconds, or int32 day numbers for resolution "D"."""
+    if resolution == "D":
+        return day_numbers(dates)
+    return pd.DatetimeIndex(pd.to_datetime(dates)).values.astype("datetime64[ns]").astype(np.int64)
+
+
+def key_dates(keys, resolution="ns"):
+    """Convert keys back to a DatetimeIndex."""
+    if resolution == "D":
+        return day_dates(keys)
+    return pd.DatetimeIndex(keys, name="Date")
+
+
+def asof_positions(keys, targets):
+    """
+    Binary-search the position of the latest key on or before each target.
+
+    Parameters:
+    - keys: Sorted int64 date keys of a series.
+    - targets: int64 date keys to look up.
+
+    Returns:
+    - Array of positions into keys (-1 where the series has no observation yet).
+    """
+    return np.searchsorted(keys, targets, side="right") - 1
+
+
+class FeatureIndex:
+    """
+    Date-aligned store of feature series observed at different frequencies.
+
+    Each series keeps its own sorted dates, so daily prices, monthly flows and sporadic
+    rate changes are joined by date (latest observation on or before each date) instead
+    of by row position.
+
+    With resolution="D" and dtype=np.float32 (see compact()), dates are kept as int32 day
+    numbers and values as float32, half of the default int64 / float64 storage.
+    Series added from a compactFeatures.FeatureTable reference its arrays without copying.
+    """
+
+    def __init__(self, resolution="ns", dtype=float):
+        if resolution not in ("ns", "D"):
+            raise ValueError("Invalid resolution. Choose from 'ns' or 'D'.")
+        self.resolution = resolution
+        self.dtype = np.dtype(dtype)
+        self._series = {}
+
+    @classmethod
+    def compact(cls):
+        """Return an index with int32 day-number dates and float32 values."""
+        return cls(resolution="D", dtype=np.float32)
+
+    def date_keys(self, dates):
+        """Convert dates to the keys of this index (int64 nanoseconds, or int32 day numbers at resolution "D")."""
+        return date_keys(dates, self.resolution)
+
+    def add(self, name, dates, values):
+        """Add a series observed on the given dates (later duplicates of a date win)."""
+        series = pd.Series(np.asarray(values, dtype=float), index=pd.to_datetime(pd.Series(dates)).values)
+        series = series[series.index.notna()].sort_index(kind="stable")
+        keys = self.date_keys(series.index)
+        # Keep the last observation of each key (dates on the same day share a key at resolution "D")
+        last = np.append(keys[1:] != keys[:-1], True) if len(keys) else np.zeros(0, dtype=bool)
+        self._series[name] = (keys[last], series.to_numpy()[last].astype(self.dtype))
+        return self
+
+    def add_table(self, table, columns=None, names=None):
+        """
+        Add columns of a compactFeatures.FeatureTable as series, without copying them.
+
+        Parameters:
+        - table: FeatureTable (int32 day numbers, so the index must have resolution "D").
+        - columns: Table columns to add (defaults to all).
+        - names: Series names for the columns (defaults to the column names).
+        """
+        if self.resolution != "D":
+            raise ValueError("FeatureTable columns can only be added to an index with resolution 'D'.")
+        columns = table.columns if columns is None else columns
+        for name, column in zip(names or columns, columns):
+            self._series[name] = (table.days, table.column(column))
+        return self
+
+    def add_frame(self, name, data, value_column, date_column="Date"):
+        """Add the value column of a frame keyed by its date column."""
+        return self.add(name, data[date_column], data[value_column])
+
+    def add_monthly(self, name, data, value_column, month_column="MONTH"):
+        """Add a monthly table (in any row order), available from each month's end."""
+        return self.add(name, month_end_dates(data[month_column]), data[value_column])
+
+    @property
+    def names(self):
+        return list(self._series)
+
+    def dates(self, name=None):
+        """Observation dates of one series, or the sorted union of all series' dates."""
+        if name is not None:
+            return key_dates(self._series[name][0], self.resolution).rename(None)
+        keys = [keys for keys, _ in self._series.values()]
+        return key_dates(np.unique(np.concatenate(keys)) if keys else np.array([], dtype=np.int64), self.resolution).rename(None)
+
+    def last_date(self):
+        """Latest date any series has an observation for."""
+        return max(key_dates(keys[-1:], self.resolution)[0] for keys, _ in self._series.values() if len(keys))
+
+    def view(self, name, end=None):
+        """
+        Return one series' observations (up to and including an optional end date) without copying.
+
+        Returns:
+        - Tuple of (keys, values) NumPy views of the stored arrays; keys are int64 nanoseconds,
+          or int32 day numbers at resolution "D".
+        """
+        keys, values = self._series[name]
+        if end is not None:
+            stop = asof_positions(keys, self.date_keys([end])[0]) + 1
+            keys, values = keys[:stop], values[:stop]
+        return keys, values
+
+    def series(self, name, end=None):
+        """Return one series' observations (up to and including an optional end date)."""
+        keys, values = self.view(name, end)
+        return pd.Series(values, index=key_dates(keys, self.resolution).rename("Date"), name=name)
+
+    def transform(self, name, function):
+        """Replace a series' values with function(values) (e.g. a normalization over its own history)."""
+        keys, values = self._series[name]
+        self._series[name] = (keys, np.asarray(function(pd.Series(values)), dtype=self.dtype))
+        return self
+
+    def as_of(self, date, names=None):
+        """
+        Return each series' latest value on or before a date.
+
+        Returns:
+        - Series indexed by feature name (NaN where a series has no observation yet).
+        """
+        target = self.date_keys([date])[0]
+        values = {}
+        for name in names or self.names:
+            keys, series_values = self._series[name]
+            position = asof_positions(keys, target)
+            values[name] = series_values[position] if position >= 0 else np.nan
+        return pd.Series(values, dtype=float)
+
+    def align(self, calendar=None, names=None):
+        """
+        Join every series onto a calendar with a backward as-of lookup in one vectorized pass.
+
+        Parameters:
+        - calendar: Dates to align on (defaults to the union of all observation dates).
+        - names: Series to include (defaults to all, in insertion order).
+
+        Returns:
+        - DataFrame indexed by Date with one column per series.
+        """
+        calendar = self.dates() if calendar is None else pd.DatetimeIndex(pd.to_datetime(calendar))
+        targets = self.date_keys(calendar)
+        columns = {}
+        for name in names or self.names:
+            keys, values = self._series[name]
+            positions = asof_positions(keys, targets)
+            column = values[np.maximum(positions, 0)] if len(values) else np.full(len(targets), np.nan)
+            column[positions < 0] = np.nan
+            columns[name] = column
+        return pd.DataFrame(columns, index=calendar.rename("Date"))
@@ -0,0 +1,189 @@
+import json
+import os
+
+import pandas as pd
+
+from dataStore import DATA_DIR, dataset_path, write_frame
+from featureEngineering import (calculate_institutional_flow_metrics, calculate_interest_rate_metrics, calculate_market_breadth,
+                                calculate_traded_volume, calculate_volatility_metrics, preprocess_csv)
+from instrumentation import instrumented
+from reporting import ReportRenderer, plot_institutional_flows, plot_interest_rates, plot_market_breadth, plot_volatility_metrics
+from statisticsCache import file_fingerprint, file_state
+
+STATE_FILE = os.path.join(DATA_DIR, ".cache", "feature_pipeline.json")
+
+
+def _preprocess(inputs, outputs):
+    preprocess_csv(inputs[0], outputs[0])
+
+
+def _volatility(inputs, outputs):
+    return calculate_volatility_metrics(*inputs)
+
+
+def _volume(inputs, outputs):
+    return calculate_traded_volume(*inputs)
+
+
+def _institutional_flows(inputs, outputs):
+    return (calculate_institutional_flow_metrics(inputs[0]),)
+
+
+def _market_breadth(inputs, outputs):
+    return (calculate_market_breadth(inputs[0]),)
+
+
+def _interest_rates(inputs, outputs):
+    return (pd.DataFrame([calculate_interest_rate_metrics(inputs[0])]),)
+
+
+def _plot_interest_rates(interest_rates):
+    return plot_interest_rates(interest_rates.iloc[0].to_dict())
+
+
+# Feature stages of featureEngineering.main: dataset inputs, dataset outputs, the stage function
+# (returning one frame per output, or None when it saves its outputs itself) and its plot
+FEATURE_STAGES = {
+    "preprocess_nifty": {"inputs": ["nifty_50_data"], "outputs": ["processed_nifty_50_data"], "run": _preprocess},
+    "preprocess_midcap": {"inputs": ["nifty_midcap_100_data"], "outputs": ["processed_midcap_100_data"], "run": _preprocess},
+    "volatility": {
+        "inputs": ["processed_nifty_50_data", "processed_midcap_100_data"],
+        "outputs": ["nifty_volatility", "midcap_volatility"],
+        "run": _volatility,
+        "plot": plot_volatility_metrics
+    },
+    "volume": {
+        "inputs": ["processed_nifty_50_data", "processed_midcap_100_data"],
+        "outputs": ["nifty_volume", "midcap_volume"],
+        "run": _volume
+    },
+    "institutional_flows": {
+        "inputs": ["fii_dii_data"], "outputs": ["institutional_flows"],
+        "run": _institutional_flows, "plot": plot_institutional_flows
+    },
+    "market_breadth": {
+        "inputs": ["nifty_50_data"], "outputs": ["market_breadth"],
+        "run": _market_breadth, "plot": plot_market_breadth
+    },
+    "interest_rates": {
+        "inputs": ["rbi_policy_rates"], "outputs": ["interest_rates"],
+        "run": _interest_rates, "plot": _plot_interest_rates
+    }
+}
+
+
+def stage_order(stages=FEATURE_STAGES, targets=None):
+    """
+    Order stages so that every stage runs after the stages producing its inputs.
+
+    Parameters:
+    - stages: Stage definitions (see FEATURE_STAGES).
+    - targets: Optional stage names; only these and their upstream stages are returned.
+
+    Returns:
+    - List of stage names.
+    """
+    producers = {output: name for name, stage in stages.items() for output in stage["outputs"]}
+    order, visiting = [], set()
+
+    def visit(name):
+        if name in order:
+            return
+        if name in visiting:
+            raise ValueError(f"Feature stages have a dependency cycle through '{name}'.")
+        visiting.add(name)
+        for dataset in stages[name]["inputs"]:
+            if dataset in producers:
+                visit(producers[dataset])
+        visiting.discard(name)
+        order.append(name)
+
+    for name in targets or stages:
+        if name not in stages:
+            raise ValueError(f"Unknown feature stage '{name}'. Choose from {', '.join(stages)}.")
+        visit(name)
+    return order
+
+
+class PipelineState:
+    """Content hashes of the inputs each stage last ran on, persisted between runs."""
+
+    def __init__(self, state_file=STATE_FILE):
+        self.state_file = state_file
+        self.state = {"files": {}, "stages": {}}
+        if os.path.exists(state_file):
+            with open(state_file) as f:
+                self.state = json.load(f)
+
+    def content_hash(self, path):
+        """Hash a file (or Parquet dataset), rehashing only when its size or modification time changed."""
+        if not os.path.exists(path):
+            return None
+        size, mtime = file_state(path)
+        previous = self.state["files"].get(os.path.abspath(path))
+        if previous is not None and previous[0] == size and previous[1] == mtime:
+            return previous[2]
+        content_hash = file_fingerprint(path)[0]
+        self.state["files"][os.path.abspath(path)] = [size, mtime, content_hash]
+        return content_hash
+
+    def is_current(self, name, hashes, outputs):
+        return self.state["stages"].get(name) == hashes and all(os.path.exists(output) for output in outputs)
+
+    def mark(self, name, hashes):
+        self.state["stages"][name] = hashes
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+        temporary_file = self.state_file + ".tmp"
+        with open(temporary_file, "w") as f:
+            json.dump(self.state, f)
+        os.replace(temporary_file, self.state_file)
+
+
+@instrumented
+def run_feature_pipeline(targets=None, force=False, render_plots=True, stages=FEATURE_STAGES, state_file=STATE_FILE):
+    """
+    Run the feature stages in dependency order, skipping stages whose inputs are unchanged.
+
+    A stage is skipped when the content hashes of its inputs match its last run and its outputs
+    exist. Outputs are rewritten only by stages that run, so unchanged upstream results keep
+    their downstream stages skipped as well.
+
+    Parameters:
+    - targets: Optional stage names to run (with their upstream stages); defaults to every stage.
+    - force: Run every selected stage regardless of its inputs.
+    - render_plots: Render the plots of the stages that run.
+    - stages: Stage definitions (see FEATURE_STAGES).
+    - state_file: JSON file holding the input hashes of the last runs.
+
+    Returns:
+    - Dict mapping each selected stage to "ran" or "skipped".
+    """
+    state = PipelineState(state_file)
+    renderer = ReportRenderer() if render_plots else None
+    statuses = {}
+    try:
+        for name in stage_order(stages, targets):
+            stage = stages[name]
+            inputs = [dataset_path(dataset) for dataset in stage["inputs"]]
+            outputs = [dataset_path(dataset) for dataset in stage["outputs"]]
+            hashes = {dataset: state.content_hash(path) for dataset, path in zip(stage["inputs"], inputs)}
+
+            if not force and state.is_current(name, hashes, outputs):
+                statuses[name] = "skipped"
+                continue
+
+            results = stage["run"](inputs, outputs)
+            if results is not None:
+                for result, output in zip(results, outputs):
+                    write_frame(result, output)
+                if renderer is not None and stage.get("plot") is not None:
+                    renderer.submit(stage["plot"], *results)
+            state.mark(name, hashes)
+            state.save()
+            statuses[name] = "ran"
+    finally:
+        if renderer is not None:
+            renderer.close()
+    return statuses
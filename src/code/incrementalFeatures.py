@@ -0,0 +1,368 @@
+import json
+import math
+import os
+
+import pandas as pd
+import numpy as np
+
+from dataStore import DATA_DIR, append_frame, dataset_path, is_parquet, read_frame
+
+WINDOW = 30
+SERIES_NAMES = ["nifty", "midcap"]
+
+
+class RingBuffer:
+    """Fixed-size window of values with running sums, so window statistics update in O(1)."""
+
+    # Recompute the running sums from the buffer every so often to stop rounding drift
+    RESYNC_INTERVAL = 10000
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.values = [math.nan] * window
+        self.position = -1
+        self.size = 0
+        self.valid = 0
+        self.total = 0.0
+        self.total_squares = 0.0
+        self.updates = 0
+
+    def _add(self, value):
+        if not math.isnan(value):
+            self.valid += 1
+            self.total += value
+            self.total_squares += value * value
+
+    def _remove(self, value):
+        if not math.isnan(value):
+            self.valid -= 1
+            self.total -= value
+            self.total_squares -= value * value
+
+    def push(self, value):
+        """Append a value, evicting the oldest one once the window is full."""
+        self.position = (self.position + 1) % self.window
+        if self.size == self.window:
+            self._remove(self.values[self.position])
+        else:
+            self.size += 1
+        self.values[self.position] = value
+        self._add(value)
+        self._maybe_resync()
+
+    def replace_last(self, value):
+        """Replace the most recent value (used when the latest bar is revised)."""
+        self._remove(self.values[self.position])
+        self.values[self.position] = value
+        self._add(value)
+        self._maybe_resync()
+
+    def _maybe_resync(self):
+        self.updates += 1
+        if self.updates % self.RESYNC_INTERVAL == 0:
+            valid_values = [value for value in self.values[:self.size] if not math.isnan(value)]
+            self.valid = len(valid_values)
+            self.total = math.fsum(valid_values)
+            self.total_squares = math.fsum(value * value for value in valid_values)
+
+    def mean(self, min_periods=1):
+        if self.valid < min_periods or self.valid == 0:
+            return math.nan
+        return self.total / self.valid
+
+    def sum(self, min_periods=None):
+        min_periods = self.window if min_periods is None else min_periods
+        if self.valid < min_periods:
+            return math.nan
+        return self.total
+
+    def std(self, min_periods=None):
+        """Sample standard deviation (ddof=1), matching pandas' rolling std."""
+        min_periods = self.window if min_periods is None else min_periods
+        if self.valid < max(min_periods, 2):
+            return math.nan
+        variance = (self.total_squares - self.total * self.total / self.valid) / (self.valid - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def to_state(self):
+        return {"window": self.window, "values": self.values, "position": self.position, "size": self.size}
+
+    @classmethod
+    def from_state(cls, state):
+        buffer = cls(state["window"])
+        buffer.position = state["position"]
+        buffer.size = state["size"]
+        for value in state["values"][:buffer.size]:
+            buffer._add(value)
+        buffer.values = list(state["values"])
+        return buffer
+
+
+class SeriesState:
+    """Rolling O(window) state for one index: returns, volume and advance/decline counts."""
+
+    def __init__(self, window=WINDOW, volume_fill=0.0):
+        self.window = window
+        self.volume_fill = volume_fill
+        self.last_date = None
+        self.last_bar = None
+        self.last_close = math.nan
+        self.previous_close = math.nan
+        self.returns = RingBuffer(window)
+        self.volumes = RingBuffer(window)
+        self.advances = RingBuffer(window)
+        self.declines = RingBuffer(window)
+
+    def update(self, date, bar):
+        """
+        Add a bar (or revise the latest one when it has the same date) and return the new features.
+
+        Parameters:
+        - date: Timestamp of the bar.
+        - bar: Mapping with Close, Open and Volume values.
+
+        Returns:
+        - Dict with the bar's 30-Day Volatility, Average Volume and Advance-Decline Ratio.
+        """
+        date = pd.Timestamp(date)
+        close = float(bar["Close"])
+        open_price = float(bar["Open"])
+        volume = float(bar.get("Volume", math.nan))
+        last_bar = [close, open_price, volume]
+        if math.isnan(volume) or volume == 0:
+            volume = self.volume_fill
+
+        revision = self.last_date is not None and date == self.last_date
+        if self.last_date is not None and date < self.last_date:
+            raise ValueError(f"Bar for {date} is older than the latest bar ({self.last_date}).")
+
+        if not revision:
+            self.previous_close = self.last_close
+        daily_return = close / self.previous_close - 1 if not math.isnan(self.previous_close) else math.nan
+
+        values = [
+            (self.returns, daily_return),
+            (self.volumes, volume),
+            (self.advances, float(close > open_price)),
+            (self.declines, float(close < open_price))
+        ]
+        for buffer, value in values:
+            if revision:
+                buffer.replace_last(value)
+            else:
+                buffer.push(value)
+
+        self.last_date = date
+        self.last_bar = last_bar
+        self.last_close = close
+
+        advances = self.advances.sum()
+        declines = self.declines.sum()
+        if math.isnan(advances) or math.isnan(declines) or (advances == 0 and declines == 0):
+            advance_decline_ratio = math.nan
+        elif declines == 0:
+            advance_decline_ratio = math.inf
+        else:
+            advance_decline_ratio = advances / declines
+
+        return {
+            "Date": date,
+            "30-Day Volatility": self.returns.std(),
+            "Average Volume": self.volumes.mean(),
+            "Advance-Decline Ratio": advance_decline_ratio,
+            "revision": revision
+        }
+
+    def is_revised(self, bar):
+        """Whether a bar dated like the latest bar changes its Close, Open or Volume."""
+        if self.last_bar is None:
+            return True
+        values = [float(bar["Close"]), float(bar["Open"]), float(bar.get("Volume", math.nan))]
+        return any(not (value == last or (math.isnan(value) and math.isnan(last))) for value, last in zip(values, self.last_bar))
+
+    def to_state(self):
+        return {
+            "window": self.window,
+            "volume_fill": self.volume_fill,
+            "last_date": None if self.last_date is None else self.last_date.isoformat(),
+            "last_bar": self.last_bar,
+            "last_close": self.last_close,
+            "previous_close": self.previous_close,
+            "returns": self.returns.to_state(),
+            "volumes": self.volumes.to_state(),
+            "advances": self.advances.to_state(),
+            "declines": self.declines.to_state()
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        series = cls(state["window"], state["volume_fill"])
+        series.last_date = None if state["last_date"] is None else pd.Timestamp(state["last_date"])
+        # States saved before the latest bar was kept treat it as revised once
+        series.last_bar = state.get("last_bar")
+        series.last_close = state["last_close"]
+        series.previous_close = state["previous_close"]
+        for name in ["returns", "volumes", "advances", "declines"]:
+            setattr(series, name, RingBuffer.from_state(state[name]))
+        return series
+
+
+class IncrementalFeatureEngine:
+    """Keeps rolling state for the Nifty 50 and Midcap 100 series and emits feature rows per new bar."""
+
+    def __init__(self, window=WINDOW, volume_fill=None):
+        volume_fill = volume_fill or {}
+        self.series = {name: SeriesState(window, volume_fill.get(name, 0.0)) for name in SERIES_NAMES}
+        self.latest = {name: None for name in SERIES_NAMES}
+
+    @classmethod
+    def from_history(cls, nifty_file, midcap_file, window=WINDOW):
+        """Seed the engine by replaying the processed Nifty 50 and Midcap 100 histories."""
+        histories = {
+            "nifty": read_frame(nifty_file, parse_dates=["Date"]),
+            "midcap": read_frame(midcap_file, parse_dates=["Date"])
+        }
+
+        # Missing volumes are filled with the historical median, as in calculate_traded_volume
+        volume_fill = {}
+        for name, data in histories.items():
+            volume = pd.to_numeric(data["Volume"], errors="coerce").replace(0, np.nan)
+            volume_fill[name] = float(volume.median()) if volume.notna().any() else 0.0
+
+        engine = cls(window, volume_fill)
+        for name, data in histories.items():
+            for bar in data.to_dict("records"):
+                engine.latest[name] = engine.series[name].update(bar["Date"], bar)
+        return engine
+
+    def update(self, date, bars):
+        """
+        Apply new bars for one timestamp and return the output rows to append.
+
+        Parameters:
+        - date: Timestamp of the bars.
+        - bars: Dict mapping "nifty" and/or "midcap" to a bar with Close, Open and Volume.
+
+        Returns:
+        - Dict mapping output dataset names to (row, revision) tuples.
+        """
+        for name, bar in bars.items():
+            self.latest[name] = self.series[name].update(date, bar)
+
+        rows = {}
+        nifty, midcap = self.latest["nifty"], self.latest["midcap"]
+        if "nifty" in bars:
+            ratio = math.nan
+            # Midcap's latest session on or before the Nifty date, as in the batch as-of join
+            if midcap is not None and midcap["Date"] <= nifty["Date"]:
+                ratio = nifty["30-Day Volatility"] / midcap["30-Day Volatility"] if midcap["30-Day Volatility"] else math.nan
+            rows["nifty_volatility"] = ({"Date": nifty["Date"], "30-Day Volatility": nifty["30-Day Volatility"], "Volatility Ratio": ratio}, nifty["revision"])
+            rows["nifty_volume"] = ({"Date": nifty["Date"], "Average Volume": nifty["Average Volume"]}, nifty["revision"])
+            rows["market_breadth"] = ({"Date": nifty["Date"], "Advance-Decline Ratio": nifty["Advance-Decline Ratio"]}, nifty["revision"])
+        if "midcap" in bars:
+            rows["midcap_volatility"] = ({"Date": midcap["Date"], "30-Day Volatility": midcap["30-Day Volatility"]}, midcap["revision"])
+            rows["midcap_volume"] = ({"Date": midcap["Date"], "Average Volume": midcap["Average Volume"]}, midcap["revision"])
+        return rows
+
+    def save_state(self, state_file):
+        """Persist the rolling state (and the latest rows, for the as-of ratio) so the next run resumes without replaying history."""
+        latest = {
+            name: None if row is None else {**row, "Date": row["Date"].isoformat(), "revision": False}
+            for name, row in self.latest.items()
+        }
+        with open(state_file, "w") as f:
+            json.dump({"series": {name: series.to_state() for name, series in self.series.items()}, "latest": latest}, f)
+
+    @classmethod
+    def load_state(cls, state_file):
+        with open(state_file) as f:
+            state = json.load(f)
+        engine = cls()
+        # States saved before the latest rows were kept only hold the series
+        series_states = state.get("series", state)
+        engine.series = {name: SeriesState.from_state(series_state) for name, series_state in series_states.items()}
+        for name, row in state.get("latest", {}).items():
+            if row is not None:
+                engine.latest[name] = {**row, "Date": pd.Timestamp(row["Date"])}
+        return engine
+
+
+def _drop_last_line(file_path):
+    """Truncate the last line of a file in place (used to rewrite a revised bar)."""
+    with open(file_path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        f.seek(max(0, end - 4096))
+        tail = f.read()
+        # Ignore the trailing newline when looking for the start of the last line
+        start = tail.rfind(b"\n", 0, len(tail) - 1)
+        f.truncate(end - len(tail) + start + 1)
+
+
+def append_feature_rows(rows, data_dir=DATA_DIR):
+    """Append (or rewrite, for revised bars) only the new rows in each feature dataset."""
+    for name, (row, revision) in rows.items():
+        file_path = dataset_path(name, data_dir=data_dir)
+        row = {key: (0 if isinstance(value, float) and math.isnan(value) else value) for key, value in row.items()}
+
+        if is_parquet(file_path):
+            # Parquet appends replace rows at or after the new date themselves
+            append_frame(pd.DataFrame([row]), file_path)
+            continue
+
+        row["Date"] = row["Date"].strftime("%Y-%m-%d")
+        if revision and os.path.exists(file_path):
+            _drop_last_line(file_path)
+        append_frame(pd.DataFrame([row]), file_path)
+
+
+def refresh_features(nifty_file, midcap_file, data_dir, state_file):
+    """
+    Append features for bars in the processed files that are newer than the saved state.
+
+    A bar dated like the latest processed bar is only replayed (as a revision) when its values changed.
+
+    Returns:
+    - Number of new or revised timestamps processed.
+    """
+    if os.path.exists(state_file):
+        engine = IncrementalFeatureEngine.load_state(state_file)
+    else:
+        # First run: the existing outputs already cover the history
+        engine = IncrementalFeatureEngine.from_history(nifty_file, midcap_file)
+        engine.save_state(state_file)
+        return 0
+
+    histories = {
+        "nifty": read_frame(nifty_file, parse_dates=["Date"]),
+        "midcap": read_frame(midcap_file, parse_dates=["Date"])
+    }
+    new_bars = {}
+    for name, data in histories.items():
+        series = engine.series[name]
+        bars = data.to_dict("records")
+        if series.last_date is not None:
+            latest = data[data["Date"] == series.last_date].tail(1).to_dict("records")
+            bars = [bar for bar in latest if series.is_revised(bar)] + data[data["Date"] > series.last_date].to_dict("records")
+        for bar in bars:
+            new_bars.setdefault(bar["Date"], {})[name] = bar
+
+    for date in sorted(new_bars):
+        append_feature_rows(engine.update(date, new_bars[date]), data_dir)
+
+    engine.save_state(state_file)
+    return len(new_bars)
+
+
+def main():
+    # File paths
+    nifty_file = dataset_path("processed_nifty_50_data")
+    midcap_file = dataset_path("processed_midcap_100_data")
+    state_file = os.path.join(DATA_DIR, "incremental_state.json")
+
+    processed = refresh_features(nifty_file, midcap_file, DATA_DIR, state_file)
+    print(f"✅ Incremental feature refresh completed ({processed} bars processed)!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+import atexit
+import collections
+import cProfile
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Instrumentation settings (environment variables, or configure() at runtime):
+# - CASH_MODEL_INSTRUMENTATION: "0" disables the stage wrappers entirely.
+# - CASH_MODEL_PROFILE: "off", "cprofile" (.prof file per top-level stage) or "tracemalloc" (peak allocations of top-level stages).
+# - CASH_MODEL_METRICS_FILE: file the metrics are exported to at exit (".prom" for Prometheus text, JSON otherwise).
+ENABLED = os.environ.get("CASH_MODEL_INSTRUMENTATION", "1") != "0"
+CONFIG = {
+    "profile": os.environ.get("CASH_MODEL_PROFILE", "off"),
+    "metrics_file": os.environ.get("CASH_MODEL_METRICS_FILE"),
+    "profile_dir": os.environ.get("CASH_MODEL_PROFILE_DIR", "profiles")
+}
+
+MAX_EVENTS = 1000
+
+_lock = threading.Lock()
+_local = threading.local()
+# tracemalloc and cProfile are process-wide, so one stage (on any thread) profiles at a time
+_profile_lock = threading.Lock()
+_profile_owner = None
+_stages = collections.OrderedDict()
+_events = collections.deque(maxlen=MAX_EVENTS)
+
+
+def configure(profile=None, metrics_file=None, profile_dir=None):
+    """Change the profiling mode or export file at runtime."""
+    if profile is not None:
+        if profile not in ("off", "cprofile", "tracemalloc"):
+            raise ValueError("Invalid profile mode. Choose from 'off', 'cprofile', or 'tracemalloc'.")
+        CONFIG["profile"] = profile
+    if metrics_file is not None:
+        CONFIG["metrics_file"] = metrics_file
+    if profile_dir is not None:
+        CONFIG["profile_dir"] = profile_dir
+
+
+def peak_rss_bytes():
+    """Peak resident set size of the process in bytes (0 where unavailable)."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+def _path_size(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+    return os.path.getsize(path)
+
+
+def _file_arguments(signature, paths, args, kwargs):
+    """Return {path: (size, mtime)} for the arguments of the declared path parameters."""
+    if not paths:
+        return {}
+    arguments = signature.bind_partial(*args, **kwargs).arguments
+    files = {}
+    for name in paths:
+        value = arguments.get(name)
+        if isinstance(value, (str, os.PathLike)):
+            path = os.fspath(value)
+            files[path] = (_path_size(path), os.path.getmtime(path)) if os.path.exists(path) else None
+    return files
+
+
+def _start_profile():
+    """Claim the process-wide profiler for the calling stage; returns the profile mode it runs ("off" if taken)."""
+    global _profile_owner
+    mode = CONFIG["profile"]
+    if mode == "off":
+        return mode
+    with _profile_lock:
+        if _profile_owner is not None or (mode == "tracemalloc" and tracemalloc.is_tracing()):
+            return "off"
+        _profile_owner = threading.get_ident()
+    return mode
+
+
+def _stop_profile():
+    global _profile_owner
+    with _profile_lock:
+        _profile_owner = None
+
+
+def count_rows(result):
+    """Count the rows in a stage result (DataFrames, arrays, or containers of them)."""
+    if hasattr(result, "shape") and len(getattr(result, "shape", ())) > 0:
+        return int(result.shape[0])
+    if isinstance(result, (tuple, list)):
+        return sum(count_rows(item) for item in result)
+    if isinstance(result, dict):
+        return sum(count_rows(item) for item in result.values())
+    return 0
+
+
+def record(stage, seconds, rows=0, bytes_read=0, bytes_written=0, error=False, parent=None, **extra):
+    """Record one stage execution in the metrics registry."""
+    event = {
+        "stage": stage,
+        "parent": parent,
+        "seconds": seconds,
+        "rows": rows,
+        "bytes_read": bytes_read,
+        "bytes_written": bytes_written,
+        "peak_rss_bytes": peak_rss_bytes(),
+        "error": error,
+        "timestamp": time.time(),
+        **extra
+    }
+    with _lock:
+        summary = _stages.setdefault(stage, {
+            "calls": 0, "errors": 0, "seconds": 0.0, "max_seconds": 0.0,
+            "rows": 0, "bytes_read": 0, "bytes_written": 0, "peak_rss_bytes": 0
+        })
+        summary["calls"] += 1
+        summary["errors"] += int(error)
+        summary["seconds"] += seconds
+        summary["max_seconds"] = max(summary["max_seconds"], seconds)
+        summary["rows"] += rows
+        summary["bytes_read"] += bytes_read
+        summary["bytes_written"] += bytes_written
+        summary["peak_rss_bytes"] = max(summary["peak_rss_bytes"], event["peak_rss_bytes"])
+        if "peak_traced_bytes" in extra:
+            summary["peak_traced_bytes"] = max(summary.get("peak_traced_bytes", 0), extra["peak_traced_bytes"])
+        _events.append(event)
+
+
+def instrumented(func=None, *, stage=None, paths=()):
+    """
+    Decorator recording a function as a pipeline stage: wall time, rows returned,
+    bytes read from and written to the files of its `paths` parameters, and peak RSS.
+    """
+    if func is None:
+        return functools.partial(instrumented, stage=stage, paths=paths)
+    if not ENABLED:
+        return func
+
+    # Name stages after the source file, so scripts run as __main__ keep their module name
+    module = os.path.splitext(os.path.basename(func.__code__.co_filename))[0]
+    stage_name = stage or f"{module}.{func.__qualname__}"
+    signature = inspect.signature(func)
+    unknown = [name for name in paths if name not in signature.parameters]
+    if unknown:
+        raise ValueError(f"Stage {stage_name} has no parameters named {', '.join(unknown)}.")
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        parent = stack[-1] if stack else None
+        files_before = _file_arguments(signature, paths, args, kwargs)
+
+        # Only an outermost stage is profiled, so nested stages don't replace its profiler or reset its peak
+        profile_mode = _start_profile() if not stack else "off"
+        profiler = cProfile.Profile() if profile_mode == "cprofile" else None
+        trace = profile_mode == "tracemalloc"
+        if trace:
+            tracemalloc.start()
+        if profiler is not None:
+            profiler.enable()
+
+        stack.append(stage_name)
+        error = False
+        result = None
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+            return result
+        except Exception:
+            error = True
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            stack.pop()
+            extra = {}
+            if profiler is not None:
+                profiler.disable()
+                _stop_profile()
+                os.makedirs(CONFIG["profile_dir"], exist_ok=True)
+                profile_file = os.path.join(CONFIG["profile_dir"], f"{stage_name}.prof")
+                profiler.dump_stats(profile_file)
+                extra["profile_file"] = profile_file
+            if trace:
+                extra["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                _stop_profile()
+
+            # Files that changed were written by the stage; unchanged existing files were read
+            bytes_read = bytes_written = 0
+            for path, after in _file_arguments(signature, paths, args, kwargs).items():
+                before = files_before.get(path)
+                if after is not None and after != before:
+                    bytes_written += after[0]
+                elif before is not None:
+                    bytes_read += before[0]
+            record(stage_name, seconds, count_rows(result), bytes_read, bytes_written, error, parent, **extra)
+
+    return wrapper
+
+
+def snapshot():
+    """Return the current metrics: per-stage summaries and the most recent events."""
+    with _lock:
+        return {
+            "stages": {stage: dict(summary) for stage, summary in _stages.items()},
+            "events": list(_events),
+            "peak_rss_bytes": peak_rss_bytes()
+        }
+
+
+def reset():
+    with _lock:
+        _stages.clear()
+        _events.clear()
+
+
+def to_prometheus():
+    """Format the per-stage summaries as Prometheus text exposition."""
+    metrics = snapshot()
+    lines = []
+    for name, key, kind, description in [
+        ("cash_model_stage_calls_total", "calls", "counter", "Number of stage executions."),
+        ("cash_model_stage_errors_total", "errors", "counter", "Number of failed stage executions."),
+        ("cash_model_stage_seconds_total", "seconds", "counter", "Total wall time spent in the stage."),
+        ("cash_model_stage_max_seconds", "max_seconds", "gauge", "Slowest single execution of the stage."),
+        ("cash_model_stage_rows_total", "rows", "counter", "Rows returned by the stage."),
+        ("cash_model_stage_bytes_read_total", "bytes_read", "counter", "Bytes read from input files."),
+        ("cash_model_stage_bytes_written_total", "bytes_written", "counter", "Bytes written to output files."),
+        ("cash_model_stage_peak_rss_bytes", "peak_rss_bytes", "gauge", "Process peak RSS after the stage.")
+    ]:
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        for stage, summary in metrics["stages"].items():
+            lines.append(f'{name}{{stage="{stage}"}} {summary[key]}')
+    lines.append("# HELP cash_model_peak_rss_bytes Process peak RSS.")
+    lines.append("# TYPE cash_model_peak_rss_bytes gauge")
+    lines.append(f"cash_model_peak_rss_bytes {metrics['peak_rss_bytes']}")
+    return "\n".join(lines) + "\n"
+
+
+def export_metrics(file_path=None):
+    """Write the metrics to a file: Prometheus text for ".prom"/".txt" files, JSON otherwise."""
+    file_path = file_path or CONFIG["metrics_file"]
+    if not file_path:
+        return None
+    with open(file_path, "w") as f:
+        if file_path.endswith((".prom", ".txt")):
+            f.write(to_prometheus())
+        else:
+            json.dump(snapshot(), f, indent=2, default=str)
+    return file_path
+
+
+@atexit.register
+def _export_at_exit():
+    if CONFIG["metrics_file"] and _stages:
+        export_metrics()
@@ -0,0 +1,162 @@
+import argparse
+
+import pandas as pd
+import numpy as np
+
+from cashAllocationModel import DEFAULT_WEIGHTS, calculate_cash_allocation_batch, latest_features
+from dataStore import dataset_path, read_frame
+from featureIndex import FeatureIndex
+from instrumentation import instrumented
+
+# Intraday timestamps are compared with the daily (exchange-local, timezone-naive) feature dates
+EXCHANGE_TIMEZONE = "Asia/Kolkata"
+
+PRICE_COLUMNS = ["Date", "Close", "High", "Low", "Open", "Volume"]
+
+DEFAULT_HORIZON = "15min"
+DEFAULT_WINDOW = 30
+ESTIMATORS = ["close_to_close", "parkinson", "garman_klass"]
+
+
+@instrumented(paths=["bars_file"])
+def load_intraday_bars(bars_file, skiprows=3):
+    """
+    Load intraday OHLCV bars (as saved by dataCollection.fetch_intraday_data).
+
+    Returns:
+    - DataFrame indexed by exchange-local timestamps with Open, High, Low, Close and Volume columns.
+    """
+    bars = read_frame(bars_file, skiprows=skiprows, names=PRICE_COLUMNS)
+    dates = pd.to_datetime(bars["Date"], utc=True, errors="coerce")
+    bars = bars.assign(Date=dates.dt.tz_convert(EXCHANGE_TIMEZONE).dt.tz_localize(None))
+    bars = bars.dropna(subset=["Date"]).drop_duplicates("Date", keep="last").set_index("Date").sort_index()
+    return bars[["Open", "High", "Low", "Close", "Volume"]].apply(pd.to_numeric, errors="coerce")
+
+
+@instrumented
+def resample_bars(bars, horizon=DEFAULT_HORIZON):
+    """
+    Aggregate bars to a coarser horizon (e.g. "5min", "15min", "1h", "1D").
+
+    Bins without trades (overnight, weekends) are dropped rather than filled.
+    """
+    resampled = bars.resample(horizon).agg({
+        "Open": "first",
+        "High": "max",
+        "Low": "min",
+        "Close": "last",
+        "Volume": "sum"
+    })
+    return resampled.dropna(subset=["Close"])
+
+
+def calculate_realized_volatility(bars, window=DEFAULT_WINDOW):
+    """
+    Calculate rolling realized-volatility estimators over every bar at once.
+
+    - close_to_close: sample standard deviation of log close-to-close returns.
+    - parkinson: high-low range estimator, sqrt(mean(ln(H/L)^2) / (4 ln 2)).
+    - garman_klass: sqrt(mean(0.5 ln(H/L)^2 - (2 ln 2 - 1) ln(C/O)^2)).
+
+    Parameters:
+    - bars: OHLC bars (e.g. from resample_bars).
+    - window: Rolling window length in bars.
+
+    Returns:
+    - DataFrame with one per-bar volatility column per estimator.
+    """
+    log_close = np.log(bars["Close"])
+    log_range = np.log(bars["High"] / bars["Low"])
+    log_body = np.log(bars["Close"] / bars["Open"])
+
+    close_to_close = log_close.diff().rolling(window=window).std()
+    parkinson = np.sqrt((log_range ** 2).rolling(window=window).mean() / (4 * np.log(2)))
+    garman_klass_variance = (0.5 * log_range ** 2 - (2 * np.log(2) - 1) * log_body ** 2).rolling(window=window).mean()
+    garman_klass = np.sqrt(garman_klass_variance.clip(lower=0))
+
+    return pd.DataFrame({
+        "close_to_close": close_to_close,
+        "parkinson": parkinson,
+        "garman_klass": garman_klass
+    }, index=bars.index)
+
+
+@instrumented
+def calculate_intraday_features(bars, horizon=DEFAULT_HORIZON, window=DEFAULT_WINDOW):
+    """
+    Resample 1-minute bars and calculate rolling volatility estimators and average volume.
+
+    Returns:
+    - DataFrame indexed by bar timestamp with the estimator columns and "Average Volume".
+    """
+    resampled = resample_bars(bars, horizon)
+    features = calculate_realized_volatility(resampled, window)
+
+    # Zero volumes (index data often reports none) are excluded from the average
+    volume = resampled["Volume"].replace(0, np.nan)
+    features["Average Volume"] = volume.rolling(window=window, min_periods=1).mean().fillna(0)
+    return features
+
+
+@instrumented(paths=["bars_file", "institutional_flows_file", "market_breadth_file"])
+def calculate_intraday_allocation(bars_file, institutional_flows_file, market_breadth_file, horizon=DEFAULT_HORIZON,
+                                  window=DEFAULT_WINDOW, estimator="garman_klass", risk_tolerances=("high", "medium", "low"),
+                                  weights=None, damping=None):
+    """
+    Calculate the cash allocation from intraday volatility and volume, without the daily batch pipeline.
+
+    The intraday estimator and average volume replace the daily volatility and volume metrics;
+    institutional flows and market breadth are taken as of the latest bar.
+
+    Parameters:
+    - bars_file: Intraday bars file (as saved by dataCollection.fetch_intraday_data).
+    - institutional_flows_file, market_breadth_file: Daily feature datasets.
+    - horizon: Resampling horizon of the bars.
+    - window: Rolling window length in resampled bars.
+    - estimator: "close_to_close", "parkinson" or "garman_klass".
+    - risk_tolerances, weights, damping: As in calculate_cash_allocation_batch.
+
+    Returns:
+    - Tuple of (latest bar timestamp, Series of cash allocation % per risk tolerance).
+    """
+    if estimator not in ESTIMATORS:
+        raise ValueError(f"Invalid estimator. Choose from {', '.join(ESTIMATORS)}.")
+
+    features = calculate_intraday_features(load_intraday_bars(bars_file), horizon, window)
+    features = features.dropna(subset=[estimator])
+    if features.empty:
+        raise ValueError(f"Not enough intraday bars for a {window}-bar window at a {horizon} horizon.")
+
+    institutional_flows_data = read_frame(institutional_flows_file, columns=["MONTH", "FII/DII Ratio"])
+    market_breadth_data = read_frame(market_breadth_file, columns=["Date", "Advance-Decline Ratio"], parse_dates=["Date"])
+    index = (
+        FeatureIndex()
+        .add("volatility", features.index, features[estimator])
+        .add("volume", features.index, features["Average Volume"])
+        .add_monthly("institutional_flows", institutional_flows_data, "FII/DII Ratio")
+        .add_frame("market_breadth", market_breadth_data, "Advance-Decline Ratio")
+    )
+    as_of = features.index[-1]
+    allocations = calculate_cash_allocation_batch(latest_features(index, as_of), weights if weights is not None else DEFAULT_WEIGHTS,
+                                                  risk_tolerances, damping)[0]
+    return as_of, pd.Series(allocations, index=list(risk_tolerances))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Intraday cash allocation from resampled 1-minute bars.")
+    parser.add_argument("--bars", default=dataset_path("nifty_50_intraday"), help="Intraday bars file.")
+    parser.add_argument("--horizon", default=DEFAULT_HORIZON, help="Resampling horizon (e.g. 5min, 15min, 1h).")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="Rolling window in resampled bars.")
+    parser.add_argument("--estimator", choices=ESTIMATORS, default="garman_klass")
+    args = parser.parse_args()
+
+    as_of, allocations = calculate_intraday_allocation(
+        args.bars, dataset_path("institutional_flows"), dataset_path("market_breadth"),
+        args.horizon, args.window, args.estimator
+    )
+    for risk_tolerance, cash_allocation in allocations.items():
+        print(f"Recommended Cash Allocation ({risk_tolerance.capitalize()} Risk, {as_of:%Y-%m-%d %H:%M}): {cash_allocation:.2f}%")
+
+
+if __name__ == "__main__":
+    main()
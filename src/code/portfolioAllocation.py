@@ -0,0 +1,122 @@
+import argparse
+
+import pandas as pd
+import numpy as np
+
+from cashAllocationModel import (DEFAULT_DAMPING, DEFAULT_WEIGHTS, FEATURE_NAMES, RISK_TOLERANCE_LEVELS,
+                                 calculate_scores, load_latest_features)
+from dataStore import dataset_path, read_frame, write_frame
+from instrumentation import instrumented
+
+# Columns of the accounts table; weight overrides use the FEATURE_NAMES columns (blank keeps the model weight)
+ACCOUNT_COLUMNS = ["Account", "Risk Tolerance", "Min Cash", "Max Cash"]
+
+
+def load_accounts(accounts_file):
+    """
+    Load the accounts table (CSV or Parquet).
+
+    Expected columns:
+    - Account: Account identifier.
+    - Risk Tolerance: "high", "medium", "low" or a numeric maximum cash level (in %).
+    - Min Cash, Max Cash: Optional bounds of the cash allocation (in %).
+    - volatility, volume, institutional_flows, market_breadth: Optional weight overrides.
+
+    Returns:
+    - DataFrame of accounts.
+    """
+    accounts = read_frame(accounts_file)
+    missing = [column for column in ACCOUNT_COLUMNS[:2] if column not in accounts.columns]
+    if missing:
+        raise ValueError(f"Accounts table is missing the columns: {', '.join(missing)}.")
+    return accounts
+
+
+def _account_levels(risk_tolerances):
+    """Map a column of risk tolerance names or numeric levels to maximum cash levels."""
+    levels = risk_tolerances.map(RISK_TOLERANCE_LEVELS)
+    levels = levels.fillna(pd.to_numeric(risk_tolerances, errors="coerce")).astype(float)
+    if levels.isna().any():
+        invalid = ", ".join(map(str, risk_tolerances[levels.isna()].unique()[:5]))
+        raise ValueError(f"Invalid risk tolerance ({invalid}). Choose from 'high', 'medium', 'low' or a number.")
+    return levels.to_numpy()
+
+
+def _account_weights(accounts, weights=None):
+    """Build the (accounts, 4) weight matrix, filling missing overrides with the model weights."""
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    columns = []
+    for name in FEATURE_NAMES:
+        overrides = pd.to_numeric(accounts[name], errors="coerce") if name in accounts.columns else pd.Series(np.nan, index=accounts.index)
+        columns.append(overrides.fillna(weights[name]).to_numpy(dtype=float))
+    return np.column_stack(columns)
+
+
+@instrumented
+def calculate_account_allocations(features, accounts, weights=None, damping=None):
+    """
+    Calculate the cash allocation of every account in one vectorized evaluation.
+
+    Parameters:
+    - features: Latest normalized metrics, as returned by load_latest_features.
+    - accounts: Accounts table, as returned by load_accounts.
+    - weights: Default weights for accounts without overrides (defaults to the model weights).
+    - damping: Dict or vector of damping factors shared by every account (defaults to the model damping).
+
+    Returns:
+    - DataFrame with the account columns, "Score" and "Cash Allocation" (% clipped to the account bounds).
+    """
+    levels = _account_levels(accounts["Risk Tolerance"])
+    scores = calculate_scores(features, _account_weights(accounts, weights), damping if damping is not None else DEFAULT_DAMPING)
+    allocations = np.maximum(0, levels * (1 - scores))
+
+    # Account bounds (blank bounds leave the allocation unconstrained)
+    min_cash = pd.to_numeric(accounts.get("Min Cash", pd.Series(np.nan, index=accounts.index)), errors="coerce").fillna(0)
+    max_cash = pd.to_numeric(accounts.get("Max Cash", pd.Series(np.nan, index=accounts.index)), errors="coerce").fillna(100)
+    if (min_cash > max_cash).any():
+        invalid = ", ".join(map(str, accounts.loc[min_cash > max_cash, "Account"].head(5)))
+        raise ValueError(f"Min Cash exceeds Max Cash for accounts: {invalid}.")
+    allocations = np.clip(allocations, min_cash.to_numpy(), max_cash.to_numpy())
+
+    result = accounts[[column for column in accounts.columns if column in ACCOUNT_COLUMNS]].copy()
+    result["Score"] = scores
+    result["Cash Allocation"] = allocations
+    return result
+
+
+@instrumented(paths=["accounts_file", "volatility_file", "volume_file", "institutional_flows_file", "market_breadth_file"])
+def allocate_accounts(accounts_file, volatility_file, volume_file, institutional_flows_file, market_breadth_file,
+                      weights=None, damping=None, as_of=None):
+    """
+    Load the features once and allocate every account of the accounts table.
+
+    Returns:
+    - DataFrame as returned by calculate_account_allocations.
+    """
+    features = load_latest_features(volatility_file, volume_file, institutional_flows_file, market_breadth_file, as_of)
+    return calculate_account_allocations(features, load_accounts(accounts_file), weights, damping)
+
+
+@instrumented(paths=["destination"])
+def export_account_allocations(allocations, destination):
+    """Save the account allocations in bulk (CSV, or Parquet for a .parquet destination)."""
+    write_frame(allocations, destination)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cash allocation for every account of an accounts table.")
+    parser.add_argument("--accounts", default=dataset_path("accounts"), help="Accounts table (CSV or Parquet).")
+    parser.add_argument("--output", default=dataset_path("account_allocations"), help="Output file (CSV or Parquet).")
+    parser.add_argument("--as-of", default=None, help="Only use data observed on or before this date.")
+    args = parser.parse_args()
+
+    allocations = allocate_accounts(
+        args.accounts, dataset_path("nifty_volatility"), dataset_path("nifty_volume"),
+        dataset_path("institutional_flows"), dataset_path("market_breadth"), as_of=args.as_of
+    )
+    export_account_allocations(allocations, args.output)
+    print(f"✅ Cash allocations of {len(allocations)} accounts saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
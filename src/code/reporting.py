@@ -0,0 +1,120 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from featureIndex import month_end_dates
+
+# Plots are rendered on demand, so matplotlib is only imported when a chart is drawn
+SCREENSHOT_DIR = os.environ.get("CASH_MODEL_SCREENSHOT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "screenshots"))
+
+
+def _new_figure(figsize=(10, 6)):
+    """Create a standalone Agg figure (no pyplot global state, so it is safe in a worker thread)."""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    figure = Figure(figsize=figsize)
+    FigureCanvasAgg(figure)
+    return figure, figure.add_subplot()
+
+
+def _save(figure, output_file):
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    figure.savefig(output_file)
+    return output_file
+
+
+def plot_volatility_metrics(nifty_volatility, midcap_volatility, output_file=os.path.join(SCREENSHOT_DIR, "volatility_metrics.png")):
+    """Plot the Nifty and Midcap 30-day rolling volatility."""
+    figure, ax = _new_figure()
+    ax.plot(nifty_volatility["Date"], nifty_volatility["30-Day Volatility"], label="Nifty 30-Day Volatility")
+    ax.plot(midcap_volatility["Date"], midcap_volatility["30-Day Volatility"], label="Midcap 30-Day Volatility")
+    ax.set_title("30-Day Rolling Volatility")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Volatility")
+    ax.legend()
+    ax.grid()
+    return _save(figure, output_file)
+
+
+def plot_institutional_flows(institutional_flows, output_file=os.path.join(SCREENSHOT_DIR, "institutional_flows.png")):
+    """Plot FII and DII net flows per month."""
+    figure, ax = _new_figure()
+    # Label the yyyymm month numbers as "Mar 2025"
+    months = month_end_dates(institutional_flows["MONTH"]).dt.strftime("%b %Y")
+    ax.plot(months, institutional_flows["FII Net Flow"], label="FII Net Flow", marker="o")
+    ax.plot(months, institutional_flows["DII Net Flow"], label="DII Net Flow", marker="o")
+    ax.set_title("Institutional Flows (FII vs DII)")
+    ax.set_xlabel("Month")
+    ax.set_ylabel("Net Flow (INR Crore)")
+    ax.legend()
+    ax.grid()
+    ax.tick_params(axis="x", labelrotation=45)
+    figure.tight_layout()
+    return _save(figure, output_file)
+
+
+def plot_market_breadth(market_breadth, output_file=os.path.join(SCREENSHOT_DIR, "market_breadth.png")):
+    """Plot the advance-decline ratio."""
+    figure, ax = _new_figure()
+    ax.plot(market_breadth["Date"], market_breadth["Advance-Decline Ratio"], label="Advance-Decline Ratio")
+    ax.set_title("Advance-Decline Ratio")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Ratio")
+    ax.legend()
+    ax.grid()
+    return _save(figure, output_file)
+
+
+def plot_interest_rates(interest_rates, output_file=os.path.join(SCREENSHOT_DIR, "interest_rates.png")):
+    """Plot the repo and reverse repo rates."""
+    figure, ax = _new_figure(figsize=(6.4, 4.8))
+    ax.bar(list(interest_rates.keys()), list(interest_rates.values()))
+    ax.set_title("Interest Rate Metrics")
+    ax.set_ylabel("Rate (%)")
+    ax.grid()
+    return _save(figure, output_file)
+
+
+def plot_cash_allocation_metrics(features, risk_tolerance, output_file=os.path.join(SCREENSHOT_DIR, "cash_allocation_metrics.png")):
+    """Plot the normalized liquidity metrics used for the cash allocation."""
+    metrics = ["Volatility", "Volume", "Institutional Flows", "Market Breadth"]
+    figure, ax = _new_figure()
+    ax.bar(metrics, list(features), color=["blue", "green", "orange", "purple"])
+    label = risk_tolerance.capitalize() if isinstance(risk_tolerance, str) else f"{risk_tolerance:g}% max cash"
+    ax.set_title(f"Liquidity Metrics and Cash Allocation (Risk Tolerance: {label})")
+    ax.set_ylabel("Normalized Score")
+    ax.grid(axis="y")
+    figure.tight_layout()
+    return _save(figure, output_file)
+
+
+class ReportRenderer:
+    """Renders plots in a background worker so computation does not wait on PNG output."""
+
+    def __init__(self, max_workers=1):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report")
+        self._futures = []
+
+    def submit(self, plot_function, *args, **kwargs):
+        """Queue a plot function; returns a future with the saved file path."""
+        future = self._executor.submit(plot_function, *args, **kwargs)
+        self._futures.append(future)
+        return future
+
+    def wait(self):
+        """Wait for every queued plot and return the saved file paths (re-raising render errors)."""
+        futures, self._futures = self._futures, []
+        return [future.result() for future in futures]
+
+    def close(self):
+        """Wait for the queued plots, shutting the worker down even if one of them failed."""
+        try:
+            self.wait()
+        finally:
+            self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+from dataStore import DATA_DIR
+
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+
+# How long (in seconds) cached source data is considered fresh
+SOURCE_TTLS = {
+    "yfinance": 12 * 60 * 60,
+    "fii_dii": 24 * 60 * 60,
+    "rbi": 24 * 60 * 60,
+    "sebi": 24 * 60 * 60
+}
+
+MAX_ENTRIES = 256
+MAX_BYTES = 512 * 1024 * 1024
+
+
+def content_hash(content):
+    """Return the SHA-256 hex digest of a string or bytes payload."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def cache_key(source, *parts):
+    """Build a content-addressed key from the source name and its parameters (ticker, date range, ...)."""
+    return content_hash("|".join([source] + [str(part) for part in parts]))
+
+
+def missing_ranges(start, end, covered_start=None, covered_end=None):
+    """
+    Return the [start, end) date ranges that are requested but not covered by the cache.
+
+    The last covered day is always re-fetched since it may have been cached before the close.
+    """
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+    if covered_start is None or covered_end is None:
+        return [(start, end)]
+
+    covered_start, covered_end = pd.Timestamp(covered_start), pd.Timestamp(covered_end)
+    ranges = []
+    if start < covered_start:
+        ranges.append((start, min(covered_start, end)))
+    if end >= covered_end:
+        ranges.append((max(covered_end - pd.Timedelta(days=1), start), end))
+    return ranges
+
+
+class SourceCache:
+    """Local cache of collected source data with per-source TTLs and LRU eviction."""
+
+    def __init__(self, cache_dir=CACHE_DIR, ttls=None, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttls = {**SOURCE_TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.index_file = os.path.join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_file):
+            return {}
+        with open(self.index_file) as f:
+            return json.load(f)
+
+    def _save_index(self):
+        temporary_file = self.index_file + ".tmp"
+        with open(temporary_file, "w") as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(temporary_file, self.index_file)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def entry(self, key):
+        """Return the metadata of a cached entry, or None."""
+        with self._lock:
+            entry = self.index.get(key)
+            if entry is not None:
+                entry["accessed"] = time.time()
+            return entry
+
+    def is_fresh(self, key):
+        """Return True if the entry exists and is younger than its source's TTL."""
+        entry = self.index.get(key)
+        if entry is None:
+            return False
+        return time.time() - entry["updated"] < self.ttls.get(entry["source"], 0)
+
+    def load(self, key):
+        """Load a cached DataFrame, or None if it is missing."""
+        entry = self.entry(key)
+        if entry is None or not os.path.exists(self._path(key)):
+            return None
+        return pd.read_pickle(self._path(key))
+
+    def store(self, key, source, data=None, **metadata):
+        """
+        Store a DataFrame (optional) and its metadata under a key, then evict old entries.
+
+        Parameters:
+        - key: Cache key from cache_key.
+        - source: Source name, used for the TTL.
+        - data: Optional DataFrame payload.
+        - metadata: Extra JSON-serializable metadata (covered date range, content hash, ...).
+        """
+        size = 0
+        if data is not None:
+            data.to_pickle(self._path(key))
+            size = os.path.getsize(self._path(key))
+        now = time.time()
+        with self._lock:
+            self.index[key] = {"source": source, "updated": now, "accessed": now, "size": size, **metadata}
+            self._evict()
+            self._save_index()
+
+    def touch(self, key):
+        """Mark an entry as refreshed without changing its payload (e.g. unchanged content)."""
+        with self._lock:
+            if key in self.index:
+                self.index[key]["updated"] = self.index[key]["accessed"] = time.time()
+                self._save_index()
+
+    def _evict(self):
+        """Drop least recently used entries until the entry count and total size fit the limits."""
+        entries = sorted(self.index.items(), key=lambda item: item[1]["accessed"])
+        total_bytes = sum(entry["size"] for _, entry in entries)
+        while entries and (len(entries) > self.max_entries or total_bytes > self.max_bytes):
+            key, entry = entries.pop(0)
+            total_bytes -= entry["size"]
+            del self.index[key]
+            if os.path.exists(self._path(key)):
+                os.remove(self._path(key))
+
+    def fetch_history(self, source, ticker, start, end, download):
+        """
+        Return the [start, end) price history of a ticker, downloading only the missing ranges.
+
+        Parameters:
+        - source: Source name (e.g. "yfinance").
+        - ticker: Ticker symbol.
+        - start, end: Requested date range.
+        - download: Callable (start, end) -> DataFrame indexed by date.
+
+        Returns:
+        - DataFrame with the merged history for the requested range.
+        """
+        key = cache_key(source, ticker)
+        entry = self.entry(key)
+        history = self.load(key) if entry is not None else None
+
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        if history is not None and self.is_fresh(key) and entry["start"] <= str(start.date()) and entry["end"] >= str(end.date()):
+            return history.loc[(history.index >= start) & (history.index < end)]
+
+        covered_start = entry["start"] if history is not None else None
+        covered_end = entry["end"] if history is not None else None
+        frames = [] if history is None else [history]
+        for range_start, range_end in missing_ranges(start, end, covered_start, covered_end):
+            data = download(range_start.strftime("%Y-%m-%d"), range_end.strftime("%Y-%m-%d"))
+            if data is not None and not data.empty:
+                frames.append(data)
+
+        if not frames:
+            return pd.DataFrame()
+        history = pd.concat(frames)
+        history = history[~history.index.duplicated(keep="last")].sort_index()
+
+        new_start = min(start, pd.Timestamp(covered_start)) if covered_start else start
+        new_end = max(end, pd.Timestamp(covered_end)) if covered_end else end
+        self.store(key, source, history, ticker=ticker, start=str(new_start.date()), end=str(new_end.date()))
+        return history.loc[(history.index >= start) & (history.index < end)]
+
+    def content_changed(self, source, content):
+        """
+        Compare a scraped page with the content hash recorded for the source.
+
+        Returns:
+        - False if the page is identical to the last recorded scrape (its TTL is renewed).
+        """
+        key = cache_key(source)
+        entry = self.entry(key)
+        if entry is not None and entry.get("content_hash") == content_hash(content):
+            self.touch(key)
+            return False
+        return True
+
+    def record_content(self, source, content):
+        """Record the content hash of a scrape once its output has been saved."""
+        self.store(cache_key(source), source, content_hash=content_hash(content))
+
+    def scrape_is_fresh(self, source):
+        """Return True if the source was scraped within its TTL, so the browser can be skipped."""
+        return self.is_fresh(cache_key(source))
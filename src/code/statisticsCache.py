@@ -0,0 +1,291 @@
+import collections
+import hashlib
+import io
+import json
+import os
+import threading
+
+import pandas as pd
+import numpy as np
+
+from dataStore import DATA_DIR, is_parquet, read_frame
+from featureIndex import FeatureIndex, month_end_dates
+
+CACHE_DIR = os.path.join(DATA_DIR, ".cache", "statistics")
+
+# Statistics kept in memory, and spilled to disk (one JSON file per entry)
+MAX_MEMORY_ENTRIES = 128
+MAX_DISK_ENTRIES = 1024
+
+# "0" disables the cache (every call rescans its inputs)
+ENABLED = os.environ.get("CASH_MODEL_STATS_CACHE", "1") != "0"
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def _files(path):
+    if os.path.isdir(path):
+        return sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+    return [path]
+
+
+def file_fingerprint(path, prefix_size=None):
+    """
+    Hash the content of a file (or every file of a Parquet dataset).
+
+    Returns:
+    - Tuple of (SHA-256 hex digest, digest of the first `prefix_size` bytes or None).
+    """
+    digest = hashlib.sha256()
+    prefix_digest = None
+    position = 0
+    for file in _files(path):
+        with open(file, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                if prefix_size is not None and position < prefix_size <= position + len(block):
+                    digest.update(block[:prefix_size - position])
+                    prefix_digest = digest.hexdigest()
+                    digest.update(block[prefix_size - position:])
+                else:
+                    digest.update(block)
+                position += len(block)
+    if prefix_size == 0:
+        prefix_digest = hashlib.sha256().hexdigest()
+    return digest.hexdigest(), prefix_digest
+
+
+def file_state(path):
+    """Cheap change detector: total size and latest modification time."""
+    files = _files(path)
+    return sum(os.path.getsize(file) for file in files), max((os.stat(file).st_mtime_ns for file in files), default=0)
+
+
+def _summarize(series):
+    """Statistics of a (date-ordered) series."""
+    valid = series.dropna()
+    return {
+        "count": int(valid.count()),
+        "min": float(valid.min()) if len(valid) else None,
+        "max": float(valid.max()) if len(valid) else None,
+        "median": float(valid.median()) if len(valid) else None,
+        "last": float(series.iloc[-1]) if len(series) else None,
+        "last_date": series.index[-1].isoformat() if len(series) and isinstance(series.index, pd.DatetimeIndex) else None
+    }
+
+
+def normalized_last(statistics):
+    """Min-max normalized latest value (0 when there is no data or no range), as in latest_features."""
+    if statistics["count"] == 0 or statistics["last"] is None:
+        return 0.0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        value = np.float64(statistics["last"] - statistics["min"]) / np.float64(statistics["max"] - statistics["min"])
+    return 0.0 if np.isnan(value) else float(value)
+
+
+class StatisticsCache:
+    """
+    Memoized column statistics (count, min, max, median and latest value)
+    keyed by file content hash and column, with an in-memory LRU and an on-disk spill.
+
+    When a CSV file only had rows appended, the statistics are updated from the new rows
+    instead of rescanning the file.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_memory_entries=MAX_MEMORY_ENTRIES, max_disk_entries=MAX_DISK_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory = collections.OrderedDict()
+        # path -> (size, mtime_ns, content hash) of the last fingerprinted version
+        self._states = {}
+        self._lock = threading.RLock()
+        # The cache directory is only created by the first spill, so reading never writes to the data directory
+        self.states_file = os.path.join(cache_dir, "files.json")
+        if os.path.exists(self.states_file):
+            with open(self.states_file) as f:
+                self._states = json.load(f)
+
+    @staticmethod
+    def _key(content_hash, column, date_column, month_column, zero_as_missing):
+        parts = [content_hash, column, date_column, month_column, zero_as_missing]
+        return hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _get(self, key):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+        if os.path.exists(self._path(key)):
+            with open(self._path(key)) as f:
+                entry = json.load(f)
+            os.utime(self._path(key))
+            self._remember(key, entry)
+            return entry
+        return None
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _write(self, file_path, data):
+        """Write a JSON file atomically; returns False (keeping the entry in memory only) when the directory is read-only."""
+        temporary_file = file_path + ".tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temporary_file, "w") as f:
+                json.dump(data, f)
+            os.replace(temporary_file, file_path)
+        except OSError:
+            return False
+        return True
+
+    def _put(self, key, entry):
+        self._remember(key, entry)
+        if self._write(self._path(key), entry):
+            self._evict_disk()
+
+    def _evict_disk(self):
+        """Drop the least recently used spilled entries beyond the disk limit."""
+        files = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                 if name.endswith(".json") and name != "files.json"]
+        if len(files) <= self.max_disk_entries:
+            return
+        for file in sorted(files, key=os.path.getmtime)[:len(files) - self.max_disk_entries]:
+            os.remove(file)
+
+    def _save_states(self):
+        self._write(self.states_file, self._states)
+
+    def _fingerprint(self, path):
+        """Return (content hash, previous state) of a file, rehashing only when its size or mtime changed."""
+        path_key = os.path.abspath(path)
+        size, mtime = file_state(path)
+        previous = self._states.get(path_key)
+        if previous is not None and previous[0] == size and previous[1] == mtime:
+            return previous[2], previous
+
+        prefix_size = previous[0] if previous is not None and previous[0] <= size else None
+        content_hash, prefix_hash = file_fingerprint(path, prefix_size)
+        self._states[path_key] = [size, mtime, content_hash]
+        self._save_states()
+        # Only an unchanged prefix identifies an append
+        appended_from = previous if previous is not None and prefix_hash == previous[2] else None
+        return content_hash, appended_from
+
+    def _series(self, source, column, date_column, month_column, zero_as_missing):
+        """Read one column as a series ordered (and de-duplicated) by date when a date column is given."""
+        if month_column is not None:
+            data = read_frame(source, columns=[month_column, column])
+            dates = month_end_dates(data[month_column])
+        elif date_column is not None:
+            data = read_frame(source, columns=[date_column, column], parse_dates=[date_column])
+            dates = data[date_column]
+        else:
+            data = read_frame(source, columns=[column])
+            dates = None
+        return self._prepare(data[column], dates, zero_as_missing)
+
+    @staticmethod
+    def _prepare(values, dates, zero_as_missing):
+        values = pd.to_numeric(values, errors="coerce")
+        if zero_as_missing:
+            values = values.replace(0, np.nan)
+        if dates is None:
+            return values.reset_index(drop=True).astype(float)
+        return FeatureIndex().add("values", dates, values).series("values")
+
+    def _appended_series(self, path, previous_size, column, date_column, zero_as_missing):
+        """Parse only the rows appended to a CSV file after `previous_size` bytes."""
+        with open(path, "rb") as f:
+            header = f.readline().decode("utf-8").strip().split(",")
+            f.seek(previous_size)
+            appended = f.read()
+        data = pd.read_csv(io.BytesIO(appended), header=None, names=header)
+        dates = pd.to_datetime(data[date_column]) if date_column is not None else None
+        return self._prepare(data[column], dates, zero_as_missing)
+
+    @staticmethod
+    def _merge(entry, appended):
+        """Update statistics with appended rows; the median is recomputed lazily."""
+        valid = appended.dropna()
+        merged = dict(entry)
+        merged["count"] = entry["count"] + int(valid.count())
+        if len(valid):
+            merged["min"] = float(valid.min()) if entry["min"] is None else min(entry["min"], float(valid.min()))
+            merged["max"] = float(valid.max()) if entry["max"] is None else max(entry["max"], float(valid.max()))
+            merged["median"] = None
+        if len(appended):
+            merged["last"] = float(appended.iloc[-1])
+            merged["last_date"] = appended.index[-1].isoformat() if isinstance(appended.index, pd.DatetimeIndex) else None
+        return merged
+
+    def statistics(self, source, column, date_column=None, month_column=None, zero_as_missing=False):
+        """
+        Return the cached statistics of a column, computing them only when the file content changed.
+
+        Parameters:
+        - source: CSV or Parquet path.
+        - column: Column to summarize.
+        - date_column: Order the values by this date column (later duplicates win), as FeatureIndex does.
+        - month_column: Order the values by month end of this month column (yyyymm numbers or "%b %Y" labels) instead.
+        - zero_as_missing: Treat zeros as missing values (e.g. volumes).
+
+        Returns:
+        - Dict with count, min, max, median (None until requested after an append), last
+          and last_date.
+        """
+        with self._lock:
+            content_hash, previous = self._fingerprint(source)
+            key = self._key(content_hash, column, date_column, month_column, zero_as_missing)
+            entry = self._get(key)
+            if entry is not None:
+                return entry
+
+            previous_entry = None
+            if previous is not None and previous[2] != content_hash:
+                previous_entry = self._get(self._key(previous[2], column, date_column, month_column, zero_as_missing))
+            if previous_entry is not None and not is_parquet(source) and month_column is None:
+                appended = self._appended_series(source, previous[0], column, date_column, zero_as_missing)
+                # Appended rows must extend the history for the update to be exact
+                if date_column is None or previous_entry["last_date"] is None or appended.empty \
+                        or appended.index[0] > pd.Timestamp(previous_entry["last_date"]):
+                    entry = self._merge(previous_entry, appended)
+
+            if entry is None:
+                entry = _summarize(self._series(source, column, date_column, month_column, zero_as_missing))
+            self._put(key, entry)
+            return entry
+
+    def median(self, source, column, date_column=None, month_column=None, zero_as_missing=False):
+        """Return the cached median of a column (rescanning once after appended rows)."""
+        with self._lock:
+            entry = self.statistics(source, column, date_column, month_column, zero_as_missing)
+            if entry["median"] is None and entry["count"]:
+                series = self._series(source, column, date_column, month_column, zero_as_missing)
+                entry = {**entry, "median": float(series.median())}
+                content_hash = self._states[os.path.abspath(source)][2]
+                self._put(self._key(content_hash, column, date_column, month_column, zero_as_missing), entry)
+            return entry["median"]
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_statistics_cache():
+    """Return the shared StatisticsCache, or None when the cache is disabled."""
+    global _default_cache
+    if not ENABLED:
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = StatisticsCache()
+        return _default_cache
@@ -0,0 +1,262 @@
+import pandas as pd
+import numpy as np
+
+from dataStore import append_frame, dataset_path, iter_frames, write_frame
+from featureIndex import FeatureIndex, asof_positions
+from instrumentation import instrumented
+
+# Rows per chunk: memory use depends on this, not on the length of the history
+CHUNK_SIZE = 100000
+WINDOW = 30
+
+PRICE_COLUMNS = ["Date", "Close", "High", "Low", "Open", "Volume"]
+
+# Bins per histogram pass of streaming_median, and how many candidate values may be held at once
+MEDIAN_BINS = 4096
+MEDIAN_CANDIDATES = 1000000
+
+
+class RollingCarry:
+    """
+    Carries the last window - 1 values of a series across chunk boundaries, so a pandas
+    rolling computation over each chunk sees exactly the windows of the full series.
+    """
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.tail = None
+
+    def apply(self, values, function):
+        """
+        Apply a rolling function to the carried tail followed by a new chunk.
+
+        Returns:
+        - The result for the chunk's rows only.
+        """
+        values = values.reset_index(drop=True)
+        carried = 0 if self.tail is None else len(self.tail)
+        combined = values if self.tail is None else pd.concat([self.tail, values], ignore_index=True)
+        result = function(combined)
+        self.tail = combined.iloc[-(self.window - 1):] if self.window > 1 else combined.iloc[:0]
+        return result.iloc[carried:].reset_index(drop=True)
+
+
+def write_chunks(chunks, destination):
+    """Write a generator of DataFrame chunks to a CSV file or Parquet dataset; returns the row count."""
+    rows = 0
+    for chunk in chunks:
+        if rows == 0:
+            write_frame(chunk, destination)
+        else:
+            append_frame(chunk, destination)
+        rows += len(chunk)
+    return rows
+
+
+def iter_price_chunks(price_file, chunksize=CHUNK_SIZE, skiprows=1, names=PRICE_COLUMNS):
+    """Read a processed (skiprows=1) or raw yfinance (skiprows=3) price file in chunks."""
+    return iter_frames(price_file, chunksize, skiprows=skiprows, names=names, parse_dates=["Date"])
+
+
+@instrumented(paths=["input_file", "output_file"])
+def stream_preprocess(input_file, output_file, chunksize=CHUNK_SIZE):
+    """Chunked equivalent of featureEngineering.preprocess_csv."""
+    chunks = iter_frames(input_file, chunksize, skiprows=3, names=PRICE_COLUMNS)
+    rows = write_chunks(chunks, output_file)
+    print(f"✅ Preprocessed data saved to {output_file}")
+    return rows
+
+
+def stream_returns(chunks):
+    """
+    Yield chunks with a "Daily Return" column matching pandas' pct_change over the full series.
+
+    The last (forward-filled) close of each chunk is carried into the next.
+    """
+    last_close = None
+    for chunk in chunks:
+        close = chunk["Close"].reset_index(drop=True)
+        if last_close is not None:
+            close = pd.concat([pd.Series([last_close]), close], ignore_index=True)
+        returns = close.pct_change()
+        if last_close is not None:
+            returns = returns.iloc[1:]
+        filled = close.ffill()
+        if len(filled) and pd.notna(filled.iloc[-1]):
+            last_close = filled.iloc[-1]
+        yield chunk.assign(**{"Daily Return": returns.to_numpy()})
+
+
+def stream_volatility(price_file, chunksize=CHUNK_SIZE, window=WINDOW):
+    """Yield Date and 30-Day Volatility chunks (before missing values are filled)."""
+    carry = RollingCarry(window)
+    for chunk in stream_returns(iter_price_chunks(price_file, chunksize)):
+        volatility = carry.apply(chunk["Daily Return"], lambda values: values.rolling(window=window).std())
+        yield pd.DataFrame({"Date": chunk["Date"].to_numpy(), "30-Day Volatility": volatility.to_numpy()})
+
+
+def stream_asof_join(left_chunks, right_chunks, value_column):
+    """
+    Attach the latest right-hand value on or before each left-hand date, one left chunk at a time.
+
+    Only the right-hand rows needed for the current chunk (and the latest earlier row) are buffered.
+
+    Yields:
+    - Tuples of (left chunk, aligned right-hand values).
+    """
+    right_chunks = iter(right_chunks)
+    buffer = None
+    exhausted = False
+    for chunk in left_chunks:
+        last_date = chunk["Date"].max()
+        while not exhausted and (buffer is None or buffer.empty or buffer["Date"].iloc[-1] <= last_date):
+            try:
+                right = next(right_chunks)[["Date", value_column]]
+                buffer = right if buffer is None else pd.concat([buffer, right], ignore_index=True)
+            except StopIteration:
+                exhausted = True
+
+        if buffer is None or buffer.empty:
+            yield chunk, np.full(len(chunk), np.nan)
+            continue
+        index = FeatureIndex().add_frame("right", buffer, value_column)
+        yield chunk, index.align(chunk["Date"])["right"].to_numpy()
+
+        # Keep the latest row at or before this chunk for the next one
+        keep_from = max(int(asof_positions(buffer["Date"].values.astype("datetime64[ns]").astype(np.int64), last_date.value)), 0)
+        buffer = buffer.iloc[keep_from:].reset_index(drop=True)
+
+
+def stream_volatility_metrics(nifty_file, midcap_file, chunksize=CHUNK_SIZE, window=WINDOW):
+    """
+    Chunked equivalent of featureEngineering.calculate_volatility_metrics for the Nifty output.
+
+    Yields:
+    - Chunks with Date, 30-Day Volatility and Volatility Ratio (Midcap joined by date).
+    """
+    nifty = stream_volatility(nifty_file, chunksize, window)
+    midcap = stream_volatility(midcap_file, chunksize, window)
+    for chunk, midcap_volatility in stream_asof_join(nifty, midcap, "30-Day Volatility"):
+        chunk["Volatility Ratio"] = chunk["30-Day Volatility"] / midcap_volatility
+        # Handle missing data
+        yield chunk.fillna(0)
+
+
+def _order_statistic(make_chunks, rank, low, high, bins=MEDIAN_BINS, max_candidates=MEDIAN_CANDIDATES):
+    """Find the value of the given rank (0-based) by narrowing [low, high] with histogram passes."""
+    high_inclusive = True
+    while True:
+        if low == high or (not high_inclusive and np.nextafter(low, np.inf) >= high):
+            return low
+        edges = np.linspace(low, high, bins + 1)
+        counts = np.zeros(bins, dtype=np.int64)
+        below = 0
+        for values in make_chunks():
+            below += np.count_nonzero(values < low)
+            inside = values[(values >= low) & ((values <= high) if high_inclusive else (values < high))]
+            counts += np.bincount(np.minimum(np.searchsorted(edges, inside, side="right") - 1, bins - 1), minlength=bins)
+
+        # Narrow to the bin holding the rank (bins are [edge, next edge), like searchsorted's assignment)
+        position = int(np.searchsorted(np.cumsum(counts), rank - below, side="right"))
+        offset = rank - below - int(counts[:position].sum())
+        low, high = edges[position], edges[position + 1]
+        high_inclusive = high_inclusive and position == bins - 1
+
+        if counts[position] <= max_candidates:
+            candidates = np.concatenate([
+                values[(values >= low) & ((values <= high) if high_inclusive else (values < high))]
+                for values in make_chunks()
+            ])
+            return np.partition(candidates, offset)[offset]
+
+
+def streaming_median(make_chunks, bins=MEDIAN_BINS, max_candidates=MEDIAN_CANDIDATES):
+    """
+    Exact median of values spread over chunks, holding at most `max_candidates` values in memory.
+
+    Parameters:
+    - make_chunks: Callable returning a fresh iterator of 1-D float arrays (NaNs excluded).
+
+    Returns:
+    - The median (NaN when there are no values), equal to pandas' Series.median().
+    """
+    count, low, high = 0, np.inf, -np.inf
+    for values in make_chunks():
+        if len(values):
+            count += len(values)
+            low, high = min(low, values.min()), max(high, values.max())
+    if count == 0:
+        return np.nan
+    ranks = sorted({(count - 1) // 2, count // 2})
+    return float(np.mean([_order_statistic(make_chunks, rank, low, high, bins, max_candidates) for rank in ranks]))
+
+
+def _iter_volumes(price_file, chunksize):
+    """Yield numeric volumes with zeros and invalid values replaced by NaN."""
+    for chunk in iter_frames(price_file, chunksize, skiprows=1, usecols=[0, 5], names=["Date", "Volume"], parse_dates=["Date"]):
+        chunk["Volume"] = pd.to_numeric(chunk["Volume"], errors="coerce").replace(0, np.nan)
+        yield chunk
+
+
+def stream_traded_volume(price_file, chunksize=CHUNK_SIZE, window=WINDOW):
+    """
+    Chunked equivalent of featureEngineering.calculate_traded_volume for one series.
+
+    Missing volumes are filled with the series median, found with extra bounded-memory passes.
+
+    Yields:
+    - Chunks with Date and Average Volume.
+    """
+    def valid_volumes():
+        for chunk in _iter_volumes(price_file, chunksize):
+            volumes = chunk["Volume"].to_numpy(dtype=float)
+            yield volumes[~np.isnan(volumes)]
+
+    median = streaming_median(valid_volumes)
+    carry = RollingCarry(window)
+    for chunk in _iter_volumes(price_file, chunksize):
+        # Handle missing values (no valid volume at all means every volume is 0)
+        volume = chunk["Volume"].fillna(median) if not np.isnan(median) else pd.Series(0, index=chunk.index)
+        average = carry.apply(volume, lambda values: values.rolling(window=window, min_periods=1).mean())
+        yield pd.DataFrame({"Date": chunk["Date"].to_numpy(), "Average Volume": average.to_numpy()})
+
+
+def stream_market_breadth(raw_file, chunksize=CHUNK_SIZE, window=WINDOW):
+    """
+    Chunked equivalent of featureEngineering.calculate_market_breadth (same file layout and columns).
+
+    Yields:
+    - Chunks with Date and Advance-Decline Ratio.
+    """
+    advances, declines = RollingCarry(window), RollingCarry(window)
+    for chunk in iter_price_chunks(raw_file, chunksize, skiprows=3):
+        advancing = advances.apply(chunk["Close"] > chunk["Open"], lambda values: values.rolling(window=window).sum())
+        declining = declines.apply(chunk["Close"] < chunk["Open"], lambda values: values.rolling(window=window).sum())
+        breadth = pd.DataFrame({"Date": chunk["Date"].to_numpy(), "Advance-Decline Ratio": (advancing / declining).to_numpy()})
+        # Handle missing data
+        yield breadth.fillna(0)
+
+
+@instrumented
+def main(chunksize=CHUNK_SIZE):
+    # File paths
+    nifty_file = dataset_path("nifty_50_data")
+    midcap_file = dataset_path("nifty_midcap_100_data")
+    nifty_output_file = dataset_path("processed_nifty_50_data")
+    midcap_output_file = dataset_path("processed_midcap_100_data")
+
+    stream_preprocess(nifty_file, nifty_output_file, chunksize)
+    stream_preprocess(midcap_file, midcap_output_file, chunksize)
+
+    # Calculate and save features chunk by chunk
+    write_chunks(stream_volatility_metrics(nifty_output_file, midcap_output_file, chunksize), dataset_path("nifty_volatility"))
+    write_chunks((chunk.fillna(0) for chunk in stream_volatility(midcap_output_file, chunksize)), dataset_path("midcap_volatility"))
+    write_chunks(stream_traded_volume(nifty_output_file, chunksize), dataset_path("nifty_volume"))
+    write_chunks(stream_traded_volume(midcap_output_file, chunksize), dataset_path("midcap_volume"))
+    write_chunks(stream_market_breadth(nifty_file, chunksize), dataset_path("market_breadth"))
+
+    print("✅ Streaming feature engineering completed and results saved!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+import argparse
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import pandas as pd
+import numpy as np
+
+from cashAllocationModel import (DEFAULT_WEIGHTS, FEATURE_NAMES, RISK_TOLERANCE_LEVELS, calculate_scores,
+                                 get_risk_levels, latest_features, load_feature_index)
+from dataStore import dataset_path, read_frame
+from instrumentation import instrumented
+
+WINDOW = 30
+PERCENTILES = [1, 5, 25, 50, 75, 95, 99]
+
+# Simulated market scenario (override any key when calling run_stress_test)
+DEFAULT_SCENARIO = {
+    # Trading days simulated after the latest observation
+    "horizon": 21,
+    # Share of paths whose bootstrapped returns are scaled by the volatility shock
+    "volatility_shock_probability": 0.1,
+    "volatility_shock": 2.0,
+    # Share of paths with an extra FII outflow, in standard deviations of the monthly FII net flow
+    "fii_outflow_probability": 0.2,
+    "fii_outflow": 2.0
+}
+
+# Paths simulated per task; each task draws from its own seed stream, so results do not depend on the process count
+CHUNK_SIZE = 10000
+
+# Shared arrays attached once per worker process
+_shared = {}
+
+
+def load_stress_inputs(volatility_file, volume_file, institutional_flows_file, market_breadth_file, price_file):
+    """
+    Load the historical series the simulation bootstraps from and the ranges it normalizes against.
+
+    Returns:
+    - Dict of NumPy arrays (all float64) shared with the simulation workers.
+    """
+    index = load_feature_index(volatility_file, volume_file, institutional_flows_file, market_breadth_file)
+    flows = read_frame(institutional_flows_file, columns=["FII Net Flow", "DII Net Flow"])
+    prices = read_frame(price_file, columns=["Date", "Close", "Open"], parse_dates=["Date"])
+    prices = prices.assign(Return=prices["Close"].pct_change()).dropna(subset=["Return"])
+    # Up (+1) and down (-1) sessions, as counted by calculate_market_breadth
+    sessions = (prices["Close"] > prices["Open"]).astype(float) - (prices["Close"] < prices["Open"]).astype(float)
+
+    ranges = []
+    for name in FEATURE_NAMES:
+        # Like latest_features, an infinite ratio in the history widens the range to infinity
+        history = index.series(name)
+        ranges.append([history.min(), history.max()])
+
+    return {
+        "returns": prices["Return"].to_numpy(dtype=float),
+        "sessions": sessions.to_numpy(dtype=float),
+        "fii_flows": flows["FII Net Flow"].to_numpy(dtype=float),
+        "dii_flows": flows["DII Net Flow"].to_numpy(dtype=float),
+        # Observed [min, max] of each metric, ordered as FEATURE_NAMES
+        "ranges": np.array(ranges, dtype=float),
+        "latest": latest_features(index)
+    }
+
+
+def _rolling_window_sums(values, window):
+    """Sums over every trailing window of the rows of a (paths, days) matrix."""
+    cumulative = np.cumsum(values, axis=1)
+    sums = cumulative[:, window - 1:].copy()
+    sums[:, 1:] -= cumulative[:, :-window]
+    return sums
+
+
+def _normalize(values, path_min, path_max, observed_range):
+    """Min-max normalize against the observed range widened by the simulated path."""
+    low = np.fmin(path_min, observed_range[0])
+    high = np.fmax(path_max, observed_range[1])
+    value_range = high - low
+    with np.errstate(invalid="ignore", divide="ignore"):
+        normalized = np.where(value_range > 0, (values - low) / value_range, 0.0)
+    return np.nan_to_num(normalized)
+
+
+def simulate_breadth(sessions, days, window=WINDOW):
+    """
+    Advance-decline ratio along bootstrapped paths, the quantity calculate_market_breadth stores.
+
+    Parameters:
+    - sessions: Historical up (+1), flat (0) and down (-1) sessions.
+    - days: (paths, horizon) indices of the bootstrapped sessions, continuing the latest ones.
+    - window: Rolling window length in sessions.
+
+    Returns:
+    - (paths, horizon) array of ratios (0 for windows without up or down sessions, as the model fills them).
+    """
+    tail = np.broadcast_to(sessions[-(window - 1):], (len(days), window - 1))
+    full = np.concatenate([tail, sessions[days]], axis=1)
+    advances = _rolling_window_sums((full > 0).astype(float), window)
+    declines = _rolling_window_sums((full < 0).astype(float), window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        breadth = advances / declines
+    return np.where(np.isnan(breadth), 0.0, breadth)
+
+
+def simulate_features(inputs, paths, rng, scenario=None, window=WINDOW):
+    """
+    Simulate market paths and return the normalized features at the end of each path.
+
+    - Volatility: bootstrapped daily returns (scaled by the volatility shock on shocked paths)
+      continue the latest returns; the 30-day volatility is tracked along the path.
+    - Market breadth: up (Close > Open) vs down (Close < Open) sessions over the window, as in
+      calculate_market_breadth, bootstrapped from the same days as the returns.
+    - Institutional flows: a bootstrapped month of FII and DII net flows, with an extra FII
+      outflow on shocked paths.
+    - Volume: kept at its latest value.
+
+    Returns:
+    - (paths, 4) array ordered as FEATURE_NAMES.
+    """
+    scenario = {**DEFAULT_SCENARIO, **(scenario or {})}
+    horizon = scenario["horizon"]
+    returns, ranges = inputs["returns"], inputs["ranges"]
+
+    shocked = rng.random((paths, 1)) < scenario["volatility_shock_probability"]
+    days = rng.integers(0, len(returns), (paths, horizon))
+    simulated = returns[days] * np.where(shocked, scenario["volatility_shock"], 1.0)
+    tail = np.broadcast_to(returns[-(window - 1):], (paths, window - 1))
+    full = np.concatenate([tail, simulated], axis=1)
+
+    # Rolling sample standard deviation at each simulated day
+    sums = _rolling_window_sums(full, window)
+    squares = _rolling_window_sums(full * full, window)
+    volatility = np.sqrt(np.maximum((squares - sums * sums / window) / (window - 1), 0))
+
+    breadth = simulate_breadth(inputs["sessions"], days, window)
+
+    fii = inputs["fii_flows"][rng.integers(0, len(inputs["fii_flows"]), paths)]
+    dii = inputs["dii_flows"][rng.integers(0, len(inputs["dii_flows"]), paths)]
+    outflow = rng.random(paths) < scenario["fii_outflow_probability"]
+    fii = fii - outflow * scenario["fii_outflow"] * np.std(inputs["fii_flows"], ddof=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        flows = np.where(dii != 0, fii / dii, 0.0)
+
+    features = np.empty((paths, len(FEATURE_NAMES)))
+    features[:, 0] = _normalize(volatility[:, -1], volatility.min(axis=1), volatility.max(axis=1), ranges[0])
+    features[:, 1] = inputs["latest"][1]
+    features[:, 2] = _normalize(flows, flows, flows, ranges[2])
+    features[:, 3] = _normalize(breadth[:, -1], breadth.min(axis=1), breadth.max(axis=1), ranges[3])
+    return features
+
+
+def _share(arrays):
+    """Copy arrays into shared memory; returns (segments, {name: (segment name, shape, dtype)})."""
+    segments, spec = [], {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+        segments.append(segment)
+        spec[name] = (segment.name, array.shape, array.dtype.str)
+    return segments, spec
+
+
+def _attach_worker(spec):
+    """Pool initializer: map the shared arrays once per worker process."""
+    for name, (segment_name, shape, dtype) in spec.items():
+        # Pool workers share the parent's resource tracker, so the parent's unlink releases the segments
+        segment = shared_memory.SharedMemory(name=segment_name)
+        _shared[name] = (segment, np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf))
+
+
+def _attach_local(segments, spec):
+    """Map the shared arrays in the parent process (single-process runs)."""
+    for segment, (name, (_, shape, dtype)) in zip(segments, spec.items()):
+        _shared[name] = (segment, np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf))
+
+
+def _simulate_chunk(task):
+    """Simulate one chunk of paths and write its allocations into the shared output array."""
+    start, stop, seed, chunk_index, scenario, coefficients, levels = task
+    inputs = {name: array for name, (_, array) in _shared.items()}
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(chunk_index,)))
+    features = simulate_features(inputs, stop - start, rng, scenario)
+    scores = calculate_scores(features, coefficients[0], coefficients[1])[:, 0]
+    inputs["allocations"][start:stop] = np.maximum(0, levels[np.newaxis, :] * (1 - scores[:, np.newaxis]))
+    return stop - start
+
+
+@instrumented
+def run_stress_test(inputs, paths=100000, risk_tolerances=("high", "medium", "low"), weights=None, damping=None,
+                    scenario=None, processes=None, seed=0, chunk_size=CHUNK_SIZE):
+    """
+    Simulate market paths across a process pool and return the cash allocation of every path.
+
+    Inputs and outputs live in shared memory, so only chunk boundaries are sent to the workers.
+
+    Parameters:
+    - inputs: Historical inputs as returned by load_stress_inputs.
+    - paths: Number of simulated paths.
+    - risk_tolerances: Risk tolerance names or numeric maximum cash levels.
+    - weights, damping: Model weights and damping (defaults to the model parameters).
+    - scenario: Overrides of DEFAULT_SCENARIO.
+    - processes: Worker processes (defaults to every core; 1 runs in-process).
+    - seed: Seed of the simulation; results are identical for any process count.
+
+    Returns:
+    - (paths, M) array of cash allocation percentages, one column per risk tolerance.
+    """
+    levels = get_risk_levels(risk_tolerances)
+    coefficients = (weights if weights is not None else DEFAULT_WEIGHTS, damping)
+    processes = processes or os.cpu_count()
+    tasks = [(start, min(start + chunk_size, paths), seed, chunk_index, scenario, coefficients, levels)
+             for chunk_index, start in enumerate(range(0, paths, chunk_size))]
+
+    arrays = {**inputs, "allocations": np.zeros((paths, len(levels)))}
+    segments, spec = _share(arrays)
+    try:
+        if processes == 1:
+            _attach_local(segments, spec)
+            for task in tasks:
+                _simulate_chunk(task)
+        else:
+            with multiprocessing.Pool(processes, initializer=_attach_worker, initargs=(spec,)) as pool:
+                for _ in pool.imap_unordered(_simulate_chunk, tasks):
+                    pass
+        allocations = np.ndarray((paths, len(levels)), dtype=np.float64, buffer=segments[-1].buf).copy()
+    finally:
+        _shared.clear()
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+    return allocations
+
+
+def summarize_allocations(allocations, risk_tolerances=("high", "medium", "low"), percentiles=PERCENTILES):
+    """Reduce simulated allocations to percentiles (and the mean) per risk tolerance."""
+    summary = pd.DataFrame(np.percentile(allocations, percentiles, axis=0).T,
+                           index=list(risk_tolerances), columns=[f"P{percentile}" for percentile in percentiles])
+    summary["Mean"] = allocations.mean(axis=0)
+    summary.index.name = "Risk Tolerance"
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo stress test of the cash allocation.")
+    parser.add_argument("--paths", type=int, default=100000)
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (defaults to every core).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--horizon", type=int, default=DEFAULT_SCENARIO["horizon"], help="Simulated trading days.")
+    args = parser.parse_args()
+
+    inputs = load_stress_inputs(
+        dataset_path("nifty_volatility"), dataset_path("nifty_volume"), dataset_path("institutional_flows"),
+        dataset_path("market_breadth"), dataset_path("processed_nifty_50_data")
+    )
+    risk_tolerances = list(RISK_TOLERANCE_LEVELS)
+    allocations = run_stress_test(inputs, args.paths, risk_tolerances, scenario={"horizon": args.horizon},
+                                  processes=args.processes, seed=args.seed)
+    print(summarize_allocations(allocations, risk_tolerances).round(2).to_string())
+
+
+if __name__ == "__main__":
+    main()
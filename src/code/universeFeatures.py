@@ -0,0 +1,182 @@
+import pandas as pd
+import numpy as np
+
+from dataStore import dataset_path, read_frame, write_frame
+
+PRICE_FIELDS = ["Close", "High", "Low", "Open", "Volume"]
+
+# Default universe: every index collected by dataCollection.py
+UNIVERSE = {
+    "Nifty 50": "nifty_50_data",
+    "Nifty Midcap 100": "nifty_midcap_100_data",
+    "Nifty Next 50": "nifty_next_50_data",
+    "INDIA VIX": "india_vix_data"
+}
+
+
+def load_universe(files, skiprows=3):
+    """
+    Load the OHLCV data of many tickers as one wide date x ticker matrix per field.
+
+    Parameters:
+    - files: Dict mapping ticker names to raw (yfinance) or processed price files.
+    - skiprows: Header rows to skip in CSV files (3 for raw yfinance files, 1 for processed ones).
+
+    Returns:
+    - Dict mapping each OHLCV field to a DataFrame indexed by Date with one column per ticker, and
+      "Session" to a boolean DataFrame marking the dates each ticker actually traded on.
+    """
+    column_names = ["Date"] + PRICE_FIELDS
+    frames = {}
+    for name, file in files.items():
+        data = read_frame(file, skiprows=skiprows, names=column_names, parse_dates=["Date"])
+        data = data.dropna(subset=["Date"]).drop_duplicates("Date").set_index("Date")
+        frames[name] = data[PRICE_FIELDS].apply(pd.to_numeric, errors="coerce").assign(Session=True)
+
+    # Outer join on date so every ticker shares one index (rows of other tickers' sessions are not sessions)
+    panel = pd.concat(frames, axis=1).sort_index()
+    fields = {field: panel.xs(field, axis=1, level=1)[list(files)] for field in PRICE_FIELDS}
+    fields["Session"] = panel.xs("Session", axis=1, level=1)[list(files)].notna()
+    return fields
+
+
+def _rolling_sum(values, window):
+    """Sum over the trailing window of each column (NaN treated as 0), via cumulative sums."""
+    cumulative = np.cumsum(np.nan_to_num(values), axis=0)
+    totals = cumulative.copy()
+    totals[window:] -= cumulative[:-window]
+    return totals
+
+
+def rolling_std(values, window):
+    """
+    Column-wise rolling sample standard deviation (ddof=1) of a date x ticker matrix.
+
+    Like pandas' rolling(window).std(), a value is only produced when the full window is valid.
+    """
+    valid = ~np.isnan(values)
+    # Center each column to limit cancellation in the sum-of-squares formula
+    column_means = np.nansum(values, axis=0) / np.maximum(valid.sum(axis=0), 1)
+    centered = values - column_means
+
+    counts = _rolling_sum(valid.astype(float), window)
+    sums = _rolling_sum(centered, window)
+    squares = _rolling_sum(centered * centered, window)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        variance = (squares - sums * sums / counts) / (counts - 1)
+    std = np.sqrt(np.maximum(variance, 0))
+    std[counts < window] = np.nan
+    return std
+
+
+def rolling_mean(values, window, min_periods=1):
+    """Column-wise rolling mean of a date x ticker matrix, ignoring NaNs."""
+    counts = _rolling_sum((~np.isnan(values)).astype(float), window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = _rolling_sum(values, window) / counts
+    means[counts < min_periods] = np.nan
+    return means
+
+
+def _sessions_first(values, order, session):
+    """Move each column's session rows (in date order) to the top, padding the rest with NaN."""
+    compressed = np.take_along_axis(np.asarray(values, dtype=float), order, axis=0)
+    compressed[~np.take_along_axis(session, order, axis=0)] = np.nan
+    return compressed
+
+
+def _sessions_back(compressed, order, session):
+    """Scatter session-ordered rows back to their dates (non-session rows are NaN)."""
+    values = np.empty_like(compressed)
+    np.put_along_axis(values, order, compressed, axis=0)
+    values[~session] = np.nan
+    return values
+
+
+def calculate_universe_features(panel, benchmark, window=30):
+    """
+    Calculate returns, rolling volatility, volatility ratios and rolling volume for every ticker at once.
+
+    Rolling windows span each ticker's own sessions, so every column matches the per-ticker
+    calculate_* functions of featureEngineering.py run on that ticker's file.
+
+    Parameters:
+    - panel: Wide OHLCV matrices (and optional "Session" mask) as returned by load_universe;
+      without a mask, a ticker's sessions are the dates with any of its fields present.
+    - benchmark: Ticker name the volatility ratios are computed against.
+    - window: Rolling window length in sessions.
+
+    Returns:
+    - Dict mapping each feature ("Daily Return", "30-Day Volatility", "Volatility Ratio",
+      "Average Volume", "Advance-Decline Ratio") to a wide DataFrame (NaN on non-session dates).
+    """
+    tickers = list(panel["Close"].columns)
+    if benchmark not in tickers:
+        raise ValueError(f"Benchmark '{benchmark}' is not part of the universe.")
+    index = panel["Close"].index
+
+    if "Session" in panel:
+        session = panel["Session"].to_numpy(dtype=bool)
+    else:
+        session = np.logical_or.reduce([panel[field].notna().to_numpy() for field in PRICE_FIELDS])
+    # Row order that puts each ticker's sessions first, so rolling windows skip non-session dates
+    order = np.argsort(~session, axis=0, kind="stable")
+
+    # Missing closes carry the last close forward (as pandas' pct_change does)
+    raw_close = _sessions_first(panel["Close"], order, session)
+    close = pd.DataFrame(raw_close).ffill().to_numpy()
+    returns = np.full_like(close, np.nan)
+    returns[1:] = close[1:] / close[:-1] - 1
+
+    volatility = _sessions_back(rolling_std(returns, window), order, session)
+    # Each date is compared with the benchmark's volatility as of its latest session
+    benchmark_column = tickers.index(benchmark)
+    latest_session = np.maximum.accumulate(np.where(session[:, benchmark_column], np.arange(len(index)), -1))
+    benchmark_volatility = np.where(latest_session >= 0, volatility[np.maximum(latest_session, 0), benchmark_column], np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        volatility_ratio = volatility / benchmark_volatility[:, None]
+
+    # Zero or missing volumes are filled with each ticker's median volume
+    volume = panel["Volume"].where(session).replace(0, np.nan)
+    volume = volume.fillna(volume.median().fillna(0))
+    average_volume = rolling_mean(_sessions_first(volume, order, session), window)
+
+    opens = _sessions_first(panel["Open"], order, session)
+    advances = _rolling_sum((raw_close > opens).astype(float), window)
+    declines = _rolling_sum((raw_close < opens).astype(float), window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        advance_decline_ratio = advances / declines
+    advance_decline_ratio[:window - 1] = np.nan
+
+    features = {
+        "Daily Return": _sessions_back(returns, order, session),
+        "30-Day Volatility": volatility,
+        "Volatility Ratio": volatility_ratio,
+        "Average Volume": _sessions_back(average_volume, order, session),
+        "Advance-Decline Ratio": _sessions_back(advance_decline_ratio, order, session)
+    }
+    # Handle missing data on each ticker's sessions
+    return {name: pd.DataFrame(np.where(session & np.isnan(values), 0, values), index=index, columns=tickers)
+            for name, values in features.items()}
+
+
+def main():
+    # File paths
+    files = {name: dataset_path(dataset) for name, dataset in UNIVERSE.items()}
+
+    panel = load_universe(files)
+    features = calculate_universe_features(panel, benchmark="Nifty Midcap 100")
+
+    # Save results
+    for name, dataset in [("30-Day Volatility", "universe_volatility"),
+                          ("Volatility Ratio", "universe_volatility_ratio"),
+                          ("Average Volume", "universe_volume"),
+                          ("Advance-Decline Ratio", "universe_market_breadth")]:
+        write_frame(features[name].reset_index(), dataset_path(dataset))
+
+    print(f"✅ Universe features computed for {len(files)} tickers and results saved!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import numpy as np
+
+from backtestModel import TRADING_DAYS_PER_YEAR, load_backtest_features, normalize_without_lookahead
+from cashAllocationModel import DEFAULT_DAMPING, DEFAULT_WEIGHTS, FEATURE_NAMES, calculate_scores, get_risk_levels
+from dataStore import DATA_DIR, dataset_path, read_frame
+from instrumentation import instrumented
+
+OBJECTIVES = ["return", "drawdown", "calmar"]
+
+# Candidates scored per block (bounds the (days x candidates) matrices held at once)
+BLOCK_SIZE = 500
+
+
+def generate_candidates(count, rng, damping_range=(0.5, 1.0)):
+    """
+    Draw candidate weight and damping sets; the first candidate is the current model.
+
+    Weights are drawn uniformly from the simplex (they sum to 1); volatility stays undamped.
+
+    Returns:
+    - Tuple of (weights, damping) arrays of shape (count, 4), ordered as FEATURE_NAMES.
+    """
+    weights = rng.dirichlet(np.ones(len(FEATURE_NAMES)), size=count)
+    damping = rng.uniform(*damping_range, size=(count, len(FEATURE_NAMES)))
+    damping[:, 0] = 1.0
+    weights[0] = [DEFAULT_WEIGHTS[name] for name in FEATURE_NAMES]
+    damping[0] = [DEFAULT_DAMPING[name] for name in FEATURE_NAMES]
+    return weights, damping
+
+
+def walk_forward_segments(days, folds=5, min_train=252):
+    """
+    Split a history into an initial training segment followed by `folds` consecutive test segments.
+
+    Returns:
+    - List of (start, stop) row ranges.
+    """
+    if days <= min_train + folds:
+        raise ValueError(f"Need more than {min_train + folds} days for {folds} walk-forward folds.")
+    boundaries = np.linspace(min_train, days, folds + 1).astype(int)
+    return [(0, min_train)] + [(int(start), int(stop)) for start, stop in zip(boundaries[:-1], boundaries[1:])]
+
+
+def evaluate_objective(cash_weights, returns, objective="calmar"):
+    """
+    Score many allocation paths over one segment at once.
+
+    Parameters:
+    - cash_weights: (days, candidates) cash shares decided on each day.
+    - returns: (days,) index return of the following day.
+    - objective: "return" (annualized), "drawdown" (negative max drawdown) or "calmar" (return / drawdown).
+
+    Returns:
+    - (candidates,) objective values (higher is better).
+    """
+    equity = np.cumprod(1 + (1 - cash_weights) * returns[:, np.newaxis], axis=0)
+    annual_return = equity[-1] ** (TRADING_DAYS_PER_YEAR / len(returns)) - 1
+    drawdown = np.max(1 - equity / np.maximum.accumulate(equity, axis=0), axis=0)
+    if objective == "return":
+        return annual_return
+    if objective == "drawdown":
+        return -drawdown
+    return annual_return / np.maximum(drawdown, 1e-9)
+
+
+def _score_block(signals, returns, level, weights, damping, objective):
+    scores = calculate_scores(signals, weights, damping)
+    cash_weights = np.maximum(0, level * (1 - scores)) / 100
+    return evaluate_objective(cash_weights, returns, objective)
+
+
+@instrumented
+def optimize_weights(features, prices, candidates=2000, folds=5, min_train=252, objective="calmar", risk_tolerance="medium",
+                     window=None, keep_fraction=0.5, min_candidates=16, max_workers=None, seed=0):
+    """
+    Search weights and damping factors under walk-forward cross-validation.
+
+    Candidates are scored segment by segment in chronological order. After each test segment
+    the worst performers (by mean objective so far) are dropped, keeping `keep_fraction` of them
+    (the current model is always kept as the baseline).
+    Each test segment is also scored out of sample with the candidate that was best on the
+    segments before it.
+
+    Parameters:
+    - features: Raw features as returned by load_backtest_features.
+    - prices: Close price series of the index, indexed by Date.
+    - candidates: Number of random weight/damping sets (the first is the current model).
+    - folds, min_train: Walk-forward test segments and length of the initial segment (in days).
+    - objective: "return", "drawdown" or "calmar".
+    - risk_tolerance: Risk tolerance the allocation is optimized for.
+    - window: Rolling normalization window in rows, or None for expanding normalization.
+    - keep_fraction, min_candidates: Early stopping of unpromising candidates.
+    - max_workers: Threads scoring candidate blocks in parallel.
+    - seed: Seed of the candidate draws.
+
+    Returns:
+    - Dict with the best "weights" and "damping", its mean "objective", the "walk_forward"
+      out-of-sample results per segment and the surviving "candidates".
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Invalid objective. Choose from {', '.join(OBJECTIVES)}.")
+
+    signals = features[FEATURE_NAMES].apply(normalize_without_lookahead, window=window).to_numpy()
+    prices = prices.reindex(features.index).ffill()
+    returns = prices.pct_change().shift(-1).fillna(0).to_numpy()
+    level = get_risk_levels([risk_tolerance])[0]
+
+    weights, damping = generate_candidates(candidates, np.random.default_rng(seed))
+    alive = np.arange(candidates)
+    totals = np.zeros(candidates)
+    segments = walk_forward_segments(len(features), folds, min_train)
+    walk_forward = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for number, (start, stop) in enumerate(segments):
+            blocks = [alive[offset:offset + BLOCK_SIZE] for offset in range(0, len(alive), BLOCK_SIZE)]
+            results = executor.map(lambda block: _score_block(signals[start:stop], returns[start:stop], level,
+                                                              weights[block], damping[block], objective), blocks)
+            segment_objective = np.concatenate(list(results))
+
+            if number > 0:
+                # Out of sample: the candidate chosen on the earlier segments, scored on this one
+                chosen = int(np.argmax(totals[alive] / number))
+                walk_forward.append({
+                    "Start": features.index[start], "End": features.index[stop - 1],
+                    "Chosen Objective": float(segment_objective[chosen]),
+                    "Current Model Objective": float(segment_objective[alive == 0][0]),
+                    "Candidates": len(alive)
+                })
+            totals[alive] += segment_objective
+
+            # Early stopping: keep only the best candidates so far
+            if 0 < number < len(segments) - 1 and len(alive) > min_candidates:
+                keep = max(min_candidates, int(len(alive) * keep_fraction))
+                alive = alive[np.argsort(-totals[alive], kind="stable")[:keep]]
+                # The current model is always kept as the baseline
+                if 0 not in alive:
+                    alive = np.append(alive, 0)
+
+    means = totals[alive] / len(segments)
+    ranking = pd.DataFrame(np.hstack([weights[alive], damping[alive]]),
+                           columns=[f"{name} weight" for name in FEATURE_NAMES] + [f"{name} damping" for name in FEATURE_NAMES])
+    ranking["Objective"] = means
+    ranking = ranking.sort_values("Objective", ascending=False).reset_index(drop=True)
+
+    best = alive[int(np.argmax(means))]
+    return {
+        "weights": dict(zip(FEATURE_NAMES, weights[best].tolist())),
+        "damping": dict(zip(FEATURE_NAMES, damping[best].tolist())),
+        "objective": float(means.max()),
+        "walk_forward": pd.DataFrame(walk_forward),
+        "candidates": ranking
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward optimization of the allocation weights and damping.")
+    parser.add_argument("--candidates", type=int, default=2000)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--min-train", type=int, default=252, help="Days in the initial segment.")
+    parser.add_argument("--objective", choices=OBJECTIVES, default="calmar")
+    parser.add_argument("--risk-tolerance", default="medium")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=os.path.join(DATA_DIR, "optimized_parameters.json"))
+    args = parser.parse_args()
+
+    features = load_backtest_features(dataset_path("nifty_volatility"), dataset_path("nifty_volume"),
+                                      dataset_path("institutional_flows"), dataset_path("market_breadth"))
+    prices = read_frame(dataset_path("processed_nifty_50_data"), columns=["Date", "Close"], parse_dates=["Date"]).set_index("Date")["Close"]
+
+    result = optimize_weights(features, prices, args.candidates, args.folds, args.min_train, args.objective,
+                              args.risk_tolerance, seed=args.seed)
+    print(result["walk_forward"].to_string(index=False))
+    print(f"Best weights: {result['weights']}")
+    print(f"Best damping: {result['damping']}")
+
+    with open(args.output, "w") as f:
+        json.dump({key: result[key] for key in ["weights", "damping", "objective"]}, f, indent=2)
+    print(f"✅ Optimized parameters saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
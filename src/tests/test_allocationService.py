@@ -0,0 +1,50 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+from allocationService import FeatureSnapshot, answer_query
+from cashAllocationModel import DEFAULT_WEIGHTS, calculate_cash_allocation_batch, latest_features, load_feature_index
+
+
+@pytest.fixture
+def feature_files(tmp_path):
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2024-11-01", "2025-03-31")
+    files = [tmp_path / name for name in ["volatility.csv", "volume.csv", "flows.csv", "breadth.csv"]]
+    pd.DataFrame({"Date": dates, "30-Day Volatility": rng.random(len(dates))}).to_csv(files[0], index=False)
+    # Volume stops a week before the other daily metrics
+    pd.DataFrame({"Date": dates[:-5], "Average Volume": rng.random(len(dates) - 5) * 1e6}).to_csv(files[1], index=False)
+    # Three months of flows, latest month first
+    pd.DataFrame({"MONTH": ["Mar 2025", "Feb 2025", "Jan 2025"], "FII/DII Ratio": [-0.17, -0.91, -0.97]}).to_csv(files[2], index=False)
+    pd.DataFrame({"Date": dates[40:], "Advance-Decline Ratio": rng.random(len(dates) - 40) * 2}).to_csv(files[3], index=False)
+    return [str(file) for file in files]
+
+
+# The compact snapshot keeps its normalized history as float32
+TOLERANCE = {False: 1e-12, True: 1e-5}
+
+
+@pytest.mark.parametrize("compact", [True, False])
+def test_as_of_last_date_matches_latest(feature_files, compact):
+    snapshot = FeatureSnapshot(feature_files, compact)
+    last_date = load_feature_index(*feature_files, compact=compact).last_date()
+
+    latest = answer_query(snapshot, "medium")
+    as_of = answer_query(snapshot, "medium", as_of=last_date.strftime("%Y-%m-%d"))
+    assert as_of["cash_allocation"] == pytest.approx(latest["cash_allocation"], abs=TOLERANCE[compact])
+    assert as_of["score"] == pytest.approx(latest["score"], abs=TOLERANCE[compact])
+    assert answer_query(snapshot, "medium", as_of="2026-01-01")["cash_allocation"] == pytest.approx(latest["cash_allocation"], abs=TOLERANCE[compact])
+
+
+@pytest.mark.parametrize("compact", [True, False])
+@pytest.mark.parametrize("as_of", ["2024-11-15", "2025-01-15", "2025-02-03", "2025-03-26"])
+def test_as_of_matches_model(feature_files, as_of, compact):
+    snapshot = FeatureSnapshot(feature_files, compact)
+    index = load_feature_index(*feature_files, compact=compact)
+    expected = calculate_cash_allocation_batch(latest_features(index, as_of), DEFAULT_WEIGHTS, ["medium"])[0, 0]
+    assert answer_query(snapshot, "medium", as_of=as_of)["cash_allocation"] == pytest.approx(expected, abs=TOLERANCE[compact])
+
+
+def test_as_of_before_any_data(feature_files):
+    with pytest.raises(ValueError):
+        answer_query(FeatureSnapshot(feature_files), "medium", as_of="2020-01-01")
@@ -0,0 +1,43 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+from backtestModel import align_backtest_features, calculate_allocation_path, normalize_without_lookahead
+from cashAllocationModel import DEFAULT_WEIGHTS, FEATURE_NAMES, load_feature_index
+
+
+@pytest.fixture
+def index(tmp_path):
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2024-11-01", "2025-03-31")
+    files = [tmp_path / name for name in ["volatility.csv", "volume.csv", "flows.csv", "breadth.csv"]]
+    pd.DataFrame({"Date": dates, "30-Day Volatility": rng.random(len(dates))}).to_csv(files[0], index=False)
+    pd.DataFrame({"Date": dates, "Average Volume": rng.random(len(dates)) * 1e6}).to_csv(files[1], index=False)
+    # Only negative flows, first observed at the end of January
+    pd.DataFrame({"MONTH": ["Mar 2025", "Feb 2025", "Jan 2025"], "FII/DII Ratio": [-0.17, -0.91, -0.97]}).to_csv(files[2], index=False)
+    pd.DataFrame({"Date": dates, "Advance-Decline Ratio": rng.random(len(dates)) * 2}).to_csv(files[3], index=False)
+    return load_feature_index(*[str(file) for file in files])
+
+
+def test_flows_are_missing_until_first_observed(index):
+    features = align_backtest_features(index)
+    flows = features["institutional_flows"]
+    assert flows[:"2025-01-30"].isna().all()
+    # Stored as float32 by the default compact index
+    assert flows["2025-01-31"] == pytest.approx(-0.97)
+
+    normalized = normalize_without_lookahead(flows)
+    assert (normalized[:"2025-01-31"] == 0).all()
+    # February's ratio is the top of the observed range [-0.97, -0.91], not scaled against a made-up 0
+    assert normalized["2025-02-28"] == pytest.approx(1.0)
+    assert normalized["2025-03-31"] == pytest.approx(1.0)
+
+
+def test_allocation_path_takes_one_weight_set(index):
+    features = align_backtest_features(index)
+    path = calculate_allocation_path(features, DEFAULT_WEIGHTS, ["medium"])
+    assert path.notna().all().all()
+    single = np.array([[DEFAULT_WEIGHTS[name] for name in FEATURE_NAMES]])
+    pd.testing.assert_frame_equal(calculate_allocation_path(features, single, ["medium"]), path)
+    with pytest.raises(ValueError):
+        calculate_allocation_path(features, np.vstack([single, single]), ["medium"])
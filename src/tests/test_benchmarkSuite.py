@@ -0,0 +1,54 @@
+import json
+
+import pandas as pd
+import numpy as np
+
+import benchmarkSuite
+import statisticsCache
+from featureEngineering import calculate_institutional_flow_metrics, calculate_interest_rate_metrics, preprocess_csv
+
+
+def test_generators_are_seeded_and_shaped_like_the_sources(tmp_path):
+    data = benchmarkSuite.generate_ohlcv(300, seed=3)
+    pd.testing.assert_frame_equal(data, benchmarkSuite.generate_ohlcv(300, seed=3))
+    assert list(data.columns) == ["Date", "Close", "High", "Low", "Open", "Volume"]
+    assert (data["High"] >= data[["Open", "Close"]].max(axis=1)).all() and (data["Low"] <= data[["Open", "Close"]].min(axis=1)).all()
+
+    # The raw file goes through the same preprocessing as the collected data
+    raw_file, processed_file = str(tmp_path / "raw.csv"), str(tmp_path / "processed.csv")
+    benchmarkSuite.write_raw_price_csv(data, raw_file)
+    preprocess_csv(raw_file, processed_file)
+    np.testing.assert_allclose(pd.read_csv(processed_file)["Close"], data["Close"])
+
+    fii_dii_file, rbi_file = str(tmp_path / "fii_dii.csv"), str(tmp_path / "rbi.csv")
+    benchmarkSuite.generate_fii_dii_table(months=12).to_csv(fii_dii_file, index=False)
+    benchmarkSuite.generate_rbi_table().to_csv(rbi_file, index=False)
+    assert len(calculate_institutional_flow_metrics(fii_dii_file)) == 12
+    assert calculate_interest_rate_metrics(rbi_file) == {"Repo Rate": 6.25, "Reverse Repo Rate": 3.35}
+
+
+def test_large_histories_use_minute_bars():
+    dates = benchmarkSuite._dates(60000)
+    assert dates.is_unique and dates.is_monotonic_increasing
+    assert dates[1] - dates[0] == pd.Timedelta(minutes=1)
+
+
+def test_measure_bypasses_the_statistics_cache():
+    calls = []
+    seconds, peak_bytes, result = benchmarkSuite.measure(lambda: calls.append(statisticsCache.ENABLED) or np.ones(1000), repeat=2)
+    assert calls == [False] * 3
+    assert seconds >= 0 and peak_bytes >= 8000 and len(result) == 1000
+
+
+def test_results_cover_every_stage_and_compare(tmp_path, capsys):
+    report = benchmarkSuite.run_benchmarks(rows=[200], tickers=[2], repeat=1)
+    stages = {entry["stage"] for entry in report["results"]}
+    assert {"preprocess_csv", "calculate_volatility_metrics", "calculate_traded_volume", "calculate_institutional_flow_metrics",
+            "calculate_market_breadth", "calculate_interest_rate_metrics", "load_latest_features",
+            "calculate_universe_features"} <= stages
+    assert all(entry["seconds"] >= 0 and entry["peak_bytes"] >= 0 for entry in report["results"])
+
+    baseline_file = tmp_path / "baseline.json"
+    baseline_file.write_text(json.dumps(report))
+    benchmarkSuite.compare_results(report, str(baseline_file))
+    assert "calculate_market_breadth" in capsys.readouterr().out.split("Comparison against")[1]
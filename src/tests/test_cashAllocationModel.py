@@ -0,0 +1,74 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+import statisticsCache
+from cashAllocationModel import (DEFAULT_DAMPING, DEFAULT_WEIGHTS, FEATURE_NAMES, RISK_TOLERANCE_LEVELS, calculate_cash_allocation,
+                                 calculate_cash_allocation_batch, calculate_scores, load_latest_features)
+
+
+def scalar_allocation(features, weights, level, damping=DEFAULT_DAMPING):
+    """One scenario scored term by term, as the model did before the batch API."""
+    volatility, volume, flows, breadth = features
+    score = (weights["volatility"] * (1 - volatility) * damping["volatility"]
+             + weights["volume"] * volume * damping["volume"]
+             + weights["institutional_flows"] * flows * damping["institutional_flows"]
+             + weights["market_breadth"] * breadth * damping["market_breadth"])
+    return max(0, level * (1 - score))
+
+
+def test_grid_matches_scalar_scoring():
+    rng = np.random.default_rng(0)
+    features = rng.random(4)
+    weights = rng.dirichlet(np.ones(4), size=50)
+    risk_tolerances = ["high", "medium", "low", 35.0]
+
+    allocations = calculate_cash_allocation_batch(features, weights, risk_tolerances)
+    assert allocations.shape == (50, 4)
+    for row, weight_set in enumerate(weights):
+        weight_set = dict(zip(FEATURE_NAMES, weight_set))
+        for column, risk_tolerance in enumerate(risk_tolerances):
+            level = RISK_TOLERANCE_LEVELS.get(risk_tolerance, risk_tolerance)
+            assert allocations[row, column] == pytest.approx(scalar_allocation(features, weight_set, level))
+
+
+def test_damping_grid_and_frames():
+    features = np.array([0.2, 0.5, 0.1, 0.9])
+    damping = np.array([[1.0, 0.8, 0.7, 0.6], [1.0, 0.5, 0.5, 0.5]])
+    allocations = calculate_cash_allocation_batch(features, DEFAULT_WEIGHTS, ["medium"], damping=damping, as_frame=True)
+    assert list(allocations.columns) == ["medium"] and len(allocations) == 2
+    assert allocations["medium"].iloc[1] == pytest.approx(scalar_allocation(features, DEFAULT_WEIGHTS, 30, dict(zip(FEATURE_NAMES, damping[1]))))
+
+
+def test_scores_of_many_snapshots():
+    features = np.random.default_rng(1).random((7, 4))
+    weights = np.random.default_rng(2).dirichlet(np.ones(4), size=3)
+    scores = calculate_scores(features, weights)
+    assert scores.shape == (7, 3)
+    np.testing.assert_allclose(scores[4], calculate_scores(features[4], weights))
+
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        calculate_cash_allocation_batch(np.zeros(4), DEFAULT_WEIGHTS, ["reckless"])
+    with pytest.raises(ValueError):
+        calculate_cash_allocation_batch(np.zeros(4), np.ones(3))
+
+
+def test_single_allocation_matches_batch(tmp_path, monkeypatch):
+    monkeypatch.setattr(statisticsCache, "ENABLED", False)
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2024-11-01", "2025-03-31")
+    files = [str(tmp_path / name) for name in ["volatility.csv", "volume.csv", "flows.csv", "breadth.csv"]]
+    pd.DataFrame({"Date": dates, "30-Day Volatility": rng.random(len(dates))}).to_csv(files[0], index=False)
+    pd.DataFrame({"Date": dates, "Average Volume": rng.random(len(dates)) * 1e6}).to_csv(files[1], index=False)
+    pd.DataFrame({"MONTH": [202503, 202502, 202501], "FII/DII Ratio": [-0.17, -0.91, -0.97]}).to_csv(files[2], index=False)
+    pd.DataFrame({"Date": dates, "Advance-Decline Ratio": rng.random(len(dates)) * 2}).to_csv(files[3], index=False)
+
+    features = load_latest_features(*files)
+    # The latest month has the highest ratio of the range
+    assert features[2] == pytest.approx(1.0)
+    expected = calculate_cash_allocation_batch(features, DEFAULT_WEIGHTS, ["low"])[0, 0]
+    assert calculate_cash_allocation(*files, risk_tolerance="low") == pytest.approx(expected)
+    with pytest.raises(ValueError):
+        calculate_cash_allocation(*files, risk_tolerance="reckless")
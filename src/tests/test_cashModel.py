@@ -0,0 +1,57 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import cashModel
+
+
+@pytest.fixture
+def environment(monkeypatch):
+    # Restore the exported variables after each test
+    for variable in cashModel.CONFIG_ENVIRONMENT.values():
+        monkeypatch.delenv(variable, raising=False)
+    return os.environ
+
+
+def write_config(tmp_path, config):
+    config_file = tmp_path / "cashModel.json"
+    config_file.write_text(json.dumps(config))
+    return str(config_file)
+
+
+def test_config_disables_the_statistics_cache(tmp_path, environment, monkeypatch):
+    config_file = write_config(tmp_path, {"stats_cache": False, "data_dir": "data", "storage": "parquet"})
+    handled = []
+    monkeypatch.setattr(cashModel, "allocate", handled.append)
+
+    cashModel.main(["--config", config_file, "allocate", "--risk-tolerances", "high", "35", "--no-plots"])
+    assert environment["CASH_MODEL_STATS_CACHE"] == "0"
+    assert environment["CASH_MODEL_DATA_DIR"] == str(tmp_path / "data")
+    assert environment["CASH_MODEL_STORAGE"] == "parquet"
+    assert handled[0].risk_tolerances == ["high", 35.0]
+
+    # The statistics cache reads the exported flag when it is imported
+    script = (f"import cashModel; cashModel.apply_config(cashModel.load_config({config_file!r})); "
+              "import statisticsCache; print(statisticsCache.ENABLED)")
+    output = subprocess.run([sys.executable, "-c", script], cwd=cashModel.CODE_DIR, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "False"
+
+
+def test_enabled_statistics_cache_is_exported_as_one(environment):
+    cashModel.apply_config({"stats_cache": True})
+    assert environment["CASH_MODEL_STATS_CACHE"] == "1"
+
+
+@pytest.mark.parametrize("config", [{"stats_cache": "false"}, {"stats_cache": 2}, {"storage": "feather"}, {"data_dir": 1}, {"cache": True}])
+def test_invalid_config_values_are_rejected(tmp_path, config):
+    with pytest.raises(ValueError):
+        cashModel.load_config(write_config(tmp_path, config))
+
+
+def test_risk_labels():
+    assert [cashModel.risk_tolerance(token) for token in ["medium", "42.5"]] == ["medium", 42.5]
+    assert cashModel.risk_label("medium") == "Medium Risk"
+    assert cashModel.risk_label(42.5) == "42.5% Max Cash"
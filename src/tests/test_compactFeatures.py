@@ -0,0 +1,54 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+from benchmarkSuite import generate_fii_dii_table
+from cashAllocationModel import FEATURE_NAMES, latest_features, load_feature_index
+from featureEngineering import calculate_institutional_flow_metrics
+
+
+@pytest.fixture
+def feature_files(tmp_path):
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2022-04-01", "2025-03-31")
+    files = [tmp_path / name for name in ["volatility.csv", "volume.csv", "flows.csv", "breadth.csv"]]
+    pd.DataFrame({"Date": dates, "30-Day Volatility": rng.random(len(dates)) * 0.02}).to_csv(files[0], index=False)
+    pd.DataFrame({"Date": dates[:-5], "Average Volume": rng.random(len(dates) - 5) * 1e6}).to_csv(files[1], index=False)
+    generate_fii_dii_table().to_csv(tmp_path / "fii_dii.csv", index=False)
+    calculate_institutional_flow_metrics(str(tmp_path / "fii_dii.csv")).to_csv(files[2], index=False)
+    pd.DataFrame({"Date": dates[40:], "Advance-Decline Ratio": rng.random(len(dates) - 40) * 2}).to_csv(files[3], index=False)
+    return [str(file) for file in files]
+
+
+def test_flow_months_are_integers(tmp_path):
+    generate_fii_dii_table(months=3).to_csv(tmp_path / "fii_dii.csv", index=False)
+    flows = calculate_institutional_flow_metrics(str(tmp_path / "fii_dii.csv"))
+    assert flows["MONTH"].dtype == np.int32
+    assert flows["MONTH"].tolist() == [202503, 202502, 202501]
+
+
+@pytest.mark.parametrize("as_of", ["2022-04-15", "2023-01-31", "2024-06-28", "2025-03-24", "2025-03-31", None])
+def test_as_of_lookups_match_the_default_index(feature_files, as_of):
+    compact = load_feature_index(*feature_files)
+    default = load_feature_index(*feature_files, compact=False)
+    assert compact.dtype == np.float32 and default.dtype == np.float64
+    assert compact.last_date() == default.last_date()
+
+    if as_of is not None:
+        np.testing.assert_allclose(compact.as_of(as_of, FEATURE_NAMES), default.as_of(as_of, FEATURE_NAMES), rtol=1e-6)
+    np.testing.assert_allclose(latest_features(compact, as_of), latest_features(default, as_of), rtol=1e-5, atol=1e-6)
+
+
+def test_aligned_features_match_the_default_index(feature_files):
+    compact = load_feature_index(*feature_files).align()
+    default = load_feature_index(*feature_files, compact=False).align()
+    pd.testing.assert_index_equal(compact.index, default.index)
+    pd.testing.assert_frame_equal(compact.astype(float), default, rtol=1e-6)
+
+
+def test_compact_index_is_smaller_than_the_loaded_frames(feature_files):
+    # The allocation model used to hold every feature file as read by pd.read_csv
+    frames = sum(pd.read_csv(file).memory_usage(deep=True).sum() for file in feature_files)
+    compact = load_feature_index(*feature_files)
+    nbytes = sum(keys.nbytes + values.nbytes for keys, values in (compact.view(name) for name in FEATURE_NAMES))
+    assert frames >= 4 * nbytes
@@ -0,0 +1,98 @@
+import importlib
+import sys
+import types
+
+import pandas as pd
+import pytest
+
+import dataCollection
+from featureEngineering import preprocess_csv
+
+
+class FakeTicker:
+    """yf.Ticker stand-in serving a queue of history results per ticker."""
+    results = {}
+    calls = []
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+
+    def history(self, **kwargs):
+        FakeTicker.calls.append(self.ticker)
+        return FakeTicker.results[self.ticker].pop(0)
+
+
+def daily_bars(start="2024-01-01", periods=5):
+    dates = pd.bdate_range(start, periods=periods, tz="Asia/Kolkata")
+    values = range(100, 100 + periods)
+    return pd.DataFrame({"Open": values, "High": values, "Low": values, "Close": values, "Volume": values,
+                         "Dividends": 0.0, "Stock Splits": 0.0}, index=dates)
+
+
+@pytest.fixture
+def fake_yfinance(monkeypatch):
+    FakeTicker.results, FakeTicker.calls = {}, []
+    monkeypatch.setitem(sys.modules, "yfinance", types.SimpleNamespace(Ticker=FakeTicker))
+    monkeypatch.setattr(dataCollection, "BACKOFF_SECONDS", 0)
+    return FakeTicker
+
+
+def test_import_without_optional_dependencies(monkeypatch):
+    for module in ["yfinance", "selenium", "webdriver_manager"]:
+        monkeypatch.setitem(sys.modules, module, None)
+    monkeypatch.delitem(sys.modules, "dataCollection")
+    module = importlib.import_module("dataCollection")
+    assert module.parse_fii_dii_table("<table><tr><th>A</th></tr><tr><td>1</td></tr></table>")["A"].tolist() == [1]
+
+
+def test_empty_download_is_retried(fake_yfinance):
+    fake_yfinance.results["^NSEI"] = [pd.DataFrame(), daily_bars()]
+    data = dataCollection.with_retries(dataCollection.download_history, "^NSEI", start="2024-01-01", end="2024-01-08", backoff=0)
+    assert fake_yfinance.calls == ["^NSEI", "^NSEI"]
+    assert list(data.columns) == [(column, "^NSEI") for column in dataCollection.PRICE_COLUMNS]
+    assert data.index.tz is None and data.index.name == "Date"
+
+
+def test_empty_download_fails_after_retries(fake_yfinance):
+    fake_yfinance.results["^NSEI"] = [pd.DataFrame()] * dataCollection.MAX_RETRIES
+    with pytest.raises(dataCollection.EmptyDownloadError):
+        dataCollection.with_retries(dataCollection.download_history, "^NSEI", period="5d", backoff=0)
+
+
+def test_fetch_nifty_data_saves_raw_files(fake_yfinance, monkeypatch, tmp_path):
+    monkeypatch.setattr(dataCollection, "OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setattr(dataCollection, "TICKERS", {"Nifty 50": "^NSEI", "INDIA VIX": "^INDIAVIX"})
+    fake_yfinance.results = {"^NSEI": [daily_bars()], "^INDIAVIX": [pd.DataFrame()] * dataCollection.MAX_RETRIES}
+
+    nifty_file, vix_file = dataCollection.fetch_nifty_data(max_workers=2)
+    assert vix_file is None
+
+    processed_file = str(tmp_path / "processed.csv")
+    preprocess_csv(nifty_file, processed_file)
+    processed = pd.read_csv(processed_file)
+    assert processed["Date"].tolist() == [str(date.date()) for date in pd.bdate_range("2024-01-01", periods=5)]
+    assert processed["Close"].tolist() == [100, 101, 102, 103, 104]
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_calls = 0
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+def test_failed_driver_is_replaced():
+    pool = dataCollection.WebDriverPool(size=1, driver_factory=FakeDriver)
+    with pytest.raises(RuntimeError):
+        with pool.driver() as driver:
+            failed = driver
+            raise RuntimeError("session lost")
+    assert failed.quit_calls == 1
+
+    with pool.driver() as driver:
+        assert driver is not failed
+    with pool.driver() as reused:
+        assert reused is driver
+    pool.close()
+    assert driver.quit_calls == 1
@@ -0,0 +1,68 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+from dataStore import append_frame, iter_frames, read_frame, write_frame
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def prices():
+    dates = pd.bdate_range("2023-12-25", periods=10)
+    return pd.DataFrame({"Date": dates, "Close": np.arange(10) * 1.5, "Open": np.arange(10) * 1.25, "Volume": np.arange(10)})
+
+
+@pytest.fixture
+def values():
+    return pd.DataFrame({"a": [1, 4, 7], "b": [2.5, 5.5, 8.5], "c": [3, 6, 9]})
+
+
+def backends(data, tmp_path):
+    csv_file, parquet_file = str(tmp_path / "data.csv"), str(tmp_path / "data.parquet")
+    write_frame(data, csv_file)
+    write_frame(data, parquet_file)
+    return csv_file, parquet_file
+
+
+def test_typed_reads_match(prices, tmp_path):
+    csv_file, parquet_file = backends(prices, tmp_path)
+    csv = read_frame(csv_file, columns=["Date", "Close"], start="2024-01-01", end="2024-01-04", parse_dates=["Date"])
+    parquet = read_frame(parquet_file, columns=["Date", "Close"], start="2024-01-01", end="2024-01-04")
+    pd.testing.assert_frame_equal(csv.reset_index(drop=True), parquet, check_dtype=False)
+    assert parquet["Date"].tolist() == list(pd.bdate_range("2024-01-01", "2024-01-04"))
+
+
+@pytest.mark.parametrize("csv_kwargs", [
+    {"names": ["x", "y", "z"]},
+    # Extra names are read as missing values
+    {"names": ["x", "y", "z", "w"]},
+    # Leading columns without a name become the index
+    {"names": ["y", "z"]},
+    {"names": ["z"]},
+    {"names": ["x", "z"], "usecols": [0, 2]},
+    {"names": ["x", "y", "z"], "usecols": [2, 0]},
+    {"names": ["x", "y", "z"], "usecols": ["x", "z"]},
+])
+def test_positional_names_match(values, tmp_path, csv_kwargs):
+    csv_file, parquet_file = backends(values, tmp_path)
+    csv = read_frame(csv_file, skiprows=1, **csv_kwargs)
+    pd.testing.assert_frame_equal(read_frame(parquet_file, **csv_kwargs), csv)
+    pd.testing.assert_frame_equal(pd.concat(iter_frames(parquet_file, 2, **csv_kwargs)), csv)
+
+
+def test_mismatched_usecols_names_fail(values, tmp_path):
+    _, parquet_file = backends(values, tmp_path)
+    with pytest.raises(ValueError):
+        read_frame(parquet_file, names=["x"], usecols=[0, 2])
+
+
+def test_append_replaces_revised_rows(prices, tmp_path):
+    parquet_file = str(tmp_path / "prices.parquet")
+    write_frame(prices.iloc[:8], parquet_file)
+    # The last stored bar is revised and two new bars follow
+    revised = prices.iloc[7:].assign(Close=prices["Close"].iloc[7:] + 100)
+    append_frame(revised, parquet_file)
+    stored = read_frame(parquet_file)
+    assert stored["Date"].tolist() == prices["Date"].tolist()
+    assert stored["Close"].tolist() == prices["Close"].iloc[:7].tolist() + revised["Close"].tolist()
@@ -0,0 +1,80 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+from featureEngineering import calculate_volatility_metrics
+from featureIndex import FeatureIndex, asof_positions, day_dates, day_numbers, month_end_dates, month_numbers
+
+
+@pytest.fixture
+def index():
+    return (
+        FeatureIndex()
+        # Out of order, with a revised value for 2024-01-03
+        .add("daily", ["2024-01-03", "2024-01-01", "2024-01-02", "2024-01-03"], [3.0, 1.0, 2.0, 30.0])
+        # Monthly table, latest month first
+        .add_monthly("monthly", pd.DataFrame({"MONTH": ["Feb 2024", "Jan 2023", "Dec 2023"], "Value": [2.0, 0.0, 1.0]}), "Value")
+        .add("sporadic", ["2023-06-08"], [6.5])
+    )
+
+
+def test_as_of_lookups(index):
+    assert index.series("daily").tolist() == [1.0, 2.0, 30.0]
+    assert index.series("monthly").index.tolist() == list(pd.to_datetime(["2023-01-31", "2023-12-31", "2024-02-29"]))
+    pd.testing.assert_series_equal(index.as_of("2024-01-02"), pd.Series({"daily": 2.0, "monthly": 1.0, "sporadic": 6.5}))
+    assert index.as_of("2023-01-30").isna().all()
+    assert index.as_of("2024-03-01", ["monthly", "daily"]).tolist() == [2.0, 30.0]
+    assert index.last_date() == pd.Timestamp("2024-02-29")
+
+
+def test_views_stop_at_the_end_date(index):
+    keys, values = index.view("monthly", end="2024-02-28")
+    assert values.tolist() == [0.0, 1.0]
+    assert np.shares_memory(values, index.view("monthly")[1])
+
+
+def test_align_matches_merge_asof(index):
+    calendar = pd.bdate_range("2022-12-26", "2024-03-08")
+    aligned = index.align(calendar)
+    for name in index.names:
+        series = index.series(name).rename("value").reset_index()
+        expected = pd.merge_asof(pd.DataFrame({"Date": calendar}), series, on="Date")["value"]
+        np.testing.assert_array_equal(aligned[name].to_numpy(), expected.to_numpy())
+
+
+def test_compact_resolution_matches(index):
+    compact = FeatureIndex.compact()
+    for name in index.names:
+        compact.add(name, index.dates(name), index.series(name))
+    calendar = pd.bdate_range("2022-12-26", "2024-03-08")
+    pd.testing.assert_frame_equal(compact.align(calendar).astype(float), index.align(calendar))
+
+
+def test_date_encodings():
+    days = day_numbers(["1970-01-02", None, "2024-02-29"])
+    assert days.dtype == np.int32 and days[0] == 1
+    assert day_dates(days[[0, 2]]).tolist() == list(pd.to_datetime(["1970-01-02", "2024-02-29"]))
+    assert month_numbers(["Feb 2024"]).tolist() == [202402]
+    assert month_end_dates([202402]).tolist() == month_end_dates(["Feb 2024"]).tolist() == [pd.Timestamp("2024-02-29")]
+    assert asof_positions(np.array([10, 20, 30]), np.array([5, 10, 25, 40])).tolist() == [-1, 0, 1, 2]
+
+
+def test_volatility_ratio_is_joined_by_date(tmp_path):
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2024-01-01", periods=80)
+    files = []
+    # Midcap misses a few Nifty sessions, so the files have different lengths
+    for name, session_dates in [("nifty", dates), ("midcap", dates.delete([10, 40, 41]))]:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(session_dates))))
+        data = pd.DataFrame({"Date": session_dates.strftime("%Y-%m-%d"), "Close": close, "High": close, "Low": close, "Open": close, "Volume": 1})
+        files.append(str(tmp_path / f"{name}.csv"))
+        data.to_csv(files[-1], index=False)
+
+    nifty, midcap = calculate_volatility_metrics(*files)
+    midcap_volatility = midcap.set_index("Date")["30-Day Volatility"].reindex(dates, method="ffill").to_numpy()
+    # Sessions before either window is full have no ratio
+    with np.errstate(invalid="ignore", divide="ignore"):
+        expected = nifty["30-Day Volatility"].to_numpy() / midcap_volatility
+    expected[~np.isfinite(expected)] = 0
+    assert (expected[32:] > 0).all()
+    np.testing.assert_allclose(nifty["Volatility Ratio"], expected)
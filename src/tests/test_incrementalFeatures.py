@@ -0,0 +1,74 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+import statisticsCache
+from featureEngineering import calculate_market_breadth, calculate_volatility_metrics
+from incrementalFeatures import refresh_features
+
+
+def write_processed_prices(file, dates, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, len(dates)))
+    pd.DataFrame({"Date": dates, "Close": close, "High": close, "Low": close, "Open": close * (1 + rng.normal(0, 0.005, len(dates))),
+                  "Volume": rng.integers(1000, 5000, len(dates))}).to_csv(file, index=False)
+
+
+def write_raw_prices(processed_file, raw_file):
+    """Write a processed file with the three header rows of a raw yfinance file."""
+    with open(raw_file, "w") as f:
+        f.write("Price,Close,High,Low,Open,Volume\nTicker,^NSEI,^NSEI,^NSEI,^NSEI,^NSEI\nDate,,,,,\n")
+        f.writelines(open(processed_file).readlines()[1:])
+
+
+def test_refresh_processes_only_new_or_revised_bars(tmp_path):
+    dates = pd.bdate_range("2024-01-01", periods=60)
+    nifty_file, midcap_file = str(tmp_path / "nifty.csv"), str(tmp_path / "midcap.csv")
+    write_processed_prices(nifty_file, dates, seed=1)
+    write_processed_prices(midcap_file, dates[:-3], seed=2)
+    state_file = str(tmp_path / "state.json")
+
+    # Unchanged files: nothing to replay after the first run seeds the state
+    assert [refresh_features(nifty_file, midcap_file, str(tmp_path), state_file) for _ in range(3)] == [0, 0, 0]
+
+    # A revised last bar is replayed once
+    nifty = pd.read_csv(nifty_file)
+    nifty.loc[nifty.index[-1], "Close"] += 1
+    nifty.to_csv(nifty_file, index=False)
+    assert refresh_features(nifty_file, midcap_file, str(tmp_path), state_file) == 1
+    assert refresh_features(nifty_file, midcap_file, str(tmp_path), state_file) == 0
+    assert len(pd.read_csv(tmp_path / "nifty_volatility.csv")) == 1
+
+    nifty = pd.concat([nifty, nifty.tail(1).assign(Date="2024-03-25")])
+    nifty.to_csv(nifty_file, index=False)
+    assert refresh_features(nifty_file, midcap_file, str(tmp_path), state_file) == 1
+    assert len(pd.read_csv(tmp_path / "nifty_volatility.csv")) == 2
+
+
+def test_reloaded_engine_matches_batch_features(tmp_path, monkeypatch):
+    monkeypatch.setattr(statisticsCache, "ENABLED", False)
+    dates = pd.bdate_range("2024-01-01", periods=80)
+    full_nifty, midcap_file = str(tmp_path / "full_nifty.csv"), str(tmp_path / "midcap.csv")
+    write_processed_prices(full_nifty, dates, seed=1)
+    write_processed_prices(midcap_file, dates[:60], seed=2)
+
+    # Seed the state on the first 60 sessions, then append Nifty-only sessions after a reload
+    nifty_file, state_file = str(tmp_path / "nifty.csv"), str(tmp_path / "state.json")
+    pd.read_csv(full_nifty).head(60).to_csv(nifty_file, index=False)
+    refresh_features(nifty_file, midcap_file, str(tmp_path), state_file)
+    pd.read_csv(full_nifty).to_csv(nifty_file, index=False)
+    assert refresh_features(nifty_file, midcap_file, str(tmp_path), state_file) == 20
+
+    batch_volatility, _ = calculate_volatility_metrics(full_nifty, midcap_file)
+    appended = pd.read_csv(tmp_path / "nifty_volatility.csv")
+    expected = batch_volatility.tail(20)
+    assert appended["Date"].tolist() == expected["Date"].dt.strftime("%Y-%m-%d").tolist()
+    np.testing.assert_allclose(appended["30-Day Volatility"], expected["30-Day Volatility"], rtol=1e-9)
+    np.testing.assert_allclose(appended["Volatility Ratio"], expected["Volatility Ratio"], rtol=1e-9)
+    assert (appended["Volatility Ratio"] != 0).all()
+
+    raw_nifty = str(tmp_path / "raw_nifty.csv")
+    write_raw_prices(full_nifty, raw_nifty)
+    batch_breadth = calculate_market_breadth(raw_nifty).tail(20)
+    appended_breadth = pd.read_csv(tmp_path / "market_breadth.csv")
+    assert appended_breadth["Advance-Decline Ratio"].to_numpy() == pytest.approx(batch_breadth["Advance-Decline Ratio"].to_numpy())
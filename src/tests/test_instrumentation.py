@@ -0,0 +1,63 @@
+import threading
+import tracemalloc
+
+import pytest
+
+import instrumentation
+from instrumentation import instrumented
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    instrumentation.reset()
+    yield
+    instrumentation.configure(profile="off")
+    instrumentation.reset()
+
+
+def test_only_declared_paths_are_measured(tmp_path, monkeypatch):
+    source = tmp_path / "source.csv"
+    source.write_text("Date,Value\n2024-01-01,1\n")
+    output = tmp_path / "output.csv"
+
+    @instrumented(stage="copy", paths=["input_file", "output_file"])
+    def copy(input_file, output_file, label):
+        output_file.write_text(input_file.read_text() * 2)
+
+    checked = []
+    path_size = instrumentation._path_size
+    monkeypatch.setattr(instrumentation, "_path_size", lambda path: checked.append(path) or path_size(path))
+    copy(source, output_file=output, label=str(source))
+
+    summary = instrumentation.snapshot()["stages"]["copy"]
+    assert (summary["bytes_read"], summary["bytes_written"]) == (source.stat().st_size, output.stat().st_size)
+    # The label names a file too, but is not a path parameter
+    assert checked == [str(source), str(source), str(output)]
+
+
+def test_unknown_path_parameter():
+    with pytest.raises(ValueError):
+        instrumented(lambda data: data, paths=["data_file"])
+
+
+def test_concurrent_outermost_stages_share_the_profiler():
+    instrumentation.configure(profile="tracemalloc")
+    started, release = threading.Barrier(4), threading.Event()
+
+    @instrumented(stage="worker")
+    def worker():
+        started.wait()
+        release.wait()
+        return [0] * 1000
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    events = [event for event in instrumentation.snapshot()["events"] if event["stage"] == "worker"]
+    assert len(events) == 4 and not any(event["error"] for event in events)
+    assert sum("peak_traced_bytes" in event for event in events) == 1
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,83 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+from benchmarkSuite import write_raw_price_csv
+from cashAllocationModel import DEFAULT_WEIGHTS, calculate_cash_allocation_batch
+from intradayFeatures import (calculate_intraday_allocation, calculate_intraday_features, calculate_realized_volatility,
+                              load_intraday_bars, resample_bars)
+
+
+def minute_bars(days=3, seed=0):
+    """1-minute bars of the 09:15-15:30 IST session, with UTC timestamps as yfinance returns them."""
+    rng = np.random.default_rng(seed)
+    sessions = [pd.date_range(f"{day.date()} 09:15", periods=375, freq="min", tz="Asia/Kolkata")
+                for day in pd.bdate_range("2025-03-26", periods=days)]
+    dates = sessions[0].append(sessions[1:])
+    close = 22000 * np.exp(np.cumsum(rng.normal(0, 0.0005, len(dates))))
+    open_price = np.concatenate([[close[0]], close[:-1]])
+    return pd.DataFrame({
+        "Date": dates.tz_convert("UTC"),
+        "Close": close,
+        "High": np.maximum(open_price, close) * (1 + rng.uniform(0, 0.0003, len(dates))),
+        "Low": np.minimum(open_price, close) * (1 - rng.uniform(0, 0.0003, len(dates))),
+        "Open": open_price,
+        "Volume": rng.integers(0, 1000, len(dates))
+    })
+
+
+@pytest.fixture
+def files(tmp_path):
+    bars = minute_bars()
+    files = {"bars": str(tmp_path / "bars.csv"), "flows": str(tmp_path / "flows.csv"), "breadth": str(tmp_path / "breadth.csv")}
+    # The last bar is repeated, as a revised bar would be
+    write_raw_price_csv(pd.concat([bars, bars.tail(1).assign(Close=bars["Close"].iloc[-1] + 1)]), files["bars"])
+    pd.DataFrame({"MONTH": [202503, 202502], "FII/DII Ratio": [-0.5, 0.5]}).to_csv(files["flows"], index=False)
+    pd.DataFrame({"Date": pd.bdate_range("2025-03-03", "2025-03-28"), "Advance-Decline Ratio": np.linspace(0.5, 1.5, 20)}).to_csv(files["breadth"], index=False)
+    return files
+
+
+def test_bars_are_loaded_in_exchange_time(files):
+    bars = load_intraday_bars(files["bars"])
+    assert bars.index[0] == pd.Timestamp("2025-03-26 09:15") and bars.index.tz is None
+    assert bars.index.is_unique and len(bars) == 3 * 375
+    assert bars["Close"].iloc[-1] == minute_bars()["Close"].iloc[-1] + 1
+
+
+def test_resampling_aggregates_sessions_only(files):
+    bars = load_intraday_bars(files["bars"])
+    resampled = resample_bars(bars, "15min")
+    # 25 bins per session; overnight bins are dropped
+    assert len(resampled) == 75 and resampled.index[25] == pd.Timestamp("2025-03-27 09:15")
+    first = bars.iloc[:15]
+    assert resampled.iloc[0].tolist() == [first["Open"].iloc[0], first["High"].max(), first["Low"].min(), first["Close"].iloc[-1], first["Volume"].sum()]
+
+
+def test_estimators_match_their_definitions(files):
+    bars = resample_bars(load_intraday_bars(files["bars"]), "5min")
+    volatility = calculate_realized_volatility(bars, window=10)
+    window = bars.iloc[-10:]
+    log_range, log_body = np.log(window["High"] / window["Low"]), np.log(window["Close"] / window["Open"])
+    assert volatility["close_to_close"].iloc[-1] == pytest.approx(np.log(bars["Close"]).diff().iloc[-10:].std())
+    assert volatility["parkinson"].iloc[-1] == pytest.approx(np.sqrt((log_range ** 2).mean() / (4 * np.log(2))))
+    assert volatility["garman_klass"].iloc[-1] == pytest.approx(np.sqrt((0.5 * log_range ** 2 - (2 * np.log(2) - 1) * log_body ** 2).mean()))
+    assert volatility.iloc[:9].isna().all().all()
+
+
+def test_intraday_allocation_uses_the_latest_bar(files):
+    as_of, allocations = calculate_intraday_allocation(files["bars"], files["flows"], files["breadth"], horizon="15min", window=10)
+    assert as_of == pd.Timestamp("2025-03-28 15:15")
+
+    features = calculate_intraday_features(load_intraday_bars(files["bars"]), "15min", 10)
+    normalized = [(series.iloc[-1] - series.min()) / (series.max() - series.min())
+                  for series in [features["garman_klass"].dropna(), features["Average Volume"][features["garman_klass"].notna()]]]
+    # Only February's flows are out by then (no range, so neutral); the 2025-03-28 breadth tops its range
+    expected = calculate_cash_allocation_batch(np.array(normalized + [0.0, 1.0]), DEFAULT_WEIGHTS, ["high", "medium", "low"])[0]
+    np.testing.assert_allclose(allocations.to_numpy(), expected)
+
+
+def test_invalid_requests(files):
+    with pytest.raises(ValueError):
+        calculate_intraday_allocation(files["bars"], files["flows"], files["breadth"], estimator="yang_zhang")
+    with pytest.raises(ValueError):
+        calculate_intraday_allocation(files["bars"], files["flows"], files["breadth"], horizon="1D", window=30)
@@ -0,0 +1,72 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+import statisticsCache
+from cashAllocationModel import DEFAULT_WEIGHTS, calculate_cash_allocation_batch, load_latest_features
+from portfolioAllocation import allocate_accounts, calculate_account_allocations, export_account_allocations, load_accounts
+
+FEATURES = np.array([0.3, 0.6, 0.2, 0.9])
+
+
+@pytest.fixture
+def accounts_file(tmp_path):
+    accounts = pd.DataFrame({
+        "Account": ["A", "B", "C", "D", "E"],
+        "Risk Tolerance": ["high", "medium", "35", "low", "low"],
+        "Min Cash": [np.nan, np.nan, 30, np.nan, np.nan],
+        "Max Cash": [np.nan, np.nan, np.nan, 5, np.nan],
+        # B overrides two weights; the others keep the model weights
+        "volatility": [np.nan, 0.1, np.nan, np.nan, np.nan],
+        "market_breadth": [np.nan, 0.5, np.nan, np.nan, np.nan]
+    })
+    accounts_file = str(tmp_path / "accounts.csv")
+    accounts.to_csv(accounts_file, index=False)
+    return accounts_file
+
+
+def test_accounts_match_single_allocations(accounts_file):
+    allocations = calculate_account_allocations(FEATURES, load_accounts(accounts_file))
+    assert list(allocations.columns) == ["Account", "Risk Tolerance", "Min Cash", "Max Cash", "Score", "Cash Allocation"]
+
+    def single(weights, risk_tolerance):
+        return calculate_cash_allocation_batch(FEATURES, weights, [risk_tolerance])[0, 0]
+
+    overrides = {**DEFAULT_WEIGHTS, "volatility": 0.1, "market_breadth": 0.5}
+    expected = [single(DEFAULT_WEIGHTS, "high"), single(overrides, "medium"), single(DEFAULT_WEIGHTS, 35.0), single(DEFAULT_WEIGHTS, "low"), single(DEFAULT_WEIGHTS, "low")]
+    # C is raised to its 30% floor and D capped at 5%
+    assert expected[2] < 30 and expected[3] > 5
+    expected[2], expected[3] = 30, 5
+    np.testing.assert_allclose(allocations["Cash Allocation"], expected)
+
+
+def test_invalid_accounts(accounts_file, tmp_path):
+    accounts = load_accounts(accounts_file)
+    with pytest.raises(ValueError):
+        calculate_account_allocations(FEATURES, accounts.assign(**{"Risk Tolerance": ["high", "reckless", "low", "low", "low"]}))
+    with pytest.raises(ValueError):
+        calculate_account_allocations(FEATURES, accounts.assign(**{"Min Cash": 50, "Max Cash": 10}))
+
+    pd.DataFrame({"Account": ["A"]}).to_csv(tmp_path / "no_risk.csv", index=False)
+    with pytest.raises(ValueError):
+        load_accounts(str(tmp_path / "no_risk.csv"))
+
+
+def test_allocate_and_export(accounts_file, tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(statisticsCache, "ENABLED", False)
+    dates = pd.bdate_range("2025-01-01", "2025-03-31")
+    rng = np.random.default_rng(0)
+    files = [str(tmp_path / name) for name in ["volatility.csv", "volume.csv", "flows.csv", "breadth.csv"]]
+    pd.DataFrame({"Date": dates, "30-Day Volatility": rng.random(len(dates))}).to_csv(files[0], index=False)
+    pd.DataFrame({"Date": dates, "Average Volume": rng.random(len(dates))}).to_csv(files[1], index=False)
+    pd.DataFrame({"MONTH": [202503, 202502, 202501], "FII/DII Ratio": [0.1, 0.5, -0.5]}).to_csv(files[2], index=False)
+    pd.DataFrame({"Date": dates, "Advance-Decline Ratio": rng.random(len(dates))}).to_csv(files[3], index=False)
+
+    allocations = allocate_accounts(accounts_file, *files, as_of="2025-02-28")
+    expected = calculate_account_allocations(load_latest_features(*files, as_of="2025-02-28"), load_accounts(accounts_file))
+    pd.testing.assert_frame_equal(allocations, expected)
+
+    output = str(tmp_path / "allocations.parquet")
+    export_account_allocations(allocations, output)
+    pd.testing.assert_frame_equal(pd.read_parquet(output), allocations)
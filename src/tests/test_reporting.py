@@ -0,0 +1,66 @@
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+import featureEngineering
+import reporting
+from reporting import ReportRenderer, plot_cash_allocation_metrics, plot_institutional_flows
+
+
+def test_compute_functions_do_not_load_matplotlib(tmp_path):
+    flows_file = tmp_path / "flows.csv"
+    pd.DataFrame({"MONTH": [202503, 202502], "FII/DII Ratio": [0.5, -0.5]}).to_csv(flows_file, index=False)
+    script = (
+        "import sys, numpy as np\n"
+        "import cashAllocationModel, featureEngineering, reporting\n"
+        "cashAllocationModel.calculate_cash_allocation_batch(np.full(4, 0.5), np.full((10, 4), 0.25))\n"
+        f"cashAllocationModel.FeatureTable.read({str(flows_file)!r}, ['FII/DII Ratio'], month_column='MONTH')\n"
+        "print(any(module.startswith('matplotlib') for module in sys.modules))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", script], cwd=reporting.__file__.rsplit("/", 1)[0], capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "False"
+
+
+def test_plots_render_in_the_background(tmp_path):
+    pytest.importorskip("matplotlib")
+    flows = pd.DataFrame({"MONTH": [202503, 202502], "FII Net Flow": [-4744.25, -58988.08], "DII Net Flow": [27421.49, 64853.19]})
+    with ReportRenderer() as renderer:
+        renderer.submit(plot_institutional_flows, flows, output_file=str(tmp_path / "flows.png"))
+        renderer.submit(plot_cash_allocation_metrics, [0.1, 0.2, 0.3, 0.4], 35.0, output_file=str(tmp_path / "plots" / "cash.png"))
+        paths = renderer.wait()
+    assert paths == [str(tmp_path / "flows.png"), str(tmp_path / "plots" / "cash.png")]
+    assert all((tmp_path / path).stat().st_size > 0 for path in paths)
+
+
+def test_render_errors_are_raised_on_wait():
+    def failing_plot():
+        raise RuntimeError("no display")
+
+    renderer = ReportRenderer()
+    renderer.submit(failing_plot)
+    with pytest.raises(RuntimeError):
+        renderer.wait()
+    renderer.close()
+
+
+def test_renderer_closes_when_saving_fails(monkeypatch):
+    closed = []
+    monkeypatch.setattr(featureEngineering, "ReportRenderer", type("Renderer", (ReportRenderer,), {
+        "submit": lambda self, *args, **kwargs: None,
+        "close": lambda self: closed.append(self) or ReportRenderer.close(self)
+    }))
+    monkeypatch.setattr(featureEngineering, "preprocess_csv", lambda *args: None)
+    for function in ["calculate_volatility_metrics", "calculate_traded_volume"]:
+        monkeypatch.setattr(featureEngineering, function, lambda *args: (None, None))
+    for function in ["calculate_institutional_flow_metrics", "calculate_market_breadth", "calculate_interest_rate_metrics"]:
+        monkeypatch.setattr(featureEngineering, function, lambda *args: None)
+
+    def failing_write(data, destination):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(featureEngineering, "write_frame", failing_write)
+    with pytest.raises(OSError):
+        featureEngineering.main()
+    assert len(closed) == 1
@@ -0,0 +1,80 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+from sourceCache import SourceCache, missing_ranges
+
+
+def bars(start, end):
+    dates = pd.bdate_range(start, end, inclusive="left", name="Date")
+    return pd.DataFrame({"Close": np.arange(len(dates), dtype=float)}, index=dates)
+
+
+class Downloads:
+    """Records the requested ranges and serves synthetic daily bars for them."""
+
+    def __init__(self):
+        self.ranges = []
+
+    def __call__(self, start, end):
+        self.ranges.append((start, end))
+        return bars(start, end)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SourceCache(cache_dir=str(tmp_path / "cache"))
+
+
+def test_missing_ranges():
+    assert missing_ranges("2024-01-01", "2024-02-01") == [(pd.Timestamp("2024-01-01"), pd.Timestamp("2024-02-01"))]
+    # Before and after the covered range; the last covered day is fetched again
+    assert missing_ranges("2024-01-01", "2024-03-01", "2024-01-15", "2024-02-15") == [
+        (pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-15")), (pd.Timestamp("2024-02-14"), pd.Timestamp("2024-03-01"))]
+    assert missing_ranges("2024-01-20", "2024-02-10", "2024-01-15", "2024-02-15") == []
+    assert missing_ranges("2024-01-20", "2024-02-15", "2024-01-15", "2024-02-15") == [(pd.Timestamp("2024-02-14"), pd.Timestamp("2024-02-15"))]
+
+
+def test_only_missing_ranges_are_downloaded(cache):
+    download = Downloads()
+    first = cache.fetch_history("yfinance", "^NSEI", "2024-01-01", "2024-02-01", download)
+    assert download.ranges == [("2024-01-01", "2024-02-01")]
+
+    # Fresh and covered: served from the cache
+    cached = cache.fetch_history("yfinance", "^NSEI", "2024-01-08", "2024-01-20", download)
+    assert len(download.ranges) == 1
+    pd.testing.assert_frame_equal(cached, first.loc["2024-01-08":"2024-01-19"])
+
+    extended = cache.fetch_history("yfinance", "^NSEI", "2024-01-01", "2024-03-01", download)
+    assert download.ranges[1:] == [("2024-01-31", "2024-03-01")]
+    assert extended.index.is_unique and extended.index.is_monotonic_increasing
+    assert extended.index[0] == pd.Timestamp("2024-01-01") and extended.index[-1] == pd.Timestamp("2024-02-29")
+
+
+def test_expired_history_refreshes_the_last_day(tmp_path):
+    cache = SourceCache(cache_dir=str(tmp_path / "cache"), ttls={"yfinance": 0})
+    download = Downloads()
+    cache.fetch_history("yfinance", "^NSEI", "2024-01-01", "2024-02-01", download)
+    cache.fetch_history("yfinance", "^NSEI", "2024-01-01", "2024-02-01", download)
+    assert download.ranges == [("2024-01-01", "2024-02-01"), ("2024-01-31", "2024-02-01")]
+
+
+def test_unchanged_scrapes_are_skipped(cache):
+    assert cache.content_changed("fii_dii", "<table>1</table>")
+    assert not cache.scrape_is_fresh("fii_dii")
+    cache.record_content("fii_dii", "<table>1</table>")
+    assert cache.scrape_is_fresh("fii_dii")
+    assert not cache.content_changed("fii_dii", "<table>1</table>")
+    assert cache.content_changed("fii_dii", "<table>2</table>")
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = SourceCache(cache_dir=str(tmp_path / "cache"), max_entries=2)
+    download = Downloads()
+    for ticker in ["A", "B"]:
+        cache.fetch_history("yfinance", ticker, "2024-01-01", "2024-01-10", download)
+    # Reading A makes B the least recently used entry
+    cache.fetch_history("yfinance", "A", "2024-01-01", "2024-01-10", download)
+    cache.fetch_history("yfinance", "C", "2024-01-01", "2024-01-10", download)
+    assert len(download.ranges) == 3
+    assert sorted(entry["ticker"] for entry in SourceCache(cache_dir=cache.cache_dir).index.values()) == ["A", "C"]
@@ -0,0 +1,29 @@
+import os
+
+import pandas as pd
+
+from statisticsCache import StatisticsCache
+
+
+def test_cache_directory_created_on_first_spill(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache = StatisticsCache(cache_dir=str(cache_dir))
+    assert not cache_dir.exists()
+
+    data_file = tmp_path / "volatility.csv"
+    pd.DataFrame({"Date": pd.bdate_range("2024-01-01", periods=5), "Value": [3.0, 1.0, 4.0, 1.0, 5.0]}).to_csv(data_file, index=False)
+    statistics = cache.statistics(str(data_file), "Value", date_column="Date")
+    assert (statistics["min"], statistics["max"]) == (1.0, 5.0)
+    assert "files.json" in os.listdir(cache_dir)
+
+
+def test_unwritable_cache_directory_keeps_entries_in_memory(tmp_path):
+    # A file where the cache directory should be makes every spill fail
+    cache_dir = tmp_path / "cache"
+    cache_dir.write_text("")
+    cache = StatisticsCache(cache_dir=str(cache_dir))
+
+    data_file = tmp_path / "volume.csv"
+    pd.DataFrame({"Date": pd.bdate_range("2024-01-01", periods=3), "Value": [2.0, 6.0, 4.0]}).to_csv(data_file, index=False)
+    assert cache.statistics(str(data_file), "Value", date_column="Date")["max"] == 6.0
+    assert cache.statistics(str(data_file), "Value", date_column="Date")["median"] == 4.0
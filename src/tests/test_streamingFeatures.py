@@ -0,0 +1,67 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+import statisticsCache
+from benchmarkSuite import generate_ohlcv, write_raw_price_csv
+from featureEngineering import calculate_market_breadth, calculate_traded_volume, calculate_volatility_metrics, preprocess_csv
+from streamingFeatures import (stream_market_breadth, stream_preprocess, stream_traded_volume, stream_volatility,
+                               stream_volatility_metrics, streaming_median)
+
+# Chunks that do not divide the history or line up with the 30-session windows
+CHUNK_SIZE = 37
+
+
+@pytest.fixture
+def price_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(statisticsCache, "ENABLED", False)
+    nifty = generate_ohlcv(400, seed=1)
+    # Midcap misses some Nifty sessions and has a missing close
+    midcap = generate_ohlcv(400, seed=2).drop(index=[50, 51, 200]).reset_index(drop=True)
+    midcap.loc[120, "Close"] = np.nan
+
+    files = {}
+    for name, data in [("nifty", nifty), ("midcap", midcap)]:
+        files[f"{name}_raw"] = str(tmp_path / f"{name}_raw.csv")
+        files[name] = str(tmp_path / f"{name}.csv")
+        write_raw_price_csv(data, files[f"{name}_raw"])
+        preprocess_csv(files[f"{name}_raw"], files[name])
+    return files
+
+
+def streamed(chunks):
+    return pd.concat(chunks, ignore_index=True)
+
+
+def test_preprocessing_matches(price_files, tmp_path):
+    output_file = str(tmp_path / "streamed.csv")
+    assert stream_preprocess(price_files["nifty_raw"], output_file, CHUNK_SIZE) == 400
+    pd.testing.assert_frame_equal(pd.read_csv(output_file), pd.read_csv(price_files["nifty"]))
+
+
+def test_volatility_matches(price_files):
+    nifty, midcap = calculate_volatility_metrics(price_files["nifty"], price_files["midcap"])
+    pd.testing.assert_frame_equal(streamed(stream_volatility_metrics(price_files["nifty"], price_files["midcap"], CHUNK_SIZE)), nifty)
+    pd.testing.assert_frame_equal(streamed(chunk.fillna(0) for chunk in stream_volatility(price_files["midcap"], CHUNK_SIZE)), midcap)
+
+
+def test_traded_volume_matches(price_files):
+    nifty, midcap = calculate_traded_volume(price_files["nifty"], price_files["midcap"])
+    pd.testing.assert_frame_equal(streamed(stream_traded_volume(price_files["nifty"], CHUNK_SIZE)), nifty)
+    pd.testing.assert_frame_equal(streamed(stream_traded_volume(price_files["midcap"], CHUNK_SIZE)), midcap)
+
+
+def test_market_breadth_matches(price_files):
+    breadth = calculate_market_breadth(price_files["nifty_raw"])
+    assert breadth["Advance-Decline Ratio"].iloc[29:].gt(0).all()
+    pd.testing.assert_frame_equal(streamed(stream_market_breadth(price_files["nifty_raw"], CHUNK_SIZE)), breadth)
+
+
+@pytest.mark.parametrize("values", [np.arange(1001, dtype=float), np.repeat([1.0, 2.0, 5.0], [10, 1, 10]), np.array([])])
+def test_streaming_median_is_exact(values):
+    values = np.random.default_rng(0).permutation(values)
+    median = streaming_median(lambda: iter(np.array_split(values, 7)), bins=4, max_candidates=3)
+    if len(values):
+        assert median == np.median(values)
+    else:
+        assert np.isnan(median)
@@ -0,0 +1,69 @@
+import pandas as pd
+import numpy as np
+
+import statisticsCache
+from featureEngineering import calculate_market_breadth
+from stressTesting import DEFAULT_SCENARIO, _normalize, load_stress_inputs, simulate_breadth, simulate_features
+
+
+def stress_inputs(sessions, seed=0):
+    rng = np.random.default_rng(seed)
+    days = len(sessions)
+    return {
+        "returns": rng.normal(0, 0.01, days),
+        "sessions": np.asarray(sessions, dtype=float),
+        "fii_flows": rng.normal(0, 1000, 12),
+        "dii_flows": rng.normal(500, 100, 12),
+        "ranges": np.array([[0.0, 0.05], [0.0, 1.0], [-5.0, 5.0], [0.2, 4.0]]),
+        "latest": np.zeros(4)
+    }
+
+
+def test_breadth_counts_up_and_down_sessions_like_the_model():
+    inputs = stress_inputs(np.random.default_rng(1).choice([-1.0, 0.0, 1.0], 200, p=[0.45, 0.1, 0.45]))
+    features = simulate_features(inputs, 50, np.random.default_rng(7))
+
+    # Replay the same draws: shocked paths, then the bootstrapped days
+    rng = np.random.default_rng(7)
+    rng.random((50, 1))
+    days = rng.integers(0, 200, (50, DEFAULT_SCENARIO["horizon"]))
+    for path in range(50):
+        sessions = pd.Series(np.concatenate([inputs["sessions"][-29:], inputs["sessions"][days[path]]]))
+        breadth = ((sessions > 0).rolling(window=30).sum() / (sessions < 0).rolling(window=30).sum()).iloc[29:].fillna(0)
+        expected = _normalize(breadth.iloc[-1], breadth.min(), breadth.max(), inputs["ranges"][3])
+        assert features[path, 3] == expected
+
+
+def test_breadth_without_down_sessions_is_not_floored():
+    # Only up sessions: the model's ratio is infinite and normalizes to 0, not to a floored count
+    features = simulate_features(stress_inputs(np.ones(100)), 10, np.random.default_rng(0))
+    assert (features[:, 3] == 0).all()
+
+
+def test_simulated_breadth_stays_inside_the_stored_range(tmp_path, monkeypatch):
+    monkeypatch.setattr(statisticsCache, "ENABLED", False)
+    rng = np.random.default_rng(3)
+    dates = pd.bdate_range("2022-01-03", periods=500)
+    close = 17000 * np.cumprod(1 + rng.normal(0, 0.01, len(dates)))
+    prices = pd.DataFrame({"Date": dates, "Close": close, "High": close, "Low": close,
+                           "Open": close * (1 + rng.normal(0, 0.006, len(dates))), "Volume": rng.integers(1e5, 5e5, len(dates))})
+    price_file, raw_file = tmp_path / "processed.csv", tmp_path / "raw.csv"
+    prices.to_csv(price_file, index=False)
+    with open(raw_file, "w") as f:
+        f.write("Price,Close,High,Low,Open,Volume\nTicker,^NSEI,^NSEI,^NSEI,^NSEI,^NSEI\nDate,,,,,\n")
+        prices.to_csv(f, header=False, index=False)
+
+    files = [tmp_path / name for name in ["volatility.csv", "volume.csv", "flows.csv", "breadth.csv"]]
+    pd.DataFrame({"Date": dates, "30-Day Volatility": rng.random(len(dates))}).to_csv(files[0], index=False)
+    pd.DataFrame({"Date": dates, "Average Volume": rng.random(len(dates))}).to_csv(files[1], index=False)
+    pd.DataFrame({"MONTH": ["Mar 2023", "Feb 2023"], "FII Net Flow": [-10.0, 5.0], "DII Net Flow": [20.0, 8.0],
+                  "FII/DII Ratio": [-0.5, 0.625]}).to_csv(files[2], index=False)
+    calculate_market_breadth(str(raw_file)).to_csv(files[3], index=False)
+
+    inputs = load_stress_inputs(*[str(file) for file in files], str(price_file))
+    breadth = simulate_breadth(inputs["sessions"], rng.integers(0, len(inputs["sessions"]), (2000, 21)))
+    low, high = inputs["ranges"][3]
+    inside = (breadth >= low) & (breadth <= high)
+    assert inside.mean() > 0.99
+    # The stored breadth is the same up/down session ratio, not a 0-0.1 quantity
+    assert high > 1
@@ -0,0 +1,64 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+import statisticsCache
+from featureEngineering import calculate_traded_volume, calculate_volatility_metrics
+from universeFeatures import calculate_universe_features, load_universe
+
+
+def write_processed_prices(file, dates, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, len(dates)))
+    open_price = close * (1 + rng.normal(0, 0.005, len(dates)))
+    volume = rng.integers(1000, 5000, len(dates)).astype(float)
+    volume[::17] = 0
+    pd.DataFrame({"Date": dates, "Close": close, "High": close, "Low": close, "Open": open_price,
+                  "Volume": volume}).to_csv(file, index=False)
+
+
+@pytest.fixture
+def universe(tmp_path, monkeypatch):
+    monkeypatch.setattr(statisticsCache, "ENABLED", False)
+    calendar = pd.bdate_range("2024-01-01", periods=160)
+    # Each ticker misses sessions the other one has, and the benchmark starts later
+    files = {"Nifty 50": str(tmp_path / "nifty.csv"), "Nifty Midcap 100": str(tmp_path / "midcap.csv")}
+    write_processed_prices(files["Nifty 50"], calendar.delete(np.arange(5, 160, 11)), seed=1)
+    write_processed_prices(files["Nifty Midcap 100"], calendar[10:].delete(np.arange(3, 150, 7)), seed=2)
+    return files
+
+
+def sessions(values, expected):
+    """Universe feature values on the dates of a per-ticker result."""
+    return values.reindex(pd.DatetimeIndex(expected["Date"])).to_numpy()
+
+
+def test_universe_matches_per_ticker_features(universe):
+    panel = load_universe(universe, skiprows=1)
+    features = calculate_universe_features(panel, benchmark="Nifty Midcap 100")
+
+    nifty_volatility, midcap_volatility = calculate_volatility_metrics(universe["Nifty 50"], universe["Nifty Midcap 100"])
+    np.testing.assert_allclose(sessions(features["30-Day Volatility"]["Nifty 50"], nifty_volatility),
+                               nifty_volatility["30-Day Volatility"], rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(sessions(features["30-Day Volatility"]["Nifty Midcap 100"], midcap_volatility),
+                               midcap_volatility["30-Day Volatility"], rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(sessions(features["Volatility Ratio"]["Nifty 50"], nifty_volatility),
+                               nifty_volatility["Volatility Ratio"], rtol=1e-9, atol=1e-12)
+
+    nifty_volume, midcap_volume = calculate_traded_volume(universe["Nifty 50"], universe["Nifty Midcap 100"])
+    np.testing.assert_allclose(sessions(features["Average Volume"]["Nifty 50"], nifty_volume), nifty_volume["Average Volume"])
+    np.testing.assert_allclose(sessions(features["Average Volume"]["Nifty Midcap 100"], midcap_volume), midcap_volume["Average Volume"])
+
+    for name, file in universe.items():
+        data = pd.read_csv(file, parse_dates=["Date"])
+        breadth = ((data["Close"] > data["Open"]).rolling(window=30).sum() /
+                   (data["Close"] < data["Open"]).rolling(window=30).sum()).fillna(0)
+        np.testing.assert_allclose(sessions(features["Advance-Decline Ratio"][name], data), breadth)
+
+
+def test_non_sessions_are_missing(universe):
+    panel = load_universe(universe, skiprows=1)
+    features = calculate_universe_features(panel, benchmark="Nifty Midcap 100")
+    midcap_dates = pd.DatetimeIndex(pd.read_csv(universe["Nifty Midcap 100"], parse_dates=["Date"])["Date"])
+    volatility = features["30-Day Volatility"]["Nifty Midcap 100"]
+    assert volatility.notna().to_numpy().tolist() == volatility.index.isin(midcap_dates).tolist()
@@ -0,0 +1,86 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+from backtestModel import normalize_without_lookahead
+from cashAllocationModel import DEFAULT_DAMPING, DEFAULT_WEIGHTS, FEATURE_NAMES
+from weightOptimizer import _score_block, evaluate_objective, generate_candidates, optimize_weights, walk_forward_segments
+
+
+@pytest.fixture
+def history():
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2020-01-01", periods=600, name="Date")
+    features = pd.DataFrame(rng.random((len(dates), 4)), index=dates, columns=FEATURE_NAMES)
+    # Returns are weaker on high-volatility days, so the weights matter
+    returns = rng.normal(0.0005, 0.01, len(dates)) - 0.01 * (features["volatility"].shift(1).fillna(0.5).to_numpy() - 0.5)
+    prices = pd.Series(100 * np.cumprod(1 + returns), index=dates)
+    return features, prices
+
+
+def test_candidates_start_with_the_current_model():
+    weights, damping = generate_candidates(50, np.random.default_rng(1))
+    assert weights.shape == damping.shape == (50, 4)
+    np.testing.assert_allclose(weights.sum(axis=1), 1)
+    assert (damping[:, 0] == 1).all() and ((damping >= 0.5) & (damping <= 1)).all()
+    assert weights[0].tolist() == [DEFAULT_WEIGHTS[name] for name in FEATURE_NAMES]
+    assert damping[0].tolist() == [DEFAULT_DAMPING[name] for name in FEATURE_NAMES]
+    np.testing.assert_array_equal(generate_candidates(50, np.random.default_rng(1))[0], weights)
+
+
+def test_walk_forward_segments_are_consecutive():
+    segments = walk_forward_segments(600, folds=4, min_train=200)
+    assert segments == [(0, 200), (200, 300), (300, 400), (400, 500), (500, 600)]
+    with pytest.raises(ValueError):
+        walk_forward_segments(204, folds=4, min_train=200)
+
+
+def test_objectives():
+    returns = np.array([0.1, -0.5, 0.2, 0.0])
+    cash = np.array([[0.0, 1.0]] * 4)
+    # Fully invested: 1.1 -> 0.55 -> 0.66 -> 0.66, a 50% drawdown; all cash never moves
+    np.testing.assert_allclose(evaluate_objective(cash, returns, "drawdown"), [-0.5, 0])
+    np.testing.assert_allclose(evaluate_objective(cash, returns, "return"), [0.66 ** (252 / 4) - 1, 0])
+    np.testing.assert_allclose(evaluate_objective(cash, returns, "calmar")[0], (0.66 ** (252 / 4) - 1) / 0.5)
+
+
+def test_successive_halving_keeps_the_baseline(history):
+    features, prices = history
+    result = optimize_weights(features, prices, candidates=64, folds=4, min_train=200, keep_fraction=0.5, min_candidates=16)
+
+    # 64 -> 32 -> 16 candidates after the first two test segments, plus the current model if it was dropped
+    survivors = result["candidates"]
+    assert len(survivors) in (16, 17)
+    assert ((survivors[[f"{name} weight" for name in FEATURE_NAMES]] == [DEFAULT_WEIGHTS[name] for name in FEATURE_NAMES]).all(axis=1)).any()
+    assert survivors["Objective"].is_monotonic_decreasing
+    assert result["walk_forward"]["Candidates"].tolist() == [64, 32, 16, 16]
+    assert result["objective"] == pytest.approx(survivors["Objective"].iloc[0])
+
+    # The best parameters' objective, scored segment by segment
+    signals = features[FEATURE_NAMES].apply(normalize_without_lookahead).to_numpy()
+    returns = prices.pct_change().shift(-1).fillna(0).to_numpy()
+    best = (np.array([list(result["weights"].values())]), np.array([list(result["damping"].values())]))
+    objectives = [_score_block(signals[start:stop], returns[start:stop], 30, *best, "calmar")[0]
+                  for start, stop in walk_forward_segments(len(features), 4, 200)]
+    assert np.mean(objectives) == pytest.approx(result["objective"])
+
+
+def test_walk_forward_scores_the_earlier_choice_out_of_sample(history):
+    features, prices = history
+    result = optimize_weights(features, prices, candidates=40, folds=3, min_train=200, objective="return", min_candidates=40)
+
+    signals = features[FEATURE_NAMES].apply(normalize_without_lookahead).to_numpy()
+    returns = prices.pct_change().shift(-1).fillna(0).to_numpy()
+    weights, damping = generate_candidates(40, np.random.default_rng(0))
+    (train_start, train_stop), (test_start, test_stop) = walk_forward_segments(len(features), 3, 200)[:2]
+    chosen = np.argmax(_score_block(signals[train_start:train_stop], returns[train_start:train_stop], 30, weights, damping, "return"))
+    expected = _score_block(signals[test_start:test_stop], returns[test_start:test_stop], 30, weights[[chosen]], damping[[chosen]], "return")[0]
+
+    first = result["walk_forward"].iloc[0]
+    assert first["Start"] == features.index[test_start] and first["End"] == features.index[test_stop - 1]
+    assert first["Chosen Objective"] == pytest.approx(expected)
+
+
+def test_invalid_objective(history):
+    with pytest.raises(ValueError):
+        optimize_weights(*history, candidates=4, objective="sharpe")